@@ -0,0 +1,88 @@
+"""Mide el arranque en frío: tiempo de importación y del primer render.
+
+Cada medición corre en un proceso nuevo (sin módulos ya cargados) con la
+hoja en memoria. Además del tiempo reporta qué dependencias pesadas quedaron
+cargadas: el registro no debería cargar reportlab, gspread ni oauth2client.
+
+    python -m benchmarks.bench_arranque --repeticiones 5 --json resultados.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PESADAS = ["reportlab", "gspread", "oauth2client"]
+
+# Se ejecuta en el proceso hijo; imprime un JSON en la última línea
+MEDICION = """
+import json, sys, time
+PESADAS = {pesadas!r}
+inicio = time.perf_counter()
+escenario = {escenario!r}
+if escenario.startswith("import "):
+    __import__(escenario.split()[1])
+    resultado = {{}}
+else:
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file({app!r}, default_timeout=60)
+    at.run()
+    resultado = {{"registro_s": time.perf_counter() - inicio,
+                 "cargadas_registro": [m for m in PESADAS if m in sys.modules]}}
+    if escenario == "render rankings":
+        t = time.perf_counter()
+        at.sidebar.radio[0].set_value("🏆 Ver Rankings").run()
+        resultado["rankings_s"] = time.perf_counter() - t
+resultado["segundos"] = time.perf_counter() - inicio
+resultado["cargadas"] = [m for m in PESADAS if m in sys.modules]
+print(json.dumps(resultado))
+"""
+
+ESCENARIOS = [
+    "import sac.datos",
+    "import sac.paginas.registro",
+    "import sac.paginas.rankings",
+    "render registro",
+    "render rankings",
+]
+
+
+def medir(escenario, raiz):
+    codigo = MEDICION.format(pesadas=PESADAS, escenario=escenario, app=os.path.join(raiz, "streamlit_app.py"))
+    entorno = dict(os.environ, SAC_BACKEND="falso", PYTHONPATH=raiz)
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, cwd=raiz,
+                            env=entorno, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", help="ruta donde guardar los resultados")
+    args = parser.parse_args()
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    resultados = []
+    for escenario in ESCENARIOS:
+        corridas = [medir(escenario, raiz) for _ in range(args.repeticiones)]
+        r = {
+            "escenario": escenario,
+            "mediana_s": round(statistics.median(c["segundos"] for c in corridas), 3),
+            "cargadas": corridas[-1]["cargadas"],
+        }
+        if "registro_s" in corridas[-1]:
+            r["primer_render_s"] = round(statistics.median(c["registro_s"] for c in corridas), 3)
+            r["cargadas_en_registro"] = corridas[-1]["cargadas_registro"]
+        if "rankings_s" in corridas[-1]:
+            r["render_rankings_s"] = round(statistics.median(c["rankings_s"] for c in corridas), 3)
+        resultados.append(r)
+        print(f"{escenario:<28} {r['mediana_s']:>7.3f} s  cargadas: {', '.join(r['cargadas']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"repeticiones": args.repeticiones, "resultados": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
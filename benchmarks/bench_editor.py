@@ -0,0 +1,111 @@
+"""Compara el guardado del modo Editor: reescritura completa vs. diferencias.
+
+Usa HojaFalsa con una latencia fija por llamada y un costo por celda enviada
+para aproximar la API de Sheets. El caché ya tiene la hoja (como cuando se
+abrió el editor); las llamadas y el tiempo de lectura de la hoja durante el
+guardado se reportan aparte de la escritura.
+
+    python -m benchmarks.bench_editor --filas 5000 --json resultados.json
+"""
+import argparse
+import json
+import random
+import time
+
+import pandas as pd
+
+from sac import datos
+from sac.almacen import AlmacenLocal, configurar_almacen
+from sac.conexion import ConexionSheets, configurar_conexion
+from sac.hoja_falsa import ClienteFalso, HojaFalsa
+
+
+def _base(filas, semilla):
+    azar = random.Random(semilla)
+    return pd.DataFrame(
+        [[azar.choice(["Enero", "Febrero", "Marzo"]), 2025, f"Colaborador {i}", f"CEDIS {i % 40}",
+          f"Zona {i % 6}", "Jefe SAC Mixto", azar.randint(40, 100), "Salida:10 | Visita:5", "2025-03-01"]
+         for i in range(filas)],
+        columns=datos.COLUMNAS_BASE,
+    ).pipe(datos.con_identidad).reindex(columns=datos.COLUMNAS, fill_value="")
+
+
+def _editar(df, proporcion, semilla):
+    """Cambia el puntaje de una fracción de filas (al menos una)"""
+    editado = df.copy()
+    n = max(1, int(len(df) * proporcion))
+    filas = random.Random(semilla).sample(range(len(df)), n)
+    editado.loc[filas, "Puntaje Total"] = editado.loc[filas, "Puntaje Total"] + 1
+    return editado
+
+
+LECTURAS = {"get_all_values", "get_values", "col_values", "row_values", "batch_get"}
+
+
+def medir(original, editado, estrategia, latencia, latencia_por_celda):
+    hoja = HojaFalsa([datos.COLUMNAS] + datos._filas_para_hoja(original),
+                     latencia=latencia, latencia_por_celda=latencia_por_celda)
+    configurar_conexion(ConexionSheets(lambda: ClienteFalso(hoja)))
+    datos.cache_registros.invalidar()
+    datos.cargar_instantanea()
+    hoja.llamadas.clear()
+    tiempos = {"lectura": 0.0}
+    for operacion in LECTURAS:
+        original_op = getattr(hoja, operacion)
+
+        def medida(*args, _op=original_op, **kwargs):
+            inicio_op = time.perf_counter()
+            try:
+                return _op(*args, **kwargs)
+            finally:
+                tiempos["lectura"] += time.perf_counter() - inicio_op
+        setattr(hoja, operacion, medida)
+    inicio = time.perf_counter()
+    if estrategia == "reescritura":
+        datos.reescribir_hoja(datos.get_sheet(), editado)
+    else:
+        datos.actualizar_base_completa(editado, original)
+    segundos = time.perf_counter() - inicio
+    lecturas = sum(n for op, n in hoja.llamadas.items() if op in LECTURAS)
+    return {
+        "estrategia": estrategia,
+        "llamadas": sum(hoja.llamadas.values()),
+        "lecturas": lecturas,
+        "celdas_enviadas": hoja.celdas_enviadas,
+        "segundos": round(segundos, 4),
+        "segundos_lectura": round(tiempos["lectura"], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=5000)
+    parser.add_argument("--latencia", type=float, default=0.15, help="segundos por llamada a la API")
+    parser.add_argument("--latencia-por-celda", type=float, default=2e-6)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--json", help="ruta donde guardar los resultados")
+    args = parser.parse_args()
+
+    # Se mide el envío de diferencias en sí, no la bandeja local
+    datos.ESCRITURA_DIFERIDA = False
+    configurar_almacen(AlmacenLocal(":memory:"))
+
+    original = _base(args.filas, args.semilla)
+    escenarios = {"1 celda": 0, "1% de filas": 0.01, "todas las filas": 1.0}
+    resultados = []
+    for escenario, proporcion in escenarios.items():
+        editado = _editar(original, proporcion, args.semilla)
+        for estrategia in ("reescritura", "diferencias"):
+            r = medir(original, editado, estrategia, args.latencia, args.latencia_por_celda)
+            r["escenario"] = escenario
+            resultados.append(r)
+            print(f"{escenario:<16} {estrategia:<12} {r['llamadas']:>3} llamadas ({r['lecturas']} de lectura) "
+                  f"{r['celdas_enviadas']:>8} celdas {r['segundos']:>8.3f} s (lectura {r['segundos_lectura']:.3f} s)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"filas": args.filas, "resultados": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Prueba de carga: muchas sesiones guardando evaluaciones al mismo tiempo.
+
+Simula el cierre de mes con N hilos que oprimen "Guardar" a la vez contra
+HojaFalsa (latencia fija por llamada). Compara la escritura directa (cada
+envío espera su `append_row`) con la diferida (el envío vuelve con un recibo
+y el escritor junta las filas en `append_rows`).
+
+    python -m benchmarks.bench_envios --sesiones 50 --json resultados.json
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+
+from sac import datos
+from sac.almacen import AlmacenLocal, configurar_almacen
+from sac.conexion import ConexionSheets, configurar_conexion
+from sac.hoja_falsa import ClienteFalso, HojaFalsa
+
+
+def _registro(sesion, envio):
+    return {
+        "Mes": "Enero", "Año": 2026, "Nombre": f"Colaborador {sesion}-{envio}", "CEDIS": f"CEDIS {sesion % 8}",
+        "Zona": f"Zona {sesion % 3}", "Perfil": "Jefe SAC Mixto", "Puntaje Total": 80,
+        "Desglose": "Salida:10 | Visita:10", "Fecha Reg": "2026-01-31",
+    }
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def medir(modo, sesiones, envios, latencia, espera_maxima):
+    hoja = HojaFalsa([datos.COLUMNAS], latencia=latencia)
+    configurar_conexion(ConexionSheets(lambda: ClienteFalso(hoja)))
+    configurar_almacen(AlmacenLocal(":memory:"))
+    datos.cache_registros = datos.CacheRegistros()
+    datos.ESCRITURA_DIFERIDA = modo == "diferida"
+
+    tiempos = []
+    errores = []
+    salida = threading.Barrier(sesiones)
+
+    def sesion(n):
+        salida.wait()
+        for e in range(envios):
+            inicio = time.perf_counter()
+            try:
+                datos.guardar_registro(_registro(n, e))
+            except Exception as error:
+                errores.append(str(error))
+            tiempos.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=sesion, args=(n,)) for n in range(sesiones)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    aceptados = time.perf_counter() - inicio
+
+    # Hasta que todas las filas estén en la hoja (en diferida, cuando se vacía la bandeja)
+    esperadas = sesiones * envios + 1
+    while hoja.row_count < esperadas and time.perf_counter() - inicio < espera_maxima:
+        time.sleep(0.01)
+    return {
+        "modo": modo,
+        "envios": sesiones * envios,
+        "envio_p50_ms": round(statistics.median(tiempos) * 1000, 2),
+        "envio_p95_ms": round(_percentil(tiempos, 95) * 1000, 2),
+        "envio_max_ms": round(max(tiempos) * 1000, 2),
+        "segundos_aceptados": round(aceptados, 3),
+        "segundos_en_hoja": round(time.perf_counter() - inicio, 3),
+        "filas_en_hoja": hoja.row_count - 1,
+        "llamadas_escritura": hoja.llamadas["append_row"] + hoja.llamadas["append_rows"],
+        "llamadas_totales": sum(hoja.llamadas.values()),
+        "errores": len(errores),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sesiones", type=int, default=50)
+    parser.add_argument("--envios", type=int, default=1, help="evaluaciones por sesión")
+    parser.add_argument("--latencia", type=float, default=0.3, help="segundos por llamada a la API")
+    parser.add_argument("--espera-maxima", type=float, default=120, help="tope para esperar a la hoja")
+    parser.add_argument("--json", help="ruta donde guardar los resultados")
+    args = parser.parse_args()
+
+    resultados = []
+    for modo in ("directa", "diferida"):
+        r = medir(modo, args.sesiones, args.envios, args.latencia, args.espera_maxima)
+        resultados.append(r)
+        print(f"{modo:<9} envío p50 {r['envio_p50_ms']:>8.1f} ms  p95 {r['envio_p95_ms']:>8.1f} ms  "
+              f"en hoja {r['segundos_en_hoja']:>6.2f} s  {r['filas_en_hoja']:>4} filas  "
+              f"{r['llamadas_escritura']:>3} escrituras  {r['errores']} errores")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"sesiones": args.sesiones, "envios": args.envios, "latencia": args.latencia,
+                       "resultados": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
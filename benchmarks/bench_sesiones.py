@@ -0,0 +1,90 @@
+"""Memoria por sesión: varias sesiones abiertas en el tablero al mismo tiempo.
+
+Carga N evaluaciones sintéticas en HojaFalsa y abre sesiones (AppTest) del
+tablero una tras otra, cada una con su propio mes y zona, sin cerrarlas.
+Reporta la memoria de Python (tracemalloc) después de la primera sesión,
+cuánto agrega cada sesión extra y el pico temporal de un rerun con otro
+filtro. Con el dataset compartido cada sesión solo guarda sus filtros y la
+página que muestra, así que ni la pendiente ni el pico deben crecer con N.
+
+    python -m benchmarks.bench_sesiones --filas 20000 --sesiones 8 --json resultados.json
+"""
+import argparse
+import gc
+import json
+import os
+import tracemalloc
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.generador import generar_evaluaciones
+from sac import datos
+from sac.conexion import ConexionSheets, configurar_conexion
+from sac.hoja_falsa import ClienteFalso, HojaFalsa
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _memoria_mb():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 1e6
+
+
+def abrir_sesion(n):
+    """Sesión en el tablero con un mes y una zona distintos según `n`"""
+    at = AppTest.from_file(os.path.join(RAIZ, "streamlit_app.py"), default_timeout=120).run()
+    at.sidebar.radio[0].set_value("🏆 Ver Rankings").run()
+    at.selectbox[1].set_value(datos.MESES[n % 12])
+    zonas = at.multiselect[1].options
+    if zonas and n % 2:
+        at.multiselect[1].set_value([zonas[n % len(zonas)]])
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=20000)
+    parser.add_argument("--sesiones", type=int, default=8)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--json", help="ruta donde guardar los resultados")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SAC_BACKEND", "falso")     # Almacén en memoria
+    os.environ.setdefault("SAC_CIERRE", "manual")     # Sin el hilo de cierre de mes midiendo memoria a la par
+    df = generar_evaluaciones(args.filas, args.semilla)
+    hoja = HojaFalsa([datos.COLUMNAS] + datos._filas_para_hoja(df))
+    del df
+    configurar_conexion(ConexionSheets(lambda: ClienteFalso(hoja)))
+    datos.cache_registros.invalidar()
+
+    tracemalloc.start()
+    base = _memoria_mb()
+    sesiones = []
+    memoria = []
+    for n in range(args.sesiones):
+        sesiones.append(abrir_sesion(n))
+        memoria.append(round(_memoria_mb() - base, 2))
+        print(f"{n + 1:>3} sesiones  {memoria[-1]:>8.2f} MB")
+
+    # Pico de un rerun: cambiar de mes en una sesión ya abierta
+    antes = _memoria_mb()
+    tracemalloc.reset_peak()
+    sesiones[-1].selectbox[1].set_value(datos.MESES[args.sesiones % 12]).run()
+    pico = round(tracemalloc.get_traced_memory()[1] / 1e6 - antes, 2)
+    tracemalloc.stop()
+
+    por_sesion = (memoria[-1] - memoria[0]) / max(1, len(memoria) - 1)
+    print(f"Primera sesión (con caché, índice y acumulados): {memoria[0]:.2f} MB · cada sesión extra: "
+          f"{por_sesion:.2f} MB · pico de un rerun: {pico:.2f} MB")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"filas": args.filas, "sesiones": args.sesiones, "memoria_mb": memoria,
+                       "primera_mb": memoria[0], "por_sesion_extra_mb": round(por_sesion, 3),
+                       "pico_rerun_mb": pico}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Equivalencia del motor de reglas con la calificación original por perfil.
+
+Compara `calcular_registro` (formulario) y `preparar_lote` + `calificar_lote`
+(importación) contra una copia de los if/elif que tenía el formulario antes
+de la tabla de reglas, en N evaluaciones aleatorias con valores pegados a
+los umbrales. La importación debe además rechazar lo que el formulario no
+dejaba capturar (p. ej. Falseo 3.5 o -1). Termina con código 1 si algo no
+coincide.
+
+    python -m benchmarks.equivalencia_reglas --casos 3000
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from sac.importacion import calificar_lote, preparar_lote
+from sac.puntuacion import ARQUETIPOS, EN_OBJETIVO, OPCIONES_OBJETIVO, REGLAS, calcular_registro
+
+
+# --- CALIFICACIÓN ORIGINAL (horas en minutos desde medianoche) ---
+def _salida(m):
+    return 10 if m <= 450 else (5 if m <= 480 else (2 if m <= 540 else 0))
+
+
+def _visita(m):
+    return 10 if m <= 510 else (5 if m <= 540 else (2 if m <= 600 else 0))
+
+
+def _porcentajes(v, maximo, medio):
+    return maximo if v <= 0.05 else (medio if v <= 0.10 else 0)
+
+
+def _oos(v, maximo, medio):
+    return maximo if v <= 0.5 else (medio if v <= 1.0 else 0)
+
+
+def _escala(v, puntos, umbrales):
+    for p, u in zip(puntos, umbrales):
+        if v >= u:
+            return p
+    return 0
+
+
+def original(perfil, e):
+    """Total como lo calculaba el formulario original"""
+    inv = lambda pts: pts if e["dif_inventario"] <= ARQUETIPOS[e["arquetipo"]] else 0
+    rot = lambda pts: pts if e["rotura"] == EN_OBJETIVO else 0
+    if perfil == "Jefe SAC Mixto":
+        return (_salida(e["salida"]) + _visita(e["visita"]) + _escala(e["fill_rate"], [25, 15, 5], [98, 97, 96])
+                + _escala(e["proximidad"], [10, 7, 5], [98, 97, 96]) + inv(25)
+                + _porcentajes(e["merma"], 10, 5) + rot(10))
+    if perfil in ("Jefe SAC Entrega", "JT Embotellado"):
+        return (_salida(e["salida"]) * 2 + _visita(e["visita"]) * 2
+                + _escala(e["fill_rate"], [40, 24, 8], [98, 97, 96]) + _escala(e["proximidad"], [20, 12, 4], [98, 97, 96]))
+    if perfil == "Jefe SAC APT":
+        return _oos(e["oos"], 20, 10) + inv(40) + _porcentajes(e["merma"], 20, 10) + rot(20)
+    if perfil == "JT Garrafón":
+        falseo = e["falseo"]
+        return (_salida(e["salida"]) * 1.5 + _visita(e["visita"]) * 1.5
+                + _escala(e["entrega_perfecta"], [40, 20, 5], [98, 97, 95])
+                + _escala(e["proximidad"], [10, 7, 5], [98, 97, 96])
+                + (20 if falseo < 4 else (10 if falseo <= 7 else 0)))
+    if perfil == "Jefe/Sup APT Garrafón/embotellado":
+        return (_oos(e["oos"], 20, 10) + inv(30) + _porcentajes(e["merma"], 20, 10) + rot(20)
+                + _salida(e["salida"]))
+    return _oos(e["oos"], 25, 12) + inv(40) + _porcentajes(e["merma"], 25, 12) + _salida(e["salida"])
+
+
+# --- CASOS ALEATORIOS (como los permitía el formulario) ---
+def _cerca(rng, umbrales, decimales, minimo, maximo):
+    base = rng.choice(umbrales)
+    return float(np.clip(round(base + rng.choice([-2, -1, 0, 1, 2]) * 10 ** -decimales, decimales), minimo, maximo))
+
+
+def generar_casos(n, semilla):
+    rng = np.random.default_rng(semilla)
+    casos = []
+    for _ in range(n):
+        arquetipo = rng.choice(list(ARQUETIPOS))
+        casos.append((rng.choice(list(REGLAS)), {
+            "salida": int(rng.choice([449, 450, 451, 479, 480, 481, 539, 540, 541, 600])),
+            "visita": int(rng.choice([509, 510, 511, 539, 540, 541, 599, 600, 601, 660])),
+            "fill_rate": _cerca(rng, [95, 96, 97, 98], 1, 0, 100),
+            "proximidad": _cerca(rng, [95, 96, 97, 98], 1, 0, 100),
+            "entrega_perfecta": _cerca(rng, [94, 95, 97, 98], 1, 0, 100),
+            "oos": _cerca(rng, [0.5, 1.0], 1, 0, 100),
+            "merma": _cerca(rng, [0.05, 0.10], 3, 0, 1),
+            "arquetipo": arquetipo,
+            "dif_inventario": _cerca(rng, [ARQUETIPOS[arquetipo]], 2, 0, 10 ** 6),
+            "rotura": rng.choice(OPCIONES_OBJETIVO),
+            "falseo": int(rng.integers(0, 11)),
+        }))
+    return casos
+
+
+def _hora(minutos):
+    return f"{minutos // 60}:{minutos % 60:02d}"
+
+
+def _como_archivo(casos):
+    """Los casos como filas de texto del archivo de importación"""
+    filas = []
+    for perfil, e in casos:
+        filas.append({
+            "Mes": "Enero", "Año": "2026", "Nombre": "Prueba", "CEDIS": "C", "Zona": "Z", "Perfil": perfil,
+            "Salida": _hora(e["salida"]), "Visita": _hora(e["visita"]), "Fill Rate": str(e["fill_rate"]),
+            "Proximidad": str(e["proximidad"]), "Entrega Perfecta": str(e["entrega_perfecta"]),
+            "OOS": str(e["oos"]), "Merma": str(e["merma"]), "Arquetipo": e["arquetipo"],
+            "Diferencia Inventario": str(e["dif_inventario"]), "Rotura": e["rotura"], "Falseo": str(e["falseo"]),
+        })
+    lote = pd.DataFrame(filas, dtype=str)
+    lote.index = pd.RangeIndex(2, 2 + len(lote))
+    return lote
+
+
+def verificar(n, semilla):
+    """Lista de diferencias encontradas (vacía si todo coincide)"""
+    casos = generar_casos(n, semilla)
+    diferencias = []
+    for i, (perfil, e) in enumerate(casos):
+        esperado = original(perfil, e)
+        total = calcular_registro(perfil, e)[0]
+        if abs(total - esperado) > 1e-9:
+            diferencias.append(f"formulario caso {i} ({perfil}): {total} en lugar de {esperado}")
+
+    validas, errores = preparar_lote(_como_archivo(casos))
+    if len(errores):
+        diferencias.append(f"importación rechazó {len(errores)} filas válidas: {errores.iloc[0]}")
+    totales = calificar_lote(validas)["Puntaje Total"].to_numpy()
+    for i, total in zip(validas.index - 2, totales):
+        esperado = original(*casos[i])
+        if abs(total - esperado) > 1e-9:
+            diferencias.append(f"importación caso {i} ({casos[i][0]}): {total} en lugar de {esperado}")
+
+    # Lo que el formulario no dejaba capturar no debe calificarse con otra regla
+    invalidos = [("JT Garrafón", {**casos[0][1], "falseo": f}) for f in (3.5, 7.5, -1)]
+    _, errores = preparar_lote(_como_archivo(invalidos))
+    if len(errores) != len(invalidos):
+        diferencias.append(f"importación aceptó un Falseo fraccionario o negativo ({len(errores)} de {len(invalidos)} rechazados)")
+    return diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--casos", type=int, default=3000)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+    diferencias = verificar(args.casos, args.semilla)
+    for diferencia in diferencias[:20]:
+        print(diferencia)
+    print(f"{args.casos} casos: {'OK' if not diferencias else f'{len(diferencias)} diferencias'}")
+    if diferencias:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
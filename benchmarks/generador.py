@@ -0,0 +1,96 @@
+"""Generador de evaluaciones sintéticas para los benchmarks.
+
+Arma un catálogo estable de colaboradores (cada uno con su perfil, CEDIS y
+zona) y le asigna evaluaciones mensuales con más peso en los meses
+recientes. Los KPIs crudos siguen distribuciones cercanas a las reales y
+solo se llenan los que usa el perfil; los puntos se calculan con el mismo
+motor que la app (`calificar_lote`), así que las filas son idénticas a las
+que escribiría el formulario o la importación.
+
+    from benchmarks.generador import generar_evaluaciones, hoja_sintetica
+    df = generar_evaluaciones(10_000, semilla=7)
+"""
+import numpy as np
+import pandas as pd
+
+from sac import datos
+from sac.hoja_falsa import HojaFalsa
+from sac.importacion import calificar_lote
+from sac.puntuacion import ARQUETIPOS, EN_OBJETIVO, OPCIONES_OBJETIVO, PERFILES, REGLAS
+
+ZONAS = ["Norte", "Sur", "Oriente", "Poniente", "Centro", "Bajío"]
+CEDIS_POR_ZONA = 8
+ANOS = (2024, 2025, 2026)
+# Más jefes mixtos y de entrega que perfiles APT especializados
+PESOS_PERFIL = [0.26, 0.18, 0.12, 0.14, 0.10, 0.10, 0.10]
+NOMBRES = ["Ana", "Luis", "María", "José", "Carmen", "Jorge", "Lucía", "Pedro", "Sofía", "Miguel",
+           "Elena", "Raúl", "Patricia", "Héctor", "Adriana", "Fernando", "Gabriela", "Ricardo"]
+APELLIDOS = ["García", "Hernández", "López", "Martínez", "González", "Pérez", "Rodríguez", "Sánchez",
+             "Ramírez", "Cruz", "Flores", "Gómez", "Morales", "Vázquez", "Reyes", "Jiménez"]
+
+
+def _catalogo(rng, colaboradores):
+    """Colaboradores con perfil, CEDIS y zona fijos; algunos CEDIS son mucho más grandes"""
+    cedis = [f"{zona[:3].upper()}-{i + 1:02d}" for zona in ZONAS for i in range(CEDIS_POR_ZONA)]
+    zona_de = {c: zona for zona in ZONAS for c in cedis if c.startswith(zona[:3].upper())}
+    pesos = 1 / np.arange(1, len(cedis) + 1) ** 0.8
+    asignados = rng.choice(cedis, size=colaboradores, p=pesos / pesos.sum())
+    nombres = [f"{NOMBRES[i % len(NOMBRES)]} {APELLIDOS[(i // len(NOMBRES)) % len(APELLIDOS)]} {i // 288 or ''}".strip()
+               for i in range(colaboradores)]
+    return pd.DataFrame({
+        "Nombre": nombres,
+        "Perfil": rng.choice(PERFILES, size=colaboradores, p=PESOS_PERFIL),
+        "CEDIS": asignados,
+        "Zona": [zona_de[c] for c in asignados],
+    })
+
+
+def generar_entradas(n, semilla=0, colaboradores=None, anos=ANOS):
+    """DataFrame de KPIs crudos (como los que lee la importación) para `n` evaluaciones"""
+    rng = np.random.default_rng(semilla)
+    catalogo = _catalogo(rng, colaboradores or max(24, n // 12))
+
+    meses = np.arange(len(anos) * 12)
+    pesos_mes = 1 + meses / len(meses)          # Los meses recientes tienen más registros
+    periodo = rng.choice(meses, size=n, p=pesos_mes / pesos_mes.sum())
+    df = catalogo.iloc[rng.integers(len(catalogo), size=n)].reset_index(drop=True)
+    df["Mes"] = [datos.MESES[p % 12] for p in periodo]
+    df["Año"] = np.asarray(anos)[periodo // 12]
+
+    df["salida"] = rng.normal(460, 25, n).round()       # ~7:40
+    df["visita"] = rng.normal(525, 30, n).round()       # ~8:45
+    for entrada in ("fill_rate", "proximidad", "entrega_perfecta"):
+        df[entrada] = np.clip(rng.normal(97.3, 1.4, n), 85, 100).round(1)
+    df["oos"] = np.abs(rng.normal(0.7, 0.4, n)).round(2)
+    df["merma"] = rng.gamma(2.0, 0.03, n).round(3)
+    df["arquetipo"] = rng.choice(list(ARQUETIPOS), size=n, p=[0.3, 0.25, 0.2, 0.15, 0.1])
+    topes = df["arquetipo"].map(ARQUETIPOS).to_numpy()
+    df["dif_inventario"] = (rng.exponential(0.8, n) * topes).round(2)
+    df["rotura"] = np.where(rng.random(n) < 0.8, EN_OBJETIVO, OPCIONES_OBJETIVO[1])
+    df["falseo"] = rng.poisson(0.3, n)
+
+    # Solo quedan las entradas que el perfil realmente captura
+    for perfil, regla in REGLAS.items():
+        usadas = {k["entrada"] for k in regla["kpis"]} | {"arquetipo" for k in regla["kpis"] if k["tipo"] == "arquetipo"}
+        sobrantes = [c for c in ("salida", "visita", "fill_rate", "proximidad", "entrega_perfecta", "oos",
+                                 "merma", "arquetipo", "dif_inventario", "rotura", "falseo") if c not in usadas]
+        df.loc[df["Perfil"] == perfil, sobrantes] = None
+    return df
+
+
+def generar_evaluaciones(n, semilla=0, colaboradores=None, anos=ANOS):
+    """Evaluaciones ya calificadas con todas las columnas de la hoja (COLUMNAS)"""
+    entradas = generar_entradas(n, semilla, colaboradores, anos)
+    evaluaciones = calificar_lote(entradas)
+    dias = np.random.default_rng(semilla + 1).integers(1, 28, n)
+    evaluaciones["Fecha Reg"] = [f"{a}-{datos.MESES.index(m) + 1:02d}-{d:02d}"
+                                 for a, m, d in zip(evaluaciones["Año"], evaluaciones["Mes"], dias)]
+    # IDs fijos por semilla (los de la app son aleatorios) para que los datos sean reproducibles
+    evaluaciones[datos.COLUMNA_ID] = [f"r{semilla % 0x10000:04x}{i:08x}" for i in range(n)]
+    evaluaciones[datos.COLUMNA_VERSION] = 1
+    return evaluaciones
+
+
+def hoja_sintetica(n, semilla=0, **opciones_hoja):
+    """HojaFalsa con encabezados y `n` evaluaciones sintéticas"""
+    return HojaFalsa([datos.COLUMNAS] + datos._filas_para_hoja(generar_evaluaciones(n, semilla)), **opciones_hoja)
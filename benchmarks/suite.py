@@ -0,0 +1,236 @@
+"""Suite reproducible de rendimiento sobre datos sintéticos.
+
+Genera N evaluaciones con `benchmarks.generador` (misma semilla, mismos
+datos) y mide cada ruta pesada de la app contra HojaFalsa y un almacén en
+memoria, sin red: calificación, carga desde la hoja (completa y delta),
+índice del ranking, filtrado del tablero, acumulados por periodo, perfiles
+de colaborador, simulador de reglas, descarga de la base (CSV, gzip,
+Parquet), diplomas y cierre de mes. Cada etapa se repite y se
+reporta mediana y mínimo.
+
+    python -m benchmarks.suite --tamanos 10000,100000 --json base.json
+    python -m benchmarks.suite --tamanos 10000,100000 --comparar base.json
+
+Con `--comparar` termina con código 1 si alguna etapa es más lenta que la
+base por encima de la tolerancia, para usarlo en CI.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generador import generar_entradas, generar_evaluaciones
+from sac import datos
+from sac.agregados import PERIODOS, AgregadosRanking
+from sac.almacen import AlmacenLocal, configurar_almacen
+from sac.cierre import cerrar_mes, cierre_del_mes, olvidar
+from sac.colaboradores import IndiceColaboradores, tendencia
+from sac.conexion import ConexionSheets, configurar_conexion
+from sac.diplomas import exportar_diplomas_pdf, ganadores_del_mes
+from sac.exportacion import exportar_bytes
+from sac.hoja_falsa import ClienteFalso, HojaFalsa
+from sac.importacion import calificar_lote
+from sac.ranking import DIMENSIONES, IndiceRanking
+from sac.simulador import Simulador, reglas_a_tabla, tabla_a_reglas
+
+FILAS_DELTA = 100
+ESCENARIOS = 10
+PERFILES_CONSULTADOS = 100
+
+
+def _cronometrar(funcion, repeticiones, preparar=None):
+    """(mediana, mínimo) en segundos; `preparar` corre antes de cada repetición sin contar"""
+    tiempos = []
+    for _ in range(repeticiones):
+        argumento = preparar() if preparar else None
+        inicio = time.perf_counter()
+        funcion(argumento) if preparar else funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), min(tiempos)
+
+
+def _filtros(indice, ano, rng):
+    """Filtros como los del tablero: una zona y, a veces, un perfil"""
+    zonas = indice.opciones(ano, "Zona", {})
+    perfiles = indice.opciones(ano, "Perfil", {})
+    return {"Zona": [rng.choice(zonas)], "Perfil": [rng.choice(perfiles)] if rng.random() < 0.5 else []}
+
+
+def medir_tamano(n, semilla, repeticiones, max_diplomas):
+    etapas = {}
+
+    def etapa(nombre, funcion, preparar=None):
+        mediana, minimo = _cronometrar(funcion, repeticiones, preparar)
+        etapas[nombre] = {"mediana_s": round(mediana, 4), "min_s": round(minimo, 4)}
+        print(f"  {nombre:<22} {mediana:>9.4f} s  (mín {minimo:.4f})")
+
+    # --- Calificación (importación masiva) ---
+    entradas = generar_entradas(n, semilla)
+    etapa("calificacion", lambda: calificar_lote(entradas))
+
+    # --- Carga desde la hoja ---
+    df = generar_evaluaciones(n, semilla)
+    filas = datos._filas_para_hoja(df)
+    extra = datos._filas_para_hoja(generar_evaluaciones(FILAS_DELTA, semilla + 1))
+    datos.ESCRITURA_DIFERIDA = False
+    configurar_almacen(AlmacenLocal(":memory:"))
+
+    def hoja_nueva():
+        hoja = HojaFalsa([datos.COLUMNAS] + filas)
+        configurar_conexion(ConexionSheets(lambda: ClienteFalso(hoja)))
+        datos.cache_registros = datos.CacheRegistros()
+        return hoja
+
+    etapa("carga_completa", lambda _: datos.cargar_instantanea(), hoja_nueva)
+
+    def con_delta():
+        hoja = hoja_nueva()
+        datos.cargar_instantanea()
+        hoja.append_rows(extra)
+        datos.cache_registros.marcar_agregado()
+
+    etapa("carga_delta", lambda _: datos.cargar_instantanea(), con_delta)
+    vista = datos.cargar_instantanea()[0]
+
+    # --- Ranking mensual ---
+    etapa("indice_ranking", lambda: IndiceRanking(vista))
+    indice = IndiceRanking(vista)
+    ano = max(indice.anos)
+
+    def filtrar():
+        rng = np.random.default_rng(semilla)
+        for mes in datos.MESES:
+            filtros = _filtros(indice, ano, rng)
+            for dim in DIMENSIONES:
+                indice.opciones(ano, dim, filtros)
+            indice.del_mes(ano, mes, filtros)
+
+    etapa("filtrado_12_meses", filtrar)
+
+    # --- Acumulados (anual, trimestres, semestres, 12 meses) ---
+    def acumulados(agregados):
+        agregados.sincronizar(vista, 1)
+        for periodo in PERIODOS:
+            agregados.del_periodo(ano, periodo, {})
+
+    etapa("agregacion_periodos", acumulados, AgregadosRanking)
+    base = vista.iloc[:-FILAS_DELTA]
+
+    def agregados_previos():
+        agregados = AgregadosRanking()
+        agregados.sincronizar(base, 1)
+        return agregados
+
+    etapa("agregacion_delta", lambda a: a.sincronizar(vista, 1), agregados_previos)
+
+    # --- Perfil de colaborador: índice por nombre y consultas de historial ---
+    etapa("indice_colaboradores", lambda: IndiceColaboradores(vista))
+    personas = IndiceColaboradores(vista)
+    consultadas = np.random.default_rng(semilla).choice(personas.claves(), PERFILES_CONSULTADOS)
+    etapa("perfiles_colaborador", lambda: [tendencia(personas.historial([c])) for c in consultadas])
+
+    # --- Simulador: escenarios con el Fill Rate desplazado y el factor de tiempos cambiado ---
+    escenarios = []
+    for i in range(ESCENARIOS):
+        tabla = reglas_a_tabla()
+        tabla.loc[tabla["KPI"] == "FR", "Umbrales"] = ", ".join(str(99 - i % 3 - j) for j in range(3))
+        tabla.loc[tabla["Factor"] != 1, "Factor"] = 1 + (i + 1) / ESCENARIOS
+        escenarios.append(tabla_a_reglas(tabla))
+
+    def simular(simulador):
+        for reglas in escenarios:
+            simulador.comparar(vista, 1, ano, reglas)
+
+    etapa("simulacion_escenarios", simular, Simulador)
+
+    # --- Descargas ---
+    for formato, nombre in (("CSV", "csv"), ("CSV comprimido (.gz)", "csv_gz"), ("Parquet", "parquet")):
+        etapa(f"exportacion_{nombre}", lambda: exportar_bytes(vista, formato))
+    ultimo = indice.del_mes(ano, indice.mensual.loc[indice.mensual["Año"] == ano, "Mes"].iloc[-1], {})
+    ganadores = ganadores_del_mes(ultimo)[:max_diplomas]
+    etapa("diplomas_pdf", lambda: exportar_diplomas_pdf(ganadores))
+
+    # --- Cierre de mes: instantánea y todos los diplomas; luego servirla como el primer día del mes ---
+    mes = ultimo["Mes"].iloc[0]
+    etapa("cierre_mes", lambda: cerrar_mes(ano, mes, rehacer=True))
+
+    def mes_cerrado():
+        olvidar(ano, mes)
+        cierre = cierre_del_mes(ano, mes)
+        cierre.indice.posiciones_mes(ano, mes, {})
+
+    etapa("carga_mes_cerrado", mes_cerrado)
+    return etapas
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, ruta_base, tolerancia):
+    """Razón actual/base por etapa; devuelve las etapas que empeoraron más que la tolerancia"""
+    with open(ruta_base) as f:
+        base = json.load(f)["resultados"]
+    regresiones = []
+    for tamano, etapas in resultados.items():
+        for nombre, actual in etapas.items():
+            anterior = base.get(tamano, {}).get(nombre)
+            if not anterior or not anterior["mediana_s"]:
+                continue
+            razon = actual["mediana_s"] / anterior["mediana_s"]
+            marca = "  <-- regresión" if razon > 1 + tolerancia else ""
+            print(f"  {tamano:>8} {nombre:<22} x{razon:5.2f}{marca}")
+            if marca:
+                regresiones.append((tamano, nombre, razon))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", default="10000,100000", help="evaluaciones por corrida, separadas por comas")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--diplomas", type=int, default=50, help="máximo de diplomas a dibujar")
+    parser.add_argument("--json", help="ruta donde guardar los resultados")
+    parser.add_argument("--comparar", help="resultados base (JSON de una corrida anterior)")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="aumento permitido antes de marcar regresión")
+    args = parser.parse_args()
+
+    resultados = {}
+    for n in (int(t) for t in args.tamanos.split(",")):
+        print(f"{n} evaluaciones")
+        resultados[str(n)] = medir_tamano(n, args.semilla, args.repeticiones, args.diplomas)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": _commit(),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "numpy": np.__version__,
+                "plataforma": platform.platform(),
+                "semilla": args.semilla,
+                "repeticiones": args.repeticiones,
+                "resultados": resultados,
+            }, f, indent=2)
+
+    if args.comparar:
+        print(f"Comparación contra {args.comparar} (tolerancia {args.tolerancia:.0%})")
+        if comparar(resultados, args.comparar, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
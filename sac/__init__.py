@@ -0,0 +1 @@
+"""Módulos de soporte del Ranking SAC (conexión, datos, diplomas)."""
@@ -0,0 +1,168 @@
+"""Agregados acumulados por colaborador para los rankings de varios meses.
+
+Por cada colaborador (Nombre, Perfil, CEDIS, Zona) se guarda la suma y el
+número de evaluaciones de cada mes. Un registro nuevo solo toca su mes; no
+se vuelve a agrupar el historial. Cualquier ventana (año, trimestre,
+semestre, últimos 12 meses) se arma sumando esos meses: evaluaciones, suma,
+promedio, mejor mes y racha de meses seguidos evaluado. Cada consulta se
+guarda hasta que llegan datos nuevos, así que cambiar de periodo es
+inmediato.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sac.datos import MESES, clave_fila
+
+CLAVE = ["Nombre", "Perfil", "CEDIS", "Zona"]
+PERIODOS = {
+    "Año completo": (1, 12),
+    "1er trimestre": (1, 3),
+    "2do trimestre": (4, 6),
+    "3er trimestre": (7, 9),
+    "4to trimestre": (10, 12),
+    "1er semestre": (1, 6),
+    "2do semestre": (7, 12),
+    "Últimos 12 meses": None,
+}
+COLUMNAS_RESULTADO = CLAVE + ["Evaluaciones", "Suma", "Promedio", "Mejor Mes", "Mejor Puntaje", "Racha"]
+
+
+def mes_absoluto(ano, mes_idx):
+    """Meses contados desde el año 0, para que las ventanas crucen años sin casos especiales"""
+    return int(ano) * 12 + int(mes_idx)
+
+
+def texto_mes(absoluto):
+    return f"{MESES[absoluto % 12]} {absoluto // 12}"
+
+
+def _evaluaciones(df):
+    """(clave, mes absoluto, puntaje) de las filas con mes, año y puntaje válidos"""
+    mes = pd.Categorical(df["Mes"], categories=MESES).codes
+    ano = pd.to_numeric(df["Año"], errors="coerce")
+    puntos = pd.to_numeric(df["Puntaje Total"], errors="coerce")
+    validas = ((mes >= 0) & ano.notna() & puntos.notna()).to_numpy()
+    base = df.loc[validas, CLAVE].astype(str)
+    base["mes"] = ano[validas].astype(int) * 12 + mes[validas]
+    base["puntos"] = puntos[validas].astype(float)
+    return base
+
+
+def _racha(meses):
+    """Mayor número de meses consecutivos en una lista ordenada"""
+    mejor = actual = 1
+    for anterior, mes in zip(meses, meses[1:]):
+        actual = actual + 1 if mes == anterior + 1 else 1
+        mejor = max(mejor, actual)
+    return mejor
+
+
+class AgregadosRanking:
+    """Sumas mensuales por colaborador, actualizadas por registro"""
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._meses = {}          # clave -> {mes absoluto: [suma, cuenta]}
+        self._filas = 0
+        self._ultima = None
+        self._generacion = None
+        self._consultas = {}
+        self.ultimo_mes = None
+        self.reconstrucciones = 0
+
+    def _sumar(self, clave, mes, suma, cuenta):
+        acumulado = self._meses.setdefault(clave, {}).setdefault(mes, [0.0, 0])
+        acumulado[0] += suma
+        acumulado[1] += cuenta
+        if self.ultimo_mes is None or mes > self.ultimo_mes:
+            self.ultimo_mes = mes
+
+    def _reconstruir(self, df):
+        self._meses = {}
+        self.ultimo_mes = None
+        base = _evaluaciones(df)
+        grupos = base.groupby(CLAVE + ["mes"], sort=False)["puntos"].agg(["sum", "count"])
+        for (*clave, mes), (suma, cuenta) in zip(grupos.index, grupos.to_numpy()):
+            self._sumar(tuple(clave), int(mes), float(suma), int(cuenta))
+        self.reconstrucciones += 1
+
+    def agregar(self, df):
+        """Suma registros nuevos sin tocar el resto del historial"""
+        for *clave, mes, puntos in _evaluaciones(df).itertuples(index=False, name=None):
+            self._sumar(tuple(clave), int(mes), puntos, 1)
+        self._consultas.clear()
+
+    def sincronizar(self, df, generacion):
+        """Pone los agregados al día con `df`.
+
+        Si `df` solo creció (misma generación y la última fila procesada sigue
+        en su lugar) se suman las filas nuevas; si no, se reconstruye.
+        """
+        with self._candado:
+            extension = (
+                generacion == self._generacion and self._filas <= len(df)
+                and (self._filas == 0 or clave_fila(df.iloc[self._filas - 1]) == self._ultima)
+            )
+            if extension and self._filas == len(df):
+                return
+            if extension:
+                self.agregar(df.iloc[self._filas:])
+            else:
+                self._reconstruir(df)
+                self._consultas.clear()
+            self._filas = len(df)
+            self._ultima = clave_fila(df.iloc[-1]) if len(df) else None
+            self._generacion = generacion
+
+    def ventana(self, ano, periodo):
+        """(mes inicial, mes final) absolutos de un periodo de PERIODOS"""
+        if PERIODOS[periodo] is None:
+            fin = self.ultimo_mes if self.ultimo_mes is not None else mes_absoluto(ano, 11)
+            return fin - 11, fin
+        primero, ultimo = PERIODOS[periodo]
+        return mes_absoluto(ano, primero - 1), mes_absoluto(ano, ultimo - 1)
+
+    def consultar(self, inicio, fin):
+        """Ranking de la ventana [inicio, fin] ordenado por promedio (no se debe modificar)"""
+        with self._candado:
+            if (inicio, fin) in self._consultas:
+                return self._consultas[(inicio, fin)]
+            filas = []
+            for clave, meses in self._meses.items():
+                en_ventana = sorted(m for m in meses if inicio <= m <= fin)
+                if not en_ventana:
+                    continue
+                suma = sum(meses[m][0] for m in en_ventana)
+                cuenta = sum(meses[m][1] for m in en_ventana)
+                mejor = max(en_ventana, key=lambda m: meses[m][0] / meses[m][1])
+                filas.append(clave + (cuenta, suma, suma / cuenta, texto_mes(mejor),
+                                      meses[mejor][0] / meses[mejor][1], _racha(en_ventana)))
+            resultado = pd.DataFrame(filas, columns=COLUMNAS_RESULTADO)
+            resultado = resultado.sort_values("Promedio", ascending=False, kind="mergesort").reset_index(drop=True)
+            self._consultas[(inicio, fin)] = resultado
+            return resultado
+
+    def posiciones_periodo(self, ano, periodo, filtros):
+        """(ranking compartido del periodo, posiciones que pasan los filtros {dimensión: [valores]})"""
+        resultado = self.consultar(*self.ventana(ano, periodo))
+        mascara = np.ones(len(resultado), dtype=bool)
+        for dim, valores in filtros.items():
+            if valores:
+                mascara &= resultado[dim].isin(valores).to_numpy()
+        return resultado, np.flatnonzero(mascara)
+
+    def del_periodo(self, ano, periodo, filtros):
+        """Ranking del periodo con los filtros {dimensión: [valores]} del tablero"""
+        resultado, posiciones = self.posiciones_periodo(ano, periodo, filtros)
+        return resultado.iloc[posiciones].reset_index(drop=True)
+
+
+_agregados = AgregadosRanking()
+
+
+def agregados_ranking(df, generacion):
+    """Agregados del proceso puestos al día con la vista actual de los datos"""
+    _agregados.sincronizar(df, generacion)
+    return _agregados
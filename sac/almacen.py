@@ -0,0 +1,332 @@
+"""Almacén local (SQLite) delante de Google Sheets.
+
+Guarda en un archivo junto a la app:
+
+- el espejo: la última copia descargada de la hoja (encabezados + filas),
+  para que un proceso recién iniciado o una caída de la API no dejen la app
+  sin datos;
+- la bandeja de salida: escrituras aceptadas que todavía no llegan a la
+  hoja, en orden, con sus intentos y el último error;
+- los recibos: el estado de cada escritura aceptada (pendiente, enviada o
+  rechazada) para confirmarle al usuario lo que pasó con su envío;
+- los cierres de mes: el ranking congelado de cada mes cerrado y sus
+  diplomas ya dibujados (ver `sac.cierre`).
+
+`SAC_ALMACEN` cambia la ruta del archivo. Con `SAC_BACKEND=falso` el
+almacén vive en memoria para no mezclar datos de prueba con los reales.
+"""
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+DIAS_RECIBOS = 2   # Los recibos resueltos se borran después de este tiempo
+PENDIENTE, ENVIADO, RECHAZADO = "pendiente", "enviado", "rechazado"
+EN_PROCESO, CERRADO = "en_proceso", "cerrado"
+LIBRE, PROPIO, ABANDONADO = "libre", "propio", "abandonado"
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS espejo (posicion INTEGER PRIMARY KEY, fila TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS pendientes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,
+    carga TEXT NOT NULL,
+    creado TEXT NOT NULL,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    ultimo_error TEXT
+);
+CREATE TABLE IF NOT EXISTS turno_escritor (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    dueno TEXT NOT NULL,
+    renovado TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recibos (
+    id INTEGER PRIMARY KEY,
+    estado TEXT NOT NULL,
+    detalle TEXT,
+    actualizado TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conflictos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    creado TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    detalle TEXT NOT NULL,
+    carga TEXT
+);
+CREATE TABLE IF NOT EXISTS cierres (
+    ano INTEGER NOT NULL,
+    mes INTEGER NOT NULL,
+    estado TEXT NOT NULL,
+    creado TEXT NOT NULL,
+    reservado TEXT,
+    huella TEXT,
+    columnas TEXT,
+    filas TEXT,
+    pdf_completo BLOB,
+    PRIMARY KEY (ano, mes)
+);
+CREATE TABLE IF NOT EXISTS diplomas_cierre (
+    ano INTEGER NOT NULL,
+    mes INTEGER NOT NULL,
+    clave TEXT NOT NULL,
+    pdf BLOB NOT NULL,
+    PRIMARY KEY (ano, mes, clave)
+);
+"""
+
+
+def ruta_predeterminada():
+    if "SAC_ALMACEN" in os.environ:
+        return os.environ["SAC_ALMACEN"]
+    return ":memory:" if os.environ.get("SAC_BACKEND") == "falso" else "sac_local.sqlite3"
+
+
+def _ahora(dias=0):
+    return (datetime.datetime.now() - datetime.timedelta(days=dias)).isoformat(timespec="seconds")
+
+
+class AlmacenLocal:
+    """Espejo de la hoja y bandeja de escrituras pendientes en SQLite"""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or ruta_predeterminada()
+        self._candado = threading.Lock()
+        self._conexion = sqlite3.connect(self.ruta, check_same_thread=False, isolation_level=None)
+        if self.ruta != ":memory:":
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.executescript(ESQUEMA)
+        # Almacenes creados antes de que los cierres guardaran reserva y huella
+        existentes = {c[1] for c in self._conexion.execute("PRAGMA table_info(cierres)")}
+        for columna in ("reservado", "huella"):
+            if columna not in existentes:
+                self._conexion.execute(f"ALTER TABLE cierres ADD COLUMN {columna} TEXT")
+
+    def _transaccion(self, sentencias):
+        """Ejecuta [(sql, parámetros)] como una sola transacción"""
+        with self._candado:
+            cur = self._conexion.cursor()
+            cur.execute("BEGIN")
+            try:
+                for sql, parametros in sentencias:
+                    if isinstance(parametros, list):
+                        cur.executemany(sql, parametros)
+                    else:
+                        cur.execute(sql, parametros)
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            cur.execute("COMMIT")
+            return cur.lastrowid
+
+    def _consulta(self, sql, parametros=()):
+        with self._candado:
+            return self._conexion.execute(sql, parametros).fetchall()
+
+    # --- ESPEJO DE LA HOJA ---
+    def guardar_espejo(self, valores):
+        """Reemplaza el espejo por los valores de la hoja (fila 0 = encabezados)"""
+        self._transaccion([
+            ("DELETE FROM espejo", ()),
+            ("INSERT INTO espejo (posicion, fila) VALUES (?, ?)",
+             [(i, json.dumps(f)) for i, f in enumerate(valores)]),
+        ])
+
+    def agregar_al_espejo(self, inicio, filas):
+        """Filas nuevas al final del espejo; `inicio` es la posición de la primera"""
+        self._transaccion([
+            ("INSERT OR REPLACE INTO espejo (posicion, fila) VALUES (?, ?)",
+             [(inicio + i, json.dumps(f)) for i, f in enumerate(filas)]),
+        ])
+
+    def cargar_espejo(self):
+        """Valores guardados de la hoja, o None si nunca se ha descargado"""
+        filas = self._consulta("SELECT fila FROM espejo ORDER BY posicion")
+        return [json.loads(f) for (f,) in filas] if filas else None
+
+    # --- BANDEJA DE SALIDA ---
+    def encolar(self, tipo, carga):
+        """Agrega una escritura a la bandeja y devuelve su id (el número de recibo)"""
+        return self._transaccion([
+            ("INSERT INTO pendientes (tipo, carga, creado) VALUES (?, ?, ?)",
+             (tipo, json.dumps(carga), _ahora())),
+            ("INSERT INTO recibos (id, estado, actualizado) VALUES (last_insert_rowid(), ?, ?)",
+             (PENDIENTE, _ahora())),
+        ])
+
+    def tomar_turno(self, dueno, vencimiento):
+        """Deja a `dueno` a cargo de vaciar la bandeja: LIBRE, PROPIO o ABANDONADO según quién lo tenía; None si otro.
+
+        Varios procesos pueden compartir el almacén: solo uno envía a la vez,
+        en orden, para que ninguna fila se agregue dos veces. Un turno sin
+        renovar en `vencimiento` segundos se da por abandonado (quien lo tenía
+        pudo morir a medio envío).
+        """
+        limite = (datetime.datetime.now() - datetime.timedelta(seconds=vencimiento)).isoformat(timespec="seconds")
+        with self._candado:
+            cur = self._conexion.execute(
+                "INSERT OR IGNORE INTO turno_escritor (id, dueno, renovado) VALUES (1, ?, ?)", (dueno, _ahora()))
+            if cur.rowcount:
+                return LIBRE
+            anterior = self._conexion.execute("SELECT dueno FROM turno_escritor WHERE id = 1").fetchone()
+            cur = self._conexion.execute(
+                "UPDATE turno_escritor SET dueno = ?, renovado = ? WHERE id = 1 AND (dueno = ? OR renovado < ?)",
+                (dueno, _ahora(), dueno, limite))
+            if not cur.rowcount:
+                return None
+            return PROPIO if anterior and anterior[0] == dueno else ABANDONADO
+
+    def soltar_turno(self, dueno):
+        self._transaccion([("DELETE FROM turno_escritor WHERE dueno = ?", (dueno,))])
+
+    def pendientes(self):
+        """[(id, tipo, carga, intentos)] en el orden en que se aceptaron"""
+        filas = self._consulta("SELECT id, tipo, carga, intentos FROM pendientes ORDER BY id")
+        return [(i, tipo, json.loads(carga), intentos) for i, tipo, carga, intentos in filas]
+
+    def resumen_pendientes(self):
+        """(cuántas, id de la última, último error)"""
+        cuantas, ultima = self._consulta("SELECT COUNT(*), MAX(id) FROM pendientes")[0]
+        error = self._consulta("SELECT ultimo_error FROM pendientes WHERE ultimo_error IS NOT NULL "
+                               "ORDER BY id LIMIT 1")
+        return cuantas, ultima, error[0][0] if error else None
+
+    def completar(self, ids):
+        self._transaccion([
+            ("DELETE FROM pendientes WHERE id = ?", [(i,) for i in ids]),
+            ("UPDATE recibos SET estado = ?, detalle = NULL, actualizado = ? WHERE id = ?",
+             [(ENVIADO, _ahora(), i) for i in ids]),
+            ("DELETE FROM recibos WHERE estado != ? AND actualizado < ?", (PENDIENTE, _ahora(DIAS_RECIBOS))),
+        ])
+
+    def registrar_fallo(self, ids, error):
+        self._transaccion([
+            ("UPDATE pendientes SET intentos = intentos + 1, ultimo_error = ? WHERE id = ?",
+             [(str(error), i) for i in ids]),
+            ("UPDATE recibos SET detalle = ?, actualizado = ? WHERE id = ?",
+             [(f"Reintentando: {error}", _ahora(), i) for i in ids]),
+        ])
+
+    def recibos(self, ids):
+        """{id: (estado, detalle)} de los recibos pedidos (los que ya se purgaron no aparecen)"""
+        if not ids:
+            return {}
+        marcas = ",".join("?" * len(ids))
+        filas = self._consulta(f"SELECT id, estado, detalle FROM recibos WHERE id IN ({marcas})", list(ids))
+        return {i: (estado, detalle) for i, estado, detalle in filas}
+
+    # --- CONFLICTOS ---
+    def registrar_conflicto(self, tipo, detalle, carga=None):
+        self._transaccion([
+            ("INSERT INTO conflictos (creado, tipo, detalle, carga) VALUES (?, ?, ?, ?)",
+             (_ahora(), tipo, detalle, None if carga is None else json.dumps(carga))),
+        ])
+
+    def descartar(self, id_pendiente, tipo, carga, detalle):
+        """Saca una escritura de la bandeja dejándola registrada como conflicto"""
+        self._transaccion([
+            ("DELETE FROM pendientes WHERE id = ?", (id_pendiente,)),
+            ("UPDATE recibos SET estado = ?, detalle = ?, actualizado = ? WHERE id = ?",
+             (RECHAZADO, detalle, _ahora(), id_pendiente)),
+            ("INSERT INTO conflictos (creado, tipo, detalle, carga) VALUES (?, ?, ?, ?)",
+             (_ahora(), tipo, detalle, json.dumps(carga))),
+        ])
+
+    def conflictos(self, limite=20):
+        """Conflictos más recientes como [(creado, tipo, detalle)]"""
+        return self._consulta("SELECT creado, tipo, detalle FROM conflictos ORDER BY id DESC LIMIT ?", (limite,))
+
+    def total_conflictos(self):
+        return self._consulta("SELECT COUNT(*) FROM conflictos")[0][0]
+
+    # --- CIERRES DE MES ---
+    def reservar_cierre(self, ano, mes, vencimiento, rehacer=False):
+        """True si este proceso queda a cargo del cierre.
+
+        Sin `rehacer` solo si el mes no está cerrado; con `rehacer` también si
+        ya lo está (la instantánea vigente se sigue sirviendo hasta que la
+        nueva la reemplace). Una reserva de hace más de `vencimiento` segundos
+        se da por abandonada.
+        """
+        limite = (datetime.datetime.now() - datetime.timedelta(seconds=vencimiento)).isoformat(timespec="seconds")
+        with self._candado:
+            cur = self._conexion.execute(
+                "INSERT OR IGNORE INTO cierres (ano, mes, estado, creado, reservado) VALUES (?, ?, ?, ?, ?)",
+                (ano, mes, EN_PROCESO, _ahora(), _ahora()))
+            if cur.rowcount:
+                return True
+            cur = self._conexion.execute(
+                "UPDATE cierres SET reservado = ? WHERE ano = ? AND mes = ? AND (estado = ? OR ?) "
+                "AND (reservado IS NULL OR reservado < ?)",
+                (_ahora(), ano, mes, EN_PROCESO, bool(rehacer), limite))
+            return cur.rowcount > 0
+
+    def guardar_cierre(self, ano, mes, huella, columnas, filas, diplomas, pdf_completo):
+        """Publica el cierre (ranking, huella de sus datos y diplomas {clave: bytes}) en una transacción;
+        si el mes ya estaba cerrado, la instantánea nueva reemplaza a la anterior de una vez"""
+        self._transaccion([
+            ("DELETE FROM diplomas_cierre WHERE ano = ? AND mes = ?", (ano, mes)),
+            ("INSERT INTO diplomas_cierre (ano, mes, clave, pdf) VALUES (?, ?, ?, ?)",
+             [(ano, mes, clave, pdf) for clave, pdf in diplomas.items()]),
+            ("UPDATE cierres SET estado = ?, creado = ?, reservado = NULL, huella = ?, columnas = ?, filas = ?, "
+             "pdf_completo = ? WHERE ano = ? AND mes = ?",
+             (CERRADO, _ahora(), huella, json.dumps(columnas), json.dumps(filas), pdf_completo, ano, mes)),
+        ])
+
+    def liberar_cierre(self, ano, mes):
+        """Suelta la reserva sin publicar nada (un mes cerrado conserva su instantánea)"""
+        self._transaccion([
+            ("DELETE FROM cierres WHERE ano = ? AND mes = ? AND estado = ?", (ano, mes, EN_PROCESO)),
+            ("UPDATE cierres SET reservado = NULL WHERE ano = ? AND mes = ?", (ano, mes)),
+        ])
+
+    def cargar_cierre(self, ano, mes):
+        """(creado, huella, columnas, filas, pdf_completo, {clave: pdf}) de un mes cerrado, o None"""
+        with self._candado:
+            # Una sola lectura: un cierre rehecho en otro hilo no mezcla filas nuevas con diplomas viejos
+            cur = self._conexion.cursor()
+            cur.execute("BEGIN")
+            try:
+                fila = cur.execute("SELECT creado, huella, columnas, filas, pdf_completo FROM cierres "
+                                   "WHERE ano = ? AND mes = ? AND estado = ?", (ano, mes, CERRADO)).fetchall()
+                diplomas = dict(cur.execute("SELECT clave, pdf FROM diplomas_cierre WHERE ano = ? AND mes = ?",
+                                            (ano, mes)).fetchall())
+            finally:
+                cur.execute("COMMIT")
+        if not fila:
+            return None
+        creado, huella, columnas, filas, pdf_completo = fila[0]
+        return creado, huella, json.loads(columnas), json.loads(filas), pdf_completo, diplomas
+
+    def version_cierre(self, ano, mes):
+        """(creado, huella) del cierre vigente de un mes, o None; para notar que otro proceso lo rehízo"""
+        fila = self._consulta("SELECT creado, huella FROM cierres WHERE ano = ? AND mes = ? AND estado = ?",
+                              (ano, mes, CERRADO))
+        return fila[0] if fila else None
+
+    def cierres(self):
+        """[(año, mes, estado, creado, reservado, diplomas)] del más reciente al más antiguo"""
+        return self._consulta(
+            "SELECT c.ano, c.mes, c.estado, c.creado, c.reservado, "
+            "(SELECT COUNT(*) FROM diplomas_cierre d WHERE d.ano = c.ano AND d.mes = c.mes) "
+            "FROM cierres c ORDER BY c.ano DESC, c.mes DESC")
+
+
+_almacen = None
+_candado_global = threading.Lock()
+
+
+def obtener_almacen():
+    """Almacén único del proceso"""
+    global _almacen
+    with _candado_global:
+        if _almacen is None:
+            _almacen = AlmacenLocal()
+        return _almacen
+
+
+def configurar_almacen(almacen):
+    """Reemplaza el almacén del proceso (p. ej. uno en memoria para benchmarks)"""
+    global _almacen
+    with _candado_global:
+        _almacen = almacen
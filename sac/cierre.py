@@ -0,0 +1,265 @@
+"""Cierre de mes: ranking congelado y diplomas dibujados de antemano.
+
+Al terminar un mes, un hilo en segundo plano (o `python -m sac.cierre`
+desde cron) toma el ranking de ese mes tal como está, lo guarda en el
+almacén local como una instantánea que ya no cambia y dibuja todos los
+diplomas que el tablero puede pedir: el Top 3 de cada Zona / CEDIS /
+Perfil, el podio general y el podio de cada valor de un solo filtro. El
+primer día del mes, cuando todos abren el mes recién cerrado, el tablero
+lo sirve de la instantánea: no ordena, no filtra el historial y no dibuja
+ningún PDF.
+
+La reserva en SQLite (`INSERT OR IGNORE`) asegura que un solo proceso
+haga el cierre aunque haya varios servidores sobre el mismo almacén. Los
+cambios que lleguen después del cierre no mueven la instantánea: se guarda
+una huella de las filas del mes y el área de gerencia avisa cuando los
+datos vigentes ya no coinciden, para volver a cerrarlo. Mientras se rehace
+un cierre se sigue sirviendo el anterior, y el nuevo lo reemplaza en una
+sola transacción.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from sac.almacen import EN_PROCESO, obtener_almacen
+from sac.datos import MESES, _celda, _filas_para_hoja, armar_tipado, cargar_instantanea
+from sac.diplomas import clave_diploma, diploma_pdf, exportar_diplomas_pdf, ganadores_del_mes, generar_diploma_pdf
+from sac.medicion import medido
+from sac.ranking import DIMENSIONES, IndiceRanking, indice_ranking
+
+INTERVALO_CIERRE = float(os.environ.get("SAC_INTERVALO_CIERRE", 900))   # Segundos entre revisiones del hilo
+DIAS_GRACIA = int(os.environ.get("SAC_DIAS_GRACIA", 0))     # Días del mes nuevo antes de cerrar el anterior
+CIERRE_AUTOMATICO = os.environ.get("SAC_CIERRE", "automatico") == "automatico"
+VENCIMIENTO_RESERVA = 3600    # Una reserva más vieja se da por abandonada (el proceso murió a medio cierre)
+REVISION_SIN_CIERRE = 60      # Cada cuánto se vuelve a buscar en el almacén un mes sin cierre (o uno rehecho por otro proceso)
+MAX_MESES_CARGADOS = 6
+LUGARES_PODIO = 3
+
+
+def mes_por_cerrar(hoy=None, gracia=DIAS_GRACIA):
+    """(año, mes) del mes anterior, una vez pasados los días de gracia; None antes"""
+    hoy = hoy or datetime.date.today()
+    if hoy.day <= gracia:
+        return None
+    anterior = hoy.replace(day=1) - datetime.timedelta(days=1)
+    return anterior.year, MESES[anterior.month - 1]
+
+
+def _podio(df_mes):
+    top = df_mes.iloc[:LUGARES_PODIO]
+    return top.assign(Lugar=range(1, len(top) + 1)).to_dict("records")
+
+
+def diplomas_del_mes(df_mes):
+    """Colaboradores de todos los diplomas que el tablero puede pedir para el mes (sin repetidos)"""
+    colaboradores = ganadores_del_mes(df_mes) + _podio(df_mes)
+    for dim in DIMENSIONES:
+        for _, grupo in df_mes.groupby(dim, sort=False, observed=True):
+            colaboradores += _podio(grupo)
+    unicos = {}
+    for colaborador in colaboradores:
+        unicos.setdefault(clave_diploma(colaborador), colaborador)
+    return unicos
+
+
+def _texto_huella(valor):
+    # Independiente del tipo de la columna: 50.3 en float32 o float64, 2026 en Int16 o float, texto o categoría
+    valor = _celda(valor)
+    if isinstance(valor, (int, float)):
+        return format(float(valor), ".7g")
+    return str(valor)
+
+
+def huella_mes(df_mes):
+    """Huella de las filas del mes en su orden de ranking: cambia con cualquier celda, alta o baja"""
+    columnas = [c for c in df_mes.columns if c not in ("Mes Num", "Lugar Mes", "Lugar")]
+    huella = hashlib.sha256("\x1f".join(columnas).encode())
+    for fila in df_mes[columnas].itertuples(index=False, name=None):
+        huella.update(("\x1e" + "\x1f".join(map(_texto_huella, fila))).encode())
+    return huella.hexdigest()[:16]
+
+
+def _texto_clave(clave):
+    return json.dumps(list(clave), ensure_ascii=False)
+
+
+# ==========================================
+# CIERRE
+# ==========================================
+@medido("cierre.cerrar_mes")
+def cerrar_mes(ano, mes, rehacer=False):
+    """Congela el ranking de `mes` (nombre) y dibuja sus diplomas.
+
+    Devuelve True si este proceso hizo el cierre; False si ya estaba cerrado,
+    si otro proceso lo está haciendo o si el mes no tiene evaluaciones.
+    """
+    almacen = obtener_almacen()
+    ano, numero = int(ano), MESES.index(mes) + 1
+    if not almacen.reservar_cierre(ano, numero, VENCIMIENTO_RESERVA, rehacer):
+        return False
+    try:
+        df, version = cargar_instantanea()
+        if version is None:
+            raise RuntimeError("No se pudieron leer los datos para el cierre")
+        df_mes = indice_ranking(df, version).del_mes(ano, mes, {})
+        if df_mes.empty:
+            almacen.liberar_cierre(ano, numero)
+            return False
+        congelado = df_mes[list(df.columns)]
+        colaboradores = diplomas_del_mes(df_mes)
+        diplomas = {_texto_clave(c): generar_diploma_pdf(d).getvalue() for c, d in colaboradores.items()}
+        pdf_completo = exportar_diplomas_pdf(ganadores_del_mes(df_mes))
+        almacen.guardar_cierre(ano, numero, huella_mes(df_mes), list(congelado.columns),
+                               _filas_para_hoja(congelado), diplomas, pdf_completo)
+    except Exception:
+        # Un mes que ya estaba cerrado conserva su instantánea anterior
+        almacen.liberar_cierre(ano, numero)
+        raise
+    olvidar(ano, mes)
+    return True
+
+
+class CierreMes:
+    """Instantánea de un mes cerrado, con su ranking ya indexado y sus diplomas"""
+
+    def __init__(self, ano, mes, creado, huella, df, pdf_completo, diplomas):
+        self.ano = ano
+        self.mes = mes
+        self.creado = datetime.datetime.fromisoformat(creado)
+        self.huella = huella
+        self.revisado = time.monotonic()
+        self.filas = len(df)
+        self.indice = IndiceRanking(df)
+        self.pdf_completo = pdf_completo
+        self.diplomas = diplomas
+
+    def diploma_pdf(self, colaborador_dict):
+        """Bytes del diploma ya dibujado; si no se dibujó en el cierre, se dibuja como siempre"""
+        return self.diplomas.get(clave_diploma(colaborador_dict)) or diploma_pdf(colaborador_dict)
+
+    def cambios(self, indice):
+        """Evaluaciones vigentes del mes si ya no coinciden con la instantánea (None si coinciden)"""
+        vigentes = indice.del_mes(self.ano, self.mes, {})
+        return None if huella_mes(vigentes) == self.huella else len(vigentes)
+
+
+_cargados = OrderedDict()     # (año, mes) -> CierreMes o (None, hora de la última revisión)
+_candado = threading.Lock()
+
+
+def cierre_del_mes(ano, mes):
+    """CierreMes del proceso para un mes cerrado, o None si el mes sigue abierto"""
+    clave = (int(ano), mes)
+    with _candado:
+        cargado = _cargados.get(clave)
+        if isinstance(cargado, CierreMes):
+            _cargados.move_to_end(clave)
+            if time.monotonic() - cargado.revisado < REVISION_SIN_CIERRE:
+                return cargado
+            # Otro servidor (o cron con --rehacer) pudo volver a cerrarlo: basta comparar la fecha y la huella
+            if obtener_almacen().version_cierre(clave[0], MESES.index(mes) + 1) == (cargado.creado.isoformat(),
+                                                                                     cargado.huella):
+                cargado.revisado = time.monotonic()
+                return cargado
+        elif cargado is not None and time.monotonic() - cargado[1] < REVISION_SIN_CIERRE:
+            return None
+        guardado = obtener_almacen().cargar_cierre(clave[0], MESES.index(mes) + 1)
+        if guardado is None:
+            _cargados[clave] = (None, time.monotonic())
+            return None
+        creado, huella, columnas, filas, pdf_completo, diplomas = guardado
+        _cargados[clave] = CierreMes(clave[0], mes, creado, huella, armar_tipado(columnas, filas), pdf_completo,
+                                     {tuple(json.loads(c)): pdf for c, pdf in diplomas.items()})
+        while sum(isinstance(c, CierreMes) for c in _cargados.values()) > MAX_MESES_CARGADOS:
+            viejo = next(k for k, c in _cargados.items() if isinstance(c, CierreMes))
+            del _cargados[viejo]
+        return _cargados[clave]
+
+
+def olvidar(ano, mes):
+    """Descarta la instantánea cargada (tras un cierre nuevo o uno rehecho)"""
+    with _candado:
+        _cargados.pop((int(ano), mes), None)
+
+
+def cierres():
+    """Tabla de los cierres guardados, para el área de administración"""
+    return pd.DataFrame(
+        [(ano, MESES[mes - 1], estado + (" (cerrando de nuevo)" if reservado and estado != EN_PROCESO else ""),
+          creado, diplomas)
+         for ano, mes, estado, creado, reservado, diplomas in obtener_almacen().cierres()],
+        columns=["Año", "Mes", "Estado", "Fecha", "Diplomas"])
+
+
+class ProgramadorCierre:
+    """Hilo que cierra el mes anterior en cuanto empieza uno nuevo"""
+
+    def __init__(self, intervalo=INTERVALO_CIERRE):
+        self._intervalo = intervalo
+        self._evento = threading.Event()
+        self._candado = threading.Lock()
+        self._hilo = None
+        self.ultimo_cierre = None
+        self.ultimo_error = None
+
+    def iniciar(self):
+        """Arranca el hilo si no está corriendo (y si el cierre no se delegó a cron con SAC_CIERRE=manual)"""
+        if not CIERRE_AUTOMATICO:
+            return
+        with self._candado:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ciclo, name="sac-cierre", daemon=True)
+                self._hilo.start()
+
+    def _ciclo(self):
+        while True:
+            try:
+                self.revisar()
+                self.ultimo_error = None
+            except Exception as e:
+                self.ultimo_error = str(e)
+            self._evento.wait(self._intervalo)
+            self._evento.clear()
+
+    def revisar(self, hoy=None):
+        """Cierra el mes anterior si nadie lo ha cerrado; devuelve True si lo cerró este proceso"""
+        pendiente = mes_por_cerrar(hoy)
+        if pendiente is None or cierre_del_mes(*pendiente) is not None:
+            return False
+        if cerrar_mes(*pendiente):
+            self.ultimo_cierre = pendiente
+            return True
+        return False
+
+
+programador_cierre = ProgramadorCierre()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cierra un mes: congela su ranking y dibuja sus diplomas")
+    parser.add_argument("--mes", help="AAAA-MM (por omisión, el mes anterior)")
+    parser.add_argument("--rehacer", action="store_true", help="vuelve a cerrar un mes ya cerrado")
+    args = parser.parse_args()
+    if args.mes:
+        ano, numero = (int(p) for p in args.mes.split("-"))
+        mes = MESES[numero - 1]
+    else:
+        ano, mes = mes_por_cerrar(gracia=0)
+    inicio = time.perf_counter()
+    if cerrar_mes(ano, mes, rehacer=args.rehacer):
+        cierre = cierre_del_mes(ano, mes)
+        print(f"{mes} {ano} cerrado: {cierre.filas} evaluaciones, {len(cierre.diplomas)} diplomas "
+              f"({time.perf_counter() - inicio:.1f} s)")
+    else:
+        print(f"{mes} {ano} no se cerró: ya estaba cerrado, otro proceso lo está cerrando o no tiene evaluaciones")
+
+
+if __name__ == "__main__":
+    main()
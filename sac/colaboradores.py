@@ -0,0 +1,136 @@
+"""Historial por colaborador con búsqueda indexada.
+
+El nombre se captura como texto libre, así que "José Pérez", "jose perez" y
+"JOSE  PÉREZ" se guardan como personas distintas. Aquí cada nombre se
+reduce a una clave normalizada (sin acentos, mayúsculas, puntuación ni
+espacios de más) y, una vez por versión de los datos, se arma un índice
+clave -> posiciones de sus filas en el DataFrame compartido. Abrir un
+perfil es tomar un rango de ese índice: O(evaluaciones de la persona), sin
+recorrer el historial completo. Las claves casi iguales (errores de captura
+probables) también se agrupan al armar el índice.
+"""
+import re
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from sac.datos import MESES
+from sac.puntuacion import COLUMNAS_PUNTOS
+from sac.ranking import _rangos
+
+PARECIDO_MINIMO = 0.85     # Qué tan cerca (como la razón de difflib) deben estar dos claves para sugerirlas
+MAX_PARECIDOS = 5
+
+
+def normalizar_nombre(nombre):
+    """Clave de identidad: "  José  Pérez. " -> "jose perez" """
+    texto = unicodedata.normalize("NFKD", str(nombre))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^\w\s]", " ", texto).split())
+
+
+def claves_parecidas(claves, minimo=PARECIDO_MINIMO, limite=MAX_PARECIDOS):
+    """{clave: [claves casi iguales, de la más cercana a la menos]} en una pasada.
+
+    Dos claves son candidatas si quitándoles a lo más una letra a cada una
+    quedan iguales (una letra cambiada, de más o de menos). Así no se compara
+    cada clave contra todas: cada una genera tantas variantes como letras.
+    La cercanía es 2·iguales / (largo de ambas), la razón de difflib para
+    estos casos.
+    """
+    variantes = {}
+    for clave in claves:
+        for variante in {clave[:i] + clave[i + 1:] for i in range(len(clave))} | {clave}:
+            variantes.setdefault(variante, []).append(clave)
+    cercania = {}
+    for variante, grupo in variantes.items():
+        if len(grupo) < 2:
+            continue
+        for a in grupo:
+            for b in grupo:
+                razon = 2 * len(variante) / (len(a) + len(b))
+                if a != b and razon >= minimo and razon > cercania.setdefault(a, {}).get(b, 0):
+                    cercania[a][b] = razon
+    return {a: sorted(c, key=lambda b: (-c[b], b))[:limite] for a, c in cercania.items() if c}
+
+
+class IndiceColaboradores:
+    """Posiciones de las filas de cada colaborador (por clave normalizada) en el DataFrame compartido"""
+
+    def __init__(self, df):
+        self._df = df
+        codigos, nombres = pd.factorize(df["Nombre"], sort=False)
+        # Solo se normalizan los nombres distintos, no cada fila
+        claves_nombre = [normalizar_nombre(n) for n in nombres.astype(str)]
+        grupo_nombre, claves = pd.factorize(pd.Index(claves_nombre, dtype=object), sort=True)
+        grupo_nombre[[not clave for clave in claves_nombre]] = -1
+        grupos = np.where(codigos >= 0, grupo_nombre[np.maximum(codigos, 0)], -1)
+
+        validas = np.flatnonzero(grupos >= 0)
+        self._orden = validas[np.argsort(grupos[validas], kind="stable")].astype(np.int64)
+        self._rangos = {claves[g]: r for g, r in _rangos(grupos[self._orden]).items()}
+
+        # Nombre a mostrar: la escritura más usada de cada clave; las demás quedan como variantes
+        escrituras = pd.DataFrame({
+            "clave": claves_nombre, "nombre": nombres.astype(str),
+            "veces": np.bincount(codigos[codigos >= 0], minlength=len(nombres)),
+        })
+        escrituras = escrituras[escrituras["clave"] != ""].sort_values("veces", ascending=False, kind="mergesort")
+        self.nombres = dict(escrituras.drop_duplicates("clave")[["clave", "nombre"]].itertuples(index=False))
+        self.escrituras = {}
+        for clave, nombre in zip(escrituras["clave"], escrituras["nombre"]):
+            self.escrituras.setdefault(clave, []).append(nombre)
+        self._parecidos = claves_parecidas(self._rangos)
+
+    def claves(self):
+        """Claves ordenadas por el nombre que se muestra"""
+        return sorted(self._rangos, key=lambda c: self.nombres.get(c, c))
+
+    def posiciones(self, claves):
+        """Posiciones en el DataFrame de las filas de una o varias claves, en el orden de la hoja"""
+        partes = [self._orden[slice(*self._rangos[c])] for c in claves if c in self._rangos]
+        return np.sort(np.concatenate(partes)) if partes else np.array([], dtype=np.int64)
+
+    def parecidos(self, clave, limite=MAX_PARECIDOS):
+        """Otras claves casi iguales (errores de captura probables del mismo nombre), ya calculadas"""
+        return self._parecidos.get(clave, [])[:limite]
+
+    def historial(self, claves):
+        """Evaluaciones del colaborador (solo sus filas), ordenadas por año y mes"""
+        filas = self._df.iloc[self.posiciones(claves)]
+        mes = pd.Categorical(filas["Mes"].astype(str), categories=MESES).codes
+        ano = pd.to_numeric(filas["Año"], errors="coerce")
+        historial = filas.assign(**{"Mes Abs": (ano * 12 + mes).where(mes >= 0)}).dropna(subset=["Mes Abs"])
+        historial["Mes Abs"] = historial["Mes Abs"].astype(int)
+        return historial.sort_values("Mes Abs", kind="mergesort").reset_index(drop=True)
+
+
+def tendencia(historial):
+    """Promedio mensual del puntaje total y de cada KPI con datos, con el cambio contra el mes anterior.
+
+    El índice es el primer día de cada mes (para graficar en orden); los meses sin evaluación no aparecen.
+    """
+    kpis = [c for c in COLUMNAS_PUNTOS.values() if c in historial and historial[c].notna().any()]
+    columnas = ["Puntaje Total"] + kpis
+    valores = historial[columnas].apply(pd.to_numeric, errors="coerce").astype(float)
+    mensual = valores.groupby(historial["Mes Abs"], sort=True).mean()
+    mensual.insert(1, "Cambio", mensual["Puntaje Total"].diff())
+    meses = mensual.index.to_numpy()
+    mensual.index = pd.DatetimeIndex(pd.to_datetime({"year": meses // 12, "month": meses % 12 + 1, "day": 1}),
+                                     name="Mes")
+    return mensual
+
+
+_indice = None
+_candado = threading.Lock()
+
+
+def indice_colaboradores(df, version):
+    """Índice del proceso; solo se reconstruye cuando cambia la versión de los datos"""
+    global _indice
+    with _candado:
+        if _indice is None or _indice[0] != version:
+            _indice = (version, IndiceColaboradores(df))
+        return _indice[1]
@@ -0,0 +1,181 @@
+"""Conexión compartida con Google Sheets.
+
+Un solo cliente autorizado y una sola hoja abierta para todo el proceso:
+las sesiones de Streamlit la reutilizan en lugar de repetir el OAuth y el
+`client.open(...)` en cada clic. El token se renueva antes de expirar y los
+errores de cuota se reintentan con espera exponencial. Los errores del
+servidor (5xx) solo se reintentan en lecturas y escrituras de valores: un
+5xx puede llegar después de que Sheets ya agregó o borró las filas, y
+repetir esa llamada las duplicaría o borraría otras.
+"""
+import functools
+import http.client
+import importlib
+import os
+import random
+import threading
+import time
+
+from sac.medicion import medido, medir_api
+
+ALCANCE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+NOMBRE_LIBRO = "Ranking SAC DB"
+VIDA_TOKEN = 3600          # Los tokens de cuenta de servicio duran 1 hora
+MARGEN_REFRESCO = 300      # Renovamos 5 minutos antes de que expire
+CODIGOS_REINTENTABLES = {429, 500, 502, 503, 504}
+CODIGOS_RECHAZO = {429}    # La petición no se aplicó: se puede repetir cualquier operación
+NO_IDEMPOTENTES = {"append_row", "append_rows", "insert_row", "insert_rows", "delete_rows",
+                   "spreadsheet.batch_update"}     # Agregan o borran filas (deleteDimension)
+CODIGO_NO_AUTORIZADO = 401
+CODIGOS_TEMPORALES_4XX = {401, 408, 429}    # Token vencido, tiempo agotado, cuota
+ERRORES_DE_RED = (("google.auth.exceptions", "GoogleAuthError"),    # TransportError, RefreshError
+                  ("requests.exceptions", "RequestException"),
+                  ("urllib3.exceptions", "HTTPError"))
+
+
+def codigo_error(error):
+    """Extrae el código HTTP de un APIError de gspread (o de su equivalente falso)"""
+    codigo = getattr(error, "code", None)
+    if codigo is None:
+        respuesta = getattr(error, "response", None)
+        codigo = getattr(respuesta, "status_code", None)
+    return codigo
+
+
+@functools.lru_cache(maxsize=None)
+def _tipos_de_red():
+    tipos = [OSError, http.client.HTTPException]
+    for modulo, nombre in ERRORES_DE_RED:
+        try:
+            tipos.append(getattr(importlib.import_module(modulo), nombre))
+        except ImportError:
+            pass
+    return tuple(tipos)
+
+
+def es_error_de_red(error):
+    """True para errores de transporte o de renovación del token (sin respuesta de Sheets)"""
+    return isinstance(error, _tipos_de_red())
+
+
+class ConexionSheets:
+    """Cliente y hoja reutilizables con renovación de token y reintentos.
+
+    Se usa igual que una hoja de gspread: `conexion.append_row(fila)` ejecuta
+    `hoja.append_row(fila)` pasando por los reintentos.
+    """
+
+    def __init__(self, fabrica_cliente, nombre_libro=NOMBRE_LIBRO, vida_token=VIDA_TOKEN,
+                 margen_refresco=MARGEN_REFRESCO, reintentos=5, espera_base=1.0,
+                 espera_maxima=32.0, reloj=time.monotonic, dormir=time.sleep):
+        self._fabrica_cliente = fabrica_cliente
+        self._nombre_libro = nombre_libro
+        self._vida_token = vida_token
+        self._margen_refresco = margen_refresco
+        self._reintentos = reintentos
+        self._espera_base = espera_base
+        self._espera_maxima = espera_maxima
+        self._reloj = reloj
+        self._dormir = dormir
+        self._candado = threading.Lock()
+        self._hoja = None
+        self._autorizado_en = None
+        self.autorizaciones = 0
+
+    def _token_por_expirar(self):
+        edad = self._reloj() - self._autorizado_en
+        return edad >= self._vida_token - self._margen_refresco
+
+    @medido("sheets.autorizar")
+    def _autorizar(self):
+        cliente = self._fabrica_cliente()
+        self._hoja = cliente.open(self._nombre_libro).sheet1
+        self._autorizado_en = self._reloj()
+        self.autorizaciones += 1
+
+    def hoja(self):
+        """Devuelve la hoja abierta, re-autorizando solo si el token está por expirar"""
+        with self._candado:
+            if self._hoja is None or self._token_por_expirar():
+                self._autorizar()
+            return self._hoja
+
+    def invalidar(self):
+        """Fuerza una nueva autorización en la siguiente llamada"""
+        with self._candado:
+            self._hoja = None
+
+    def _espera(self, intento):
+        tope = min(self._espera_maxima, self._espera_base * (2 ** intento))
+        return random.uniform(tope / 2, tope)
+
+    def ejecutar(self, operacion, *args, **kwargs):
+        """Llama `hoja.<operacion>(...)` reintentando errores de cuota y de token.
+
+        `operacion` puede ser un atributo anidado, p. ej. "spreadsheet.batch_update".
+        Las operaciones que agregan o borran filas solo se repiten si la API las rechazó (429).
+        """
+        reintentables = CODIGOS_RECHAZO if operacion in NO_IDEMPOTENTES else CODIGOS_REINTENTABLES
+        intento = 0
+        while True:
+            funcion = self.hoja()
+            for parte in operacion.split("."):
+                funcion = getattr(funcion, parte)
+            try:
+                return medir_api(operacion, args, lambda: funcion(*args, **kwargs))
+            except Exception as e:
+                codigo = codigo_error(e)
+                if codigo == CODIGO_NO_AUTORIZADO:
+                    self.invalidar()
+                elif codigo not in reintentables:
+                    raise
+                if intento >= self._reintentos:
+                    raise
+                self._dormir(self._espera(intento))
+                intento += 1
+
+    def __getattr__(self, nombre):
+        if nombre.startswith("_"):
+            raise AttributeError(nombre)
+        return lambda *args, **kwargs: self.ejecutar(nombre, *args, **kwargs)
+
+
+# --- FÁBRICAS DE CLIENTE ---
+def cliente_google():
+    """Autoriza un cliente de gspread con los secretos de Streamlit"""
+    # gspread y oauth2client se cargan hasta la primera conexión real
+    import gspread
+    import streamlit as st
+    from oauth2client.service_account import ServiceAccountCredentials
+    creds_dict = dict(st.secrets["gcp_service_account"])
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, ALCANCE)
+    return gspread.authorize(creds)
+
+
+def _fabrica_predeterminada():
+    if os.environ.get("SAC_BACKEND") == "falso":
+        from sac.datos import COLUMNAS
+        from sac.hoja_falsa import ClienteFalso, HojaFalsa
+        cliente = ClienteFalso(HojaFalsa([COLUMNAS]))
+        return lambda: cliente
+    return cliente_google
+
+
+_conexion = None
+_candado_global = threading.Lock()
+
+
+def obtener_conexion():
+    """Conexión única del proceso, compartida por todas las sesiones"""
+    global _conexion
+    with _candado_global:
+        if _conexion is None:
+            _conexion = ConexionSheets(_fabrica_predeterminada())
+        return _conexion
+
+
+def configurar_conexion(conexion):
+    """Reemplaza la conexión del proceso (p. ej. por una con HojaFalsa en benchmarks)"""
+    global _conexion
+    with _candado_global:
+        _conexion = conexion
@@ -0,0 +1,1229 @@
+"""Lectura y escritura de evaluaciones en Google Sheets.
+
+Los registros se guardan en un caché compartido por todas las sesiones con
+un TTL configurable (`SAC_TTL_DATOS`, en segundos). Al vencer el TTL se
+sondea el número de filas de la hoja (una sola columna); si solo crecieron
+se piden las filas nuevas (`SAC_SINCRONIZACION=completa` lo desactiva). Las
+escrituras de esta app invalidan el caché al momento.
+
+La última copia de la hoja también se guarda en el almacén local (SQLite):
+al arrancar se sirve desde ahí y, si la API falla, se sigue sirviendo la
+copia anterior. Con `SAC_ESCRITURA=diferida` (predeterminado) los registros
+y ediciones se aceptan en la bandeja local y un hilo los envía a la hoja en
+lotes; las lecturas ya los incluyen mientras tanto.
+
+Cada registro lleva un ID estable y una versión que sube con cada edición.
+El modo Editor guarda solo las filas que cambió, ubicándolas por ID y
+comparando contra la versión que cargó: lo que otra persona cambió mientras
+tanto se combina si no choca y, si choca, se devuelve como `Conflicto` para
+que el administrador decida en lugar de pisarlo.
+"""
+import contextlib
+import datetime
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from sac.almacen import ABANDONADO, obtener_almacen
+from sac.conexion import CODIGOS_TEMPORALES_4XX, codigo_error, es_error_de_red, obtener_conexion
+from sac.medicion import medido
+from sac.puntuacion import COLUMNAS_ENTRADAS, COLUMNAS_PUNTOS, migrar_desglose
+
+MESES = [
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
+]
+COLUMNAS_BASE = ["Mes", "Año", "Nombre", "CEDIS", "Zona", "Perfil", "Puntaje Total", "Desglose", "Fecha Reg"]
+# Columnas numéricas por KPI (puntos y entradas crudas) después de las originales
+# Identidad de cada registro (no cambia aunque la fila se mueva) y su versión (sube al editarla)
+COLUMNA_ID = "ID"
+COLUMNA_VERSION = "Versión"
+COLUMNAS_CONTROL = [COLUMNA_ID, COLUMNA_VERSION]
+COLUMNAS = COLUMNAS_BASE + list(COLUMNAS_PUNTOS.values()) + list(COLUMNAS_ENTRADAS.values()) + COLUMNAS_CONTROL
+TTL_DATOS = float(os.environ.get("SAC_TTL_DATOS", 60))
+TTL_MAXIMO = float(os.environ.get("SAC_TTL_MAXIMO", 600))   # Descarga completa aunque el sondeo no vea cambios
+LOTE_ESCRITURA = 1000     # Filas por llamada de append_rows
+PAUSA_ESCRITURA = 1.0     # Segundos entre llamadas para no agotar la cuota de escritura por minuto
+SINCRONIZACION_INCREMENTAL = os.environ.get("SAC_SINCRONIZACION", "incremental") == "incremental"
+ESCRITURA_DIFERIDA = os.environ.get("SAC_ESCRITURA", "diferida") == "diferida"
+ESPERA_REINTENTO = 5.0            # Primer reintento del escritor tras un fallo; se duplica hasta el máximo
+ESPERA_MAXIMA_REINTENTO = 300.0
+VENCIMIENTO_TURNO = 600           # Un turno de escritor sin renovar se da por abandonado (el proceso murió)
+ERRORES_DE_CARGA = (KeyError, IndexError, TypeError, ValueError, AttributeError)    # La carga no sirve
+
+# Las sesiones reciben copias superficiales del DataFrame compartido (ver `cargar_instantanea`)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+@medido("get_sheet")
+def get_sheet():
+    """Devuelve la conexión compartida del proceso (cliente y hoja reutilizados, con reintentos)"""
+    return obtener_conexion()
+
+
+def _recortar(fila):
+    """Quita las celdas vacías del final para comparar filas sin importar el relleno"""
+    fila = list(fila)
+    while fila and fila[-1] == "":
+        fila.pop()
+    return fila
+
+
+@medido("datos.armar_dataframe")
+def _armar(encabezados, filas):
+    """DataFrame con los valores numerizados como los entrega `get_all_records`"""
+    from gspread.utils import numericise_all
+    ancho = len(encabezados)
+    registros = [numericise_all(list(f[:ancho]) + [""] * (ancho - len(f))) for f in filas]
+    return pd.DataFrame(registros, columns=encabezados)
+
+
+# --- ESQUEMA TIPADO ---
+# El caché compartido guarda cada columna con su tipo desde la descarga: categorías
+# para lo repetido, el mes como código en el orden de MESES, puntajes en float32 y la
+# fecha de registro como fecha. Si una columna trae algo que no cabe en su tipo se
+# queda como la entrega la hoja, para no perder datos al volver a escribirla.
+CATEGORICAS = ["Nombre", "CEDIS", "Zona", "Perfil", COLUMNAS_ENTRADAS["arquetipo"]]
+PUNTAJES = ["Puntaje Total"] + list(COLUMNAS_PUNTOS.values())
+NUMERICAS = [c for c in COLUMNAS_ENTRADAS.values() if c not in CATEGORICAS]
+ENTEROS = {"Año": ("Int16", 2 ** 15), COLUMNA_VERSION: ("Int32", 2 ** 31)}
+
+
+def _numerizar(valores):
+    from gspread.utils import numericise
+    return valores.map(lambda v: numericise(v) if isinstance(v, str) else v).astype(object)
+
+
+def _tipar_columna(nombre, valores):
+    """Una columna (objetos como vienen de la hoja o de la bandeja) con el tipo del esquema"""
+    vacios = (valores.isna() | (valores == "")).to_numpy()
+    if nombre == "Mes" or nombre in CATEGORICAS:
+        # En Mes y en las dimensiones una celda vacía es "" (una categoría que se muestra y se filtra como
+        # en la hoja); en las entradas crudas (Arquetipo) es NaN: no se capturó
+        texto = valores.where(~vacios, "" if nombre in COLUMNAS_BASE else None)
+        distintos = set(pd.unique(texto.dropna()))
+        if not all(isinstance(v, str) for v in distintos):    # Números en una columna de texto
+            texto = texto.map(lambda v: v if pd.isna(v) else str(v))
+            distintos = set(texto.dropna())
+        categorias = MESES + sorted(distintos - set(MESES)) if nombre == "Mes" else sorted(distintos)
+        return pd.Series(pd.Categorical(texto, categories=pd.Index(categorias, dtype=str)), index=valores.index)
+    if nombre in ("Desglose", COLUMNA_ID):
+        return valores.where(~vacios, "").astype(str)
+    if nombre == "Fecha Reg":
+        fechas = pd.to_datetime(valores.where(~vacios), format="%Y-%m-%d", errors="coerce")
+        return valores.astype(object) if (fechas.isna().to_numpy() & ~vacios).any() else fechas
+    if nombre not in ENTEROS and nombre not in PUNTAJES and nombre not in NUMERICAS:
+        return _numerizar(valores)
+
+    numeros = pd.to_numeric(valores.where(~vacios), errors="coerce").astype("float64")
+    fallidos = numeros.isna().to_numpy() & ~vacios
+    if fallidos.any():
+        # Lo que no entiende pandas (p. ej. "1,500") se intenta como lo lee gspread
+        rescatados = pd.to_numeric(_numerizar(valores[fallidos]), errors="coerce")
+        if rescatados.isna().any():
+            return _numerizar(valores)
+        numeros[fallidos] = rescatados
+    presentes = numeros.dropna()
+    if nombre in ENTEROS:
+        tipo, limite = ENTEROS[nombre]
+        if (presentes % 1 == 0).all() and (presentes.abs() < limite).all():
+            return numeros.astype(tipo)
+    if nombre in PUNTAJES and (presentes.astype("float32").astype("float64") == presentes).all():
+        return numeros.astype("float32")
+    return numeros
+
+
+def tipar(df):
+    """DataFrame con el esquema compacto (para filas que no vienen de una descarga)"""
+    return pd.DataFrame({c: _tipar_columna(c, df[c].astype(object)) for c in df.columns}, index=df.index)
+
+
+@medido("datos.armar_tipado")
+def armar_tipado(encabezados, filas):
+    """Como `_armar` pero aplicando el esquema columna por columna al leer la hoja"""
+    ancho = len(encabezados)
+    crudo = pd.DataFrame([list(f[:ancho]) + [""] * (ancho - len(f)) for f in filas],
+                         columns=range(ancho), dtype=object)
+    return pd.DataFrame({c: _tipar_columna(c, crudo[i]) for i, c in enumerate(encabezados)})
+
+
+def concatenar(df, nuevas):
+    """Agrega filas tipadas al final conservando las categorías de ambas partes"""
+    from pandas.api.types import union_categoricals
+    nuevas = nuevas.reindex(columns=df.columns)
+    columnas = {}
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype) and isinstance(nuevas[c].dtype, pd.CategoricalDtype):
+            columnas[c] = union_categoricals([df[c].array, nuevas[c].array])
+        else:
+            columnas[c] = pd.concat([df[c], nuevas[c]], ignore_index=True)
+    return pd.DataFrame(columnas)
+
+
+def para_editar(df):
+    """Copia para `st.data_editor`: las categorías vuelven a texto para poder escribir valores nuevos"""
+    editable = df.copy()
+    for c in editable.columns:
+        if isinstance(editable[c].dtype, pd.CategoricalDtype):
+            editable[c] = editable[c].astype(object)
+    return editable
+
+
+class CacheRegistros:
+    """DataFrame de registros compartido entre sesiones, con TTL e invalidación.
+
+    En modo incremental se conserva una copia local de la hoja y, cuando el
+    sondeo detecta filas nuevas, solo se piden las filas posteriores a la
+    última vista. La última fila conocida se vuelve a leer junto con el
+    delta: si ya no coincide (o la hoja tiene menos filas), alguien reescribió
+    la hoja y se hace una descarga completa.
+
+    Cada descarga se copia al espejo del almacén local. Si la hoja no
+    responde se sigue entregando la última copia (de memoria o del espejo) y
+    se vuelve a intentar después de un TTL.
+    """
+
+    def __init__(self, ttl=TTL_DATOS, ttl_maximo=TTL_MAXIMO, incremental=SINCRONIZACION_INCREMENTAL,
+                 reloj=time.monotonic):
+        self.ttl = ttl
+        self.ttl_maximo = ttl_maximo
+        self.incremental = incremental
+        self._reloj = reloj
+        self._candado = threading.RLock()
+        self._df = None
+        self._encabezados = None
+        self._filas = None
+        self._ultima_fila = None
+        self._descargado_en = None
+        self._validado_en = None
+        self._pendiente = False
+        self._forzar = False
+        self._sembrado = False
+        self._reintentar_en = None
+        self._ids = None
+        self.ultimo_error = None
+        self.version = 0
+        self.generacion = 0       # Sube con cada carga completa; los deltas solo agregan filas
+
+    def _cargar_valores(self, valores):
+        if valores:
+            self._encabezados = valores[0]
+            self._df = armar_tipado(self._encabezados, valores[1:])
+            self._ultima_fila = _recortar(valores[-1])
+        else:
+            self._encabezados = COLUMNAS
+            self._df = tipar(pd.DataFrame(columns=COLUMNAS))
+            self._ultima_fila = []
+        self._filas = len(valores)
+        self.version += 1
+        self.generacion += 1
+
+    @medido("cache.descarga_completa")
+    def _descargar(self, sheet):
+        valores = sheet.get_all_values()
+        self._cargar_valores(valores)
+        self._descargado_en = self._validado_en = self._reloj()
+        obtener_almacen().guardar_espejo(valores)
+
+    def _sembrar(self):
+        """Arranque en frío: toma la copia del almacén local y la valida en la misma lectura"""
+        self._sembrado = True
+        valores = obtener_almacen().cargar_espejo()
+        if valores:
+            self._cargar_valores(valores)
+            self._descargado_en = self._reloj()
+            self._validado_en = self._descargado_en - self.ttl
+
+    @medido("cache.delta")
+    def _descargar_delta(self, sheet, filas):
+        """Pide solo las filas nuevas (más la última conocida para verificar)"""
+        valores = sheet.get_values(f"{self._filas}:{filas}")
+        if not valores or _recortar(valores[0]) != self._ultima_fila:
+            return self._descargar(sheet)
+        nuevas = valores[1:]
+        if nuevas:
+            self._df = concatenar(self._df, armar_tipado(self._encabezados, nuevas))
+            self._ultima_fila = _recortar(nuevas[-1])
+            obtener_almacen().agregar_al_espejo(self._filas, nuevas)
+        self._filas += len(nuevas)
+        self._validado_en = self._reloj()
+        self.version += 1
+
+    @medido("cache.sondeo")
+    def _sondear(self, sheet):
+        """Cuenta las filas usadas leyendo solo la primera columna"""
+        return len(sheet.col_values(1))
+
+    def obtener(self, sheet):
+        """DataFrame vigente; solo una sesión descarga, las demás esperan el resultado"""
+        with self._candado:
+            if self._df is None and not self._sembrado:
+                self._sembrar()
+            ahora = self._reloj()
+            if self._df is not None and self._reintentar_en is not None and ahora < self._reintentar_en:
+                return self._df
+            try:
+                if self._df is None or self._forzar or ahora - self._descargado_en >= self.ttl_maximo:
+                    self._descargar(sheet)
+                elif self._pendiente or ahora - self._validado_en >= self.ttl:
+                    filas = self._sondear(sheet)
+                    if filas == self._filas:
+                        self._validado_en = ahora
+                    elif self.incremental and self._filas and filas > self._filas:
+                        self._descargar_delta(sheet, filas)
+                    else:
+                        self._descargar(sheet)
+            except Exception as e:
+                if self._df is None:
+                    raise
+                # Sin conexión: se sirve la última copia y no se reintenta en cada rerun
+                self.ultimo_error = str(e)
+                self._reintentar_en = ahora + self.ttl
+                return self._df
+            self._pendiente = self._forzar = False
+            self._reintentar_en = self.ultimo_error = None
+            return self._df
+
+    def instantanea(self, sheet):
+        """(DataFrame compartido, versión) leídos juntos; el DataFrame no se debe modificar"""
+        with self._candado:
+            return self.obtener(sheet), self.version
+
+    def encabezados(self, sheet):
+        """Encabezados de la hoja ([] si está vacía); solo lee la fila 1 si aún no hay caché"""
+        with self._candado:
+            if self._df is None:
+                return sheet.row_values(1)
+            return list(self._encabezados) if self._filas else []
+
+    def filas_en_hoja(self, ids):
+        """Fila de la hoja de cada ID según la última copia (sin confirmar), o None si alguno no aparece"""
+        with self._candado:
+            if self._df is None or COLUMNA_ID not in self._df:
+                return None
+            if self._ids is None or self._ids[0] != self.version:
+                self._ids = (self.version, pd.Index(self._df[COLUMNA_ID].astype(str)))
+            indice = self._ids[1]
+            if not indice.is_unique:
+                return None
+            posiciones = indice.get_indexer(ids)
+            return None if (posiciones < 0).any() else (posiciones + 2).tolist()
+
+    def marcar_agregado(self):
+        """Hay filas nuevas al final: la siguiente lectura sincroniza sin esperar el TTL"""
+        with self._candado:
+            self._pendiente = True
+            self._reintentar_en = None
+
+    def invalidar(self):
+        """La siguiente lectura descarga la hoja completa (la copia actual se conserva por si falla)"""
+        with self._candado:
+            self._forzar = True
+            self._reintentar_en = None
+
+
+cache_registros = CacheRegistros()
+
+
+_vista = None
+_candado_vista = threading.Lock()
+
+
+def _leer_vista():
+    """(DataFrame, versión) de la hoja con las escrituras pendientes ya aplicadas"""
+    global _vista
+    with cache_registros._candado:
+        df, version = cache_registros.instantanea(get_sheet())
+        pendientes = obtener_almacen().pendientes() if ESCRITURA_DIFERIDA else []
+    if not pendientes:
+        return df, version
+    # La bandeja solo se vacía por el principio, así que (primera, última) la identifica
+    clave = (version, pendientes[0][0], pendientes[-1][0])
+    with _candado_vista:
+        if _vista is None or _vista[0] != clave:
+            _vista = (clave, _con_pendientes(df, pendientes))
+        return _vista[1], clave
+
+
+def generacion_datos():
+    """Cambia cuando los datos dejan de ser solo una extensión de los anteriores.
+
+    Se lee antes que los datos: si cambia en medio, la siguiente lectura
+    reconstruye en lugar de sumar sobre una base distinta.
+    """
+    pendientes = obtener_almacen().pendientes() if ESCRITURA_DIFERIDA else []
+    return cache_registros.generacion, tuple(i for i, tipo, _, _ in pendientes if tipo != "agregar")
+
+
+@medido("cargar_datos")
+def cargar_datos():
+    """Descarga los datos de la nube (o los toma del caché compartido)"""
+    return cargar_instantanea()[0]
+
+
+@medido("cargar_instantanea")
+def cargar_instantanea():
+    """(DataFrame, versión) del caché compartido.
+
+    Todas las sesiones comparten los mismos datos: cada una recibe una copia
+    superficial y, con Copy-on-Write, lo que modifique se copia solo para
+    ella. Cada escritura deja una versión nueva que reemplaza a la anterior
+    de una vez; quien ya tenía la anterior la sigue leyendo completa.
+    """
+    try:
+        df, version = _leer_vista()
+    except Exception as e:
+        return pd.DataFrame(), None
+    return df.copy(deep=False), version
+
+
+def _encabezados_para_escribir(sheet):
+    """Las filas se escriben en el orden de la hoja; una hoja sin columnas por KPI las ignora"""
+    encabezados = cache_registros.encabezados(sheet)
+    if not encabezados:
+        sheet.append_row(COLUMNAS)
+        encabezados = COLUMNAS
+    return encabezados
+
+
+def nuevo_id():
+    """ID de un registro nuevo (con letra al inicio para que la hoja no lo lea como número)"""
+    return "r" + uuid.uuid4().hex[:12]
+
+
+def _vacio(valor):
+    return valor is None or valor is pd.NA or valor == "" or (isinstance(valor, float) and math.isnan(valor))
+
+
+def con_identidad(registros):
+    """Los registros con ID (uno nuevo si no traen) y versión (1 si no tienen)"""
+    if COLUMNA_ID in registros:
+        ids = registros[COLUMNA_ID].astype(object).to_numpy(copy=True)
+    else:
+        ids = np.full(len(registros), "", dtype=object)
+    faltan = np.array([_vacio(v) for v in ids], dtype=bool)
+    ids[faltan] = [nuevo_id() for _ in range(int(faltan.sum()))]
+    versiones = pd.to_numeric(registros.get(COLUMNA_VERSION, pd.Series(np.nan, index=registros.index)),
+                              errors="coerce")
+    return registros.assign(**{COLUMNA_ID: ids, COLUMNA_VERSION: versiones.fillna(1).astype(int).to_numpy()})
+
+
+@medido("guardar_registro")
+def guardar_registro(datos):
+    """Sube un nuevo registro a la nube (con ID y versión 1).
+
+    Con escritura diferida solo lo deja en la bandeja local y devuelve el
+    número de recibo; el escritor lo junta con los de las demás sesiones.
+    """
+    datos = {**datos, COLUMNA_ID: datos.get(COLUMNA_ID) or nuevo_id(), COLUMNA_VERSION: datos.get(COLUMNA_VERSION) or 1}
+    if ESCRITURA_DIFERIDA:
+        id_pendiente = obtener_almacen().encolar("agregar", {"registros": [{c: _celda(v) for c, v in datos.items()}]})
+        escritor.avisar()
+        return id_pendiente
+    sheet = get_sheet()
+    fila = [_celda(datos.get(col)) for col in _encabezados_para_escribir(sheet)]
+    sheet.append_row(fila)
+    cache_registros.marcar_agregado()
+
+
+_ultima_escritura = 0.0
+
+
+@medido("agregar_filas")
+def agregar_filas(registros, lote=LOTE_ESCRITURA, pausa=PAUSA_ESCRITURA):
+    """Sube un DataFrame de registros con pocos `append_rows`; devuelve cuántas llamadas hizo.
+
+    Con escritura diferida los deja en la bandeja como una sola escritura y
+    devuelve 0: el escritor los envía junto con los de las demás sesiones.
+    """
+    registros = con_identidad(registros)
+    if ESCRITURA_DIFERIDA:
+        obtener_almacen().encolar("agregar", {"registros": [
+            {c: _celda(v) for c, v in r.items()} for r in registros.to_dict("records")]})
+        escritor.avisar()
+        return 0
+    sheet = get_sheet()
+    llamadas = _enviar_filas(sheet, registros, lote, pausa)
+    if llamadas:
+        cache_registros.marcar_agregado()
+    return llamadas
+
+
+def _enviar_filas(sheet, registros, lote=LOTE_ESCRITURA, pausa=PAUSA_ESCRITURA):
+    global _ultima_escritura
+    filas = _filas_para_hoja(registros.reindex(columns=_encabezados_para_escribir(sheet)))
+    llamadas = 0
+    for inicio in range(0, len(filas), lote):
+        espera = _ultima_escritura + pausa - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+        sheet.append_rows(filas[inicio:inicio + lote])
+        _ultima_escritura = time.monotonic()
+        llamadas += 1
+    return llamadas
+
+
+def _celda(valor):
+    """Convierte un valor de pandas/numpy a algo que la API de Sheets acepte"""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)) or valor is pd.NaT or valor is pd.NA:
+        return ""
+    if isinstance(valor, pd.Timestamp) and valor == valor.normalize():
+        return valor.date().isoformat()
+    if hasattr(valor, "item"):
+        valor = valor.item()
+        if isinstance(valor, float) and math.isnan(valor):
+            return ""
+    if isinstance(valor, (pd.Timestamp, datetime.date)):
+        return str(valor)
+    return valor
+
+
+def _filas_para_hoja(df):
+    return [[_celda(v) for v in fila] for fila in df.itertuples(index=False, name=None)]
+
+
+def _tramos(numeros):
+    """Agrupa enteros ordenados en tramos consecutivos: [2,3,4,8] -> [(2,4),(8,8)]"""
+    tramos = []
+    for n in numeros:
+        if tramos and n == tramos[-1][1] + 1:
+            tramos[-1][1] = n
+        else:
+            tramos.append([n, n])
+    return [tuple(t) for t in tramos]
+
+
+class PlanCambios:
+    """Cambios mínimos para llevar la hoja del DataFrame original al editado"""
+
+    def __init__(self, actualizaciones, eliminaciones, agregados):
+        self.actualizaciones = actualizaciones   # [{"range": "C5:D5", "values": [[...]]}]
+        self.eliminaciones = eliminaciones       # [(fila_inicio, fila_fin)] en la hoja, 1-indexadas
+        self.agregados = agregados               # filas nuevas al final
+
+    @property
+    def vacio(self):
+        return not (self.actualizaciones or self.eliminaciones or self.agregados)
+
+    def resumen(self):
+        celdas = sum(len(a["values"][0]) for a in self.actualizaciones)
+        filas_borradas = sum(fin - inicio + 1 for inicio, fin in self.eliminaciones)
+        return f"{celdas} celdas editadas, {filas_borradas} filas eliminadas, {len(self.agregados)} filas nuevas"
+
+
+def _celdas_distintas(antes, despues):
+    """Matriz booleana de celdas que cambiaron (dos vacíos cuentan como iguales)"""
+    iguales = (antes == despues) | (antes.isna() & despues.isna())
+    # Las columnas con nulos de pandas (Int16) comparan a NA, no a False
+    return ~iguales.fillna(False).to_numpy(dtype=bool)
+
+
+def planear_cambios(original, editado, filas_hoja=None):
+    """Compara el DataFrame cargado con el editado en `st.data_editor`.
+
+    Las filas se identifican por su etiqueta de índice: la fila en la posición
+    `i` del original es la fila `i + 2` de la hoja (o `filas_hoja[i]` si el
+    original es solo una parte de la hoja). Devuelve None si cambió la
+    estructura (columnas) y hace falta reescribir todo.
+    """
+    if list(original.columns) != list(editado.columns):
+        return None
+    from gspread.utils import rowcol_to_a1
+
+    filas_hoja = np.arange(len(original)) + 2 if filas_hoja is None else np.asarray(filas_hoja)
+    conservadas = original.index.intersection(editado.index)
+    borradas = original.index.difference(editado.index)
+    nuevas = editado.index.difference(original.index)
+
+    actualizaciones = []
+    if len(conservadas):
+        despues = editado.loc[conservadas]
+        distintas = _celdas_distintas(original.loc[conservadas], despues)
+        filas = filas_hoja[original.index.get_indexer(conservadas)]
+        valores = despues.to_numpy(dtype=object)
+        for i in np.flatnonzero(distintas.any(axis=1)):
+            for inicio, fin in _tramos(np.flatnonzero(distintas[i]).tolist()):
+                rango = f"{rowcol_to_a1(filas[i], inicio + 1)}:{rowcol_to_a1(filas[i], fin + 1)}"
+                actualizaciones.append({"range": rango, "values": [[_celda(v) for v in valores[i, inicio:fin + 1]]]})
+
+    eliminaciones = _tramos(sorted(filas_hoja[original.index.get_indexer(borradas)].tolist()))
+    agregados = _filas_para_hoja(editado.loc[nuevas])
+    return PlanCambios(actualizaciones, eliminaciones, agregados)
+
+
+def aplicar_plan(sheet, plan):
+    """Envía el plan en a lo más tres llamadas: valores, borrado de filas y agregado"""
+    if plan.actualizaciones:
+        sheet.batch_update(plan.actualizaciones)
+    if plan.eliminaciones:
+        # De abajo hacia arriba para que los números de fila sigan siendo válidos
+        peticiones = [
+            {"deleteDimension": {"range": {"sheetId": sheet.hoja().id, "dimension": "ROWS",
+                                           "startIndex": inicio - 1, "endIndex": fin}}}
+            for inicio, fin in reversed(plan.eliminaciones)
+        ]
+        sheet.ejecutar("spreadsheet.batch_update", {"requests": peticiones})
+    if plan.agregados:
+        sheet.append_rows(plan.agregados)
+
+
+def reescribir_hoja(sheet, df):
+    """Borra y reescribe la hoja completa (solo cuando cambia la estructura)"""
+    sheet.clear()
+    sheet.append_rows([df.columns.tolist()] + _filas_para_hoja(df))
+
+
+@medido("actualizar_base_completa")
+def actualizar_base_completa(df, original=None):
+    """Guarda lo editado en el modo Editor enviando solo las diferencias contra `original`.
+
+    Las filas se ubican por ID y se comparan por versión (ver `aplicar_edicion`).
+    Sin `original`, o si cambiaron las columnas, se reescribe la hoja completa.
+    Devuelve el plan contra `original` (None si se reescribió).
+    """
+    plan = planear_cambios(original, df) if original is not None else None
+    if plan is None:
+        if ESCRITURA_DIFERIDA:
+            obtener_almacen().encolar("reescribir", {"columnas": df.columns.tolist(), "filas": _filas_para_hoja(df)})
+            escritor.avisar()
+        else:
+            reescribir_hoja(get_sheet(), df)
+            cache_registros.invalidar()
+    elif not plan.vacio:
+        guardar_edicion(preparar_edicion(original, df))
+    return plan
+
+
+# ==========================================
+# EDICIÓN CON VERSIONES
+# ==========================================
+def clave_fila(valores):
+    """Contenido de una fila normalizado como lo guarda la hoja, para ubicarla sin su número"""
+    from gspread.utils import numericise_all
+    texto = ["" if v is None else str(v) for v in map(_celda, valores)]
+    return tuple(_recortar(numericise_all(texto)))
+
+
+def _iguales(a, b):
+    """Dos celdas valen lo mismo una vez escritas en la hoja ("7" y 7.0, vacío y NaN)"""
+    from gspread.utils import numericise
+    a, b = _celda(a), _celda(b)
+    return a == b or numericise(str(a)) == numericise(str(b))
+
+
+def _version(fila):
+    try:
+        return int(float(fila.get(COLUMNA_VERSION) or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+class Conflicto:
+    """Fila que otra persona cambió (o borró) después de que se cargó en el editor"""
+
+    def __init__(self, tipo, fila, base, mia, actual, celdas=(), combinada=None):
+        self.tipo = tipo              # "editar" o "borrar"
+        self.fila = fila              # la fila como viene en la carga (para reconocerla al resolver)
+        self.base = base              # {columna: valor} al cargar el editor
+        self.mia = mia                # la edición (None si se quería borrar)
+        self.actual = actual          # la fila hoy (None si ya no existe)
+        self.celdas = list(celdas)    # columnas que las dos partes cambiaron distinto
+        self.combinada = combinada    # la actual con los cambios propios que no chocan
+
+    @property
+    def id(self):
+        return str(self.base.get(COLUMNA_ID) or "")
+
+    def titulo(self):
+        return f"{self.base.get('Nombre', '')} · {self.base.get('Mes', '')} {self.base.get('Año', '')}"
+
+    def descripcion(self):
+        if self.actual is None:
+            return "otra persona eliminó esta fila"
+        if self.mia is None:
+            return "otra persona la editó y tú querías eliminarla"
+        return f"otra persona también cambió {', '.join(self.celdas)}"
+
+    def detalle(self):
+        return f"{self.titulo()} ({self.id or 'sin ID'}): {self.descripcion()}"
+
+    def comparacion(self):
+        """Columnas en disputa: como estaba al cargar, la tuya y la actual"""
+        mia, actual = self.mia or {}, self.actual or {}
+        columnas = self.celdas or [
+            c for c in self.base if c not in COLUMNAS_CONTROL
+            and not (_iguales(mia.get(c, self.base[c]), self.base[c]) and _iguales(actual.get(c, self.base[c]), self.base[c]))
+        ]
+
+        def texto(fila, c):
+            return "(eliminada)" if fila is None else str(_celda(fila.get(c, "")))
+
+        return pd.DataFrame({
+            "Columna": columnas,
+            "Al cargar": [texto(self.base, c) for c in columnas],
+            "Tuya": [texto(self.mia, c) for c in columnas],
+            "Actual": [texto(self.actual, c) for c in columnas],
+        })
+
+
+def _combinar(base, mia, actual, columnas):
+    """Fusión de tres vías celda por celda: (fila combinada, columnas que chocan)"""
+    combinada = dict(actual)
+    choques = []
+    for c in columnas:
+        if c in COLUMNAS_CONTROL or c not in mia or _iguales(mia[c], base.get(c, "")):
+            continue
+        if _iguales(actual[c], base.get(c, "")) or _iguales(actual[c], mia[c]):
+            combinada[c] = mia[c]
+        else:
+            choques.append(c)
+    return combinada, choques
+
+
+def preparar_edicion(original, editado):
+    """Edición del modo Editor como filas completas (antes/después), sin números de fila.
+
+    Al aplicarla cada fila se vuelve a ubicar por su ID (o por su contenido
+    en hojas sin IDs), así que sigue aplicando aunque alguien la haya movido.
+    Las filas nuevas reciben su ID aquí para que reintentar no las duplique.
+    """
+    conservadas = original.index.intersection(editado.index)
+    cambiadas = conservadas[_celdas_distintas(original.loc[conservadas], editado.loc[conservadas]).any(axis=1)]
+    agregados = editado.loc[editado.index.difference(original.index)]
+    if COLUMNA_ID in agregados:
+        agregados = con_identidad(agregados)
+    return {
+        "columnas": original.columns.tolist(),
+        "cambios": list(zip(_filas_para_hoja(original.loc[cambiadas]), _filas_para_hoja(editado.loc[cambiadas]))),
+        "borradas": _filas_para_hoja(original.loc[original.index.difference(editado.index)]),
+        "agregados": _filas_para_hoja(agregados),
+    }
+
+
+def resumen_edicion(carga):
+    return (f"{len(carga['cambios'])} filas editadas, {len(carga['borradas'])} filas eliminadas, "
+            f"{len(carga['agregados'])} filas nuevas")
+
+
+def aplicar_edicion(df, carga):
+    """Aplica una edición sobre `df`; devuelve (DataFrame editado, conflictos).
+
+    Compara y cambia fila por fila: si la versión de la fila sigue siendo la
+    que se cargó se aplica la edición; si otra persona la cambió, sus
+    celdas y las propias se combinan cuando no chocan. Lo que choca (o una
+    fila que ya no existe) queda como `Conflicto` sin aplicar. Cada fila
+    editada sube de versión.
+    """
+    columnas = df.columns.tolist()
+    # Se trabaja por posición sobre una matriz de objetos; el DataFrame se arma una vez al final
+    valores = df.to_numpy(dtype=object, copy=True).reshape(len(df), len(columnas))
+    por_id = {}
+    if COLUMNA_ID in df:
+        for posicion, id_fila in enumerate(valores[:, columnas.index(COLUMNA_ID)]):
+            if not _vacio(id_fila):
+                por_id[str(id_fila)] = posicion
+    por_contenido = None
+
+    def como_dict(fila):
+        return dict(zip(carga["columnas"], fila))
+
+    def alinear(fila):
+        return [fila.get(c, "") for c in columnas]
+
+    def ubicar_contenido(fila):
+        # Hojas sin IDs (o filas agregadas por una versión anterior): por contenido
+        nonlocal por_contenido
+        if por_contenido is None:
+            por_contenido = {}
+            for posicion, fila_hoja in enumerate(valores):
+                por_contenido.setdefault(clave_fila(fila_hoja), []).append(posicion)
+        lugares = por_contenido.get(clave_fila(alinear(fila)))
+        return lugares.pop(0) if lugares else None
+
+    def leer(posicion):
+        return dict(zip(columnas, valores[posicion]))
+
+    def cambiar(posicion, fila, actual):
+        if COLUMNA_VERSION in fila:
+            fila[COLUMNA_VERSION] = _version(actual) + 1
+        valores[posicion] = alinear(fila)
+
+    conflictos = []
+    for antes, despues in carga["cambios"]:
+        base, mia = como_dict(antes), como_dict(despues)
+        id_fila = "" if _vacio(base.get(COLUMNA_ID)) else str(base[COLUMNA_ID])
+        if not id_fila:
+            posicion = ubicar_contenido(base)
+            if posicion is not None:
+                cambiar(posicion, mia, base)
+            elif ubicar_contenido(mia) is None:   # Si ya tiene el valor nuevo, es un reintento
+                conflictos.append(Conflicto("editar", antes, base, mia, None))
+            continue
+        posicion = por_id.get(id_fila)
+        if posicion is None:
+            conflictos.append(Conflicto("editar", antes, base, mia, None))
+            continue
+        actual = leer(posicion)
+        if _version(actual) == _version(base):
+            cambiar(posicion, mia, actual)
+            continue
+        combinada, choques = _combinar(base, mia, actual, columnas)
+        if choques:
+            conflictos.append(Conflicto("editar", antes, base, mia, actual, choques, combinada))
+        elif any(not _iguales(combinada[c], actual[c]) for c in columnas):
+            cambiar(posicion, combinada, actual)
+
+    borrar = []
+    for antes in carga["borradas"]:
+        base = como_dict(antes)
+        id_fila = "" if _vacio(base.get(COLUMNA_ID)) else str(base[COLUMNA_ID])
+        posicion = por_id.get(id_fila) if id_fila else ubicar_contenido(base)
+        if posicion is None:
+            if not id_fila:
+                conflictos.append(Conflicto("borrar", antes, base, None, None))
+            continue    # Con ID: alguien más ya la borró (o es un reintento)
+        actual = leer(posicion)
+        if id_fila and _version(actual) != _version(base):
+            conflictos.append(Conflicto("borrar", antes, base, None, actual))
+        else:
+            borrar.append(posicion)
+    editado = pd.DataFrame(valores, index=df.index, columns=columnas).drop(index=df.index[borrar])
+
+    # Las filas nuevas que ya están (reintento tras un envío parcial) no se repiten
+    agregados = [f for f in map(como_dict, carga["agregados"])
+                 if _vacio(f.get(COLUMNA_ID)) or str(f[COLUMNA_ID]) not in por_id]
+    if agregados:
+        inicio = (df.index.max() + 1) if len(df) else 0
+        nuevas = pd.DataFrame([alinear(f) for f in agregados], columns=columnas,
+                              index=range(inicio, inicio + len(agregados)))
+        editado = pd.concat([editado, nuevas.astype(object)])
+    return editado, conflictos
+
+
+def revisar_edicion(carga):
+    """Conflictos que tendría la edición contra los datos vigentes (sin escribir nada)"""
+    df, _ = _leer_vista()
+    return aplicar_edicion(df, carga)[1]
+
+
+def resolver_conflictos(carga, conflictos, conservar_mia):
+    """Nueva carga con lo elegido para cada conflicto (True: la mía, False: la actual).
+
+    Las filas en conflicto se rebasan sobre su versión actual, así que al
+    guardarlas ya no vuelven a chocar salvo que alguien las cambie otra vez.
+    """
+    columnas = carga["columnas"]
+
+    def fila(valores):
+        return [_celda(valores.get(c, "")) for c in columnas]
+
+    en_conflicto = {tuple(c.fila) for c in conflictos}
+    nueva = {
+        "columnas": columnas,
+        "cambios": [(a, d) for a, d in carga["cambios"] if tuple(a) not in en_conflicto],
+        "borradas": [b for b in carga["borradas"] if tuple(b) not in en_conflicto],
+        "agregados": list(carga["agregados"]),
+    }
+    for conflicto, mia in zip(conflictos, conservar_mia):
+        if conflicto.tipo == "borrar":
+            if mia and conflicto.actual is not None:
+                nueva["borradas"].append(fila(conflicto.actual))
+        elif conflicto.actual is None:
+            if mia:
+                nueva["agregados"].append(fila(conflicto.mia))
+        else:
+            elegida = dict(conflicto.combinada)
+            for c in conflicto.celdas:
+                elegida[c] = (conflicto.mia if mia else conflicto.actual)[c]
+            if any(not _iguales(elegida[c], conflicto.actual[c]) for c in conflicto.actual):
+                nueva["cambios"].append((fila(conflicto.actual), fila(elegida)))
+    return nueva
+
+
+def _leer_filas_editadas(sheet, carga):
+    """(filas de la hoja que toca la edición, sus números de fila), sin descargar la hoja completa.
+
+    Las filas se ubican por ID en la última copia del caché y se leen solas en
+    una llamada; las versiones se comparan contra lo leído. Devuelve None si
+    hay que releer todo: filas sin ID, un ID que el caché no conoce o uno que
+    ya no está donde el caché dice (alguien borró filas).
+    """
+    encabezados = cache_registros.encabezados(sheet)
+    if COLUMNA_ID not in encabezados:
+        return None
+    ids = []
+    for fila in [antes for antes, _ in carga["cambios"]] + carga["borradas"]:
+        id_fila = dict(zip(carga["columnas"], fila)).get(COLUMNA_ID)
+        if _vacio(id_fila):
+            return None
+        ids.append(str(id_fila))
+    ids = list(dict.fromkeys(ids))
+    filas = cache_registros.filas_en_hoja(ids)
+    if filas is None:
+        return None
+    leidas = sheet.batch_get([f"{f}:{f}" for f in filas]) if filas else []
+    columna_id = encabezados.index(COLUMNA_ID)
+    valores = []
+    for id_fila, leida in zip(ids, leidas):
+        fila = list(leida[0]) if leida else []
+        if len(fila) <= columna_id or fila[columna_id] != id_fila:
+            return None
+        valores.append(fila)
+    return _armar(encabezados, valores).astype(object), filas
+
+
+def enviar_edicion(sheet, carga):
+    """Aplica la edición sobre la hoja actual y envía solo las diferencias; devuelve los conflictos.
+
+    Lee solo las filas editadas o borradas (ver `_leer_filas_editadas`); si no
+    se pueden ubicar así, relee la hoja completa.
+    """
+    parcial = _leer_filas_editadas(sheet, carga)
+    if parcial is None:
+        valores = sheet.get_all_values()
+        original = (_armar(valores[0], valores[1:]).astype(object) if valores
+                    else pd.DataFrame(columns=carga["columnas"]))
+        filas_hoja = None
+    else:
+        original, filas_hoja = parcial
+        if carga["agregados"] and COLUMNA_ID in carga["columnas"]:
+            # Las filas nuevas que ya llegaron (reintento) se descartan con una lectura de la columna de IDs
+            columna_id = carga["columnas"].index(COLUMNA_ID)
+            ya = _ids_en_hoja(sheet)
+            carga = {**carga, "agregados": [a for a in carga["agregados"]
+                                            if _vacio(a[columna_id]) or str(a[columna_id]) not in ya]}
+    editado, conflictos = aplicar_edicion(original, carga)
+    plan = planear_cambios(original, editado, filas_hoja)
+    if not plan.vacio:
+        aplicar_plan(sheet, plan)
+    return conflictos
+
+
+@medido("guardar_edicion")
+def guardar_edicion(carga):
+    """Envía (o deja en la bandeja) una edición preparada con `preparar_edicion`.
+
+    Sin escritura diferida devuelve los conflictos que encontró al enviarla;
+    con escritura diferida devuelve [] y los que aparezcan al enviar quedan
+    registrados en el almacén.
+    """
+    if not (carga["cambios"] or carga["borradas"] or carga["agregados"]):
+        return []
+    if ESCRITURA_DIFERIDA:
+        obtener_almacen().encolar("editar", carga)
+        escritor.avisar()
+        return []
+    conflictos = enviar_edicion(get_sheet(), carga)
+    cache_registros.invalidar()
+    return conflictos
+
+
+# ==========================================
+# ESCRITURA DIFERIDA
+# ==========================================
+
+def _con_pendientes(df, pendientes):
+    """Lo que verá la hoja cuando se envíe la bandeja (para leer lo propio de inmediato)"""
+    for _, tipo, carga, _ in pendientes:
+        if tipo == "agregar":
+            nuevas = pd.DataFrame(carga["registros"]).reindex(columns=df.columns)
+            df = concatenar(df, tipar(nuevas))
+        elif tipo == "editar":
+            df = tipar(aplicar_edicion(df, carga)[0].reset_index(drop=True))
+        elif tipo == "reescribir":
+            df = tipar(pd.DataFrame(carga["filas"], columns=carga["columnas"]))
+    return df
+
+
+def _es_permanente(error):
+    """Errores que no se arreglan reintentando: un 4xx de Sheets (salvo 401/408/429) o una carga mal formada.
+
+    Todo lo demás (5xx, red, renovación del token de google.auth, errores
+    desconocidos) se reintenta: detener la bandeja es mejor que perder la
+    escritura. Un KeyError o TypeError con la misma carga volvería a fallar
+    y bloquearía la bandeja para siempre.
+    """
+    codigo = codigo_error(error)
+    if isinstance(codigo, int):
+        return 400 <= codigo < 500 and codigo not in CODIGOS_TEMPORALES_4XX
+    return isinstance(error, ERRORES_DE_CARGA) and not es_error_de_red(error)
+
+
+def _ids_en_hoja(sheet):
+    """IDs que ya están en la hoja (una lectura de la columna)"""
+    encabezados = cache_registros.encabezados(sheet)
+    if COLUMNA_ID not in encabezados:
+        return set()
+    return set(sheet.col_values(encabezados.index(COLUMNA_ID) + 1)[1:])
+
+
+class EscritorDiferido:
+    """Hilo único que vacía la bandeja local hacia la hoja.
+
+    Los agregados consecutivos se juntan en un `append_rows` por lote; las
+    ediciones se reubican contra la hoja actual y se envían como diferencias.
+    Ante un fallo temporal se detiene (para conservar el orden) y reintenta
+    con espera creciente, sin volver a agregar los IDs que ya llegaron. Un
+    error permanente saca la escritura de la bandeja y la registra como
+    conflicto; si el lote juntaba varias, se reenvían una por una para
+    rechazar solo la inválida. Con varios procesos sobre el mismo almacén,
+    el turno en SQLite deja enviar a uno solo; los demás vuelven a revisar
+    más tarde.
+    """
+
+    def __init__(self, espera=ESPERA_REINTENTO, espera_maxima=ESPERA_MAXIMA_REINTENTO):
+        self._espera = espera
+        self._espera_maxima = espera_maxima
+        self._evento = threading.Event()
+        self._candado = threading.Lock()
+        self._enviando = threading.Lock()
+        self._hilo = None
+        self._dueno = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.ultimo_envio = None
+        self.ultimo_error = None
+
+    def iniciar(self):
+        """Arranca el hilo si no está corriendo (y revisa lo que haya quedado en la bandeja)"""
+        with self._candado:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ciclo, name="sac-escritor", daemon=True)
+                self._evento.set()
+                self._hilo.start()
+
+    def avisar(self):
+        """Hay escrituras nuevas en la bandeja"""
+        self.iniciar()
+        self._evento.set()
+
+    def _ciclo(self):
+        espera = None
+        while True:
+            self._evento.wait(espera)
+            self._evento.clear()
+            try:
+                # Si otro proceso tiene el turno, se vuelve a revisar más tarde por si lo suelta con filas nuestras
+                espera = None if self.vaciar() is not None else self._espera
+                self.ultimo_error = None
+            except Exception as e:
+                self.ultimo_error = f"{type(e).__name__}: {e}"
+                espera = self._espera if espera is None else min(espera * 2, self._espera_maxima)
+
+    def _confirmar(self, almacen, ids, agregado):
+        # Bajo el candado del caché para que ninguna lectura vea la fila dos veces (o ninguna)
+        with cache_registros._candado:
+            almacen.completar(ids)
+            if agregado:
+                cache_registros.marcar_agregado()
+            else:
+                cache_registros.invalidar()
+
+    def _enviar_edicion(self, sheet, almacen, carga):
+        for conflicto in enviar_edicion(sheet, carga):
+            almacen.registrar_conflicto("editar", conflicto.detalle())
+
+    def _enviar(self, sheet, almacen, grupo, revisar=False):
+        tipo, carga = grupo[0][1], grupo[0][2]
+        if tipo == "agregar":
+            registros = [r for p in grupo for r in p[2]["registros"]]
+            if revisar or any(p[3] for p in grupo):
+                # Un intento anterior pudo llegar a la hoja (o algunos de sus lotes): no se repite lo que ya está
+                ya = _ids_en_hoja(sheet)
+                registros = [r for r in registros if r.get(COLUMNA_ID) not in ya]
+            if registros:
+                _enviar_filas(sheet, pd.DataFrame(registros))
+        elif tipo == "editar":
+            self._enviar_edicion(sheet, almacen, carga)
+        elif tipo == "reescribir":
+            reescribir_hoja(sheet, pd.DataFrame(carga["filas"], columns=carga["columnas"]))
+
+    def _rechazar(self, almacen, pendiente, error):
+        id_pendiente, tipo, carga, _ = pendiente
+        if codigo_error(error) is None:
+            detalle = f"Escritura inválida: {error!r}"
+        else:
+            detalle = f"Rechazado por Google Sheets: {error}"
+        almacen.descartar(id_pendiente, tipo, carga, detalle)
+        cache_registros.invalidar()
+
+    def _enviado(self, almacen, grupo):
+        self._confirmar(almacen, [p[0] for p in grupo], grupo[0][1] == "agregar")
+        self.ultimo_envio = datetime.datetime.now()
+        self.ultimo_error = None
+        return len(grupo)
+
+    def _uno_por_uno(self, sheet, almacen, grupo):
+        """Tras un rechazo de un lote juntado, cada escritura se envía sola: solo se descarta la inválida"""
+        enviadas = 0
+        for pendiente in grupo:
+            try:
+                self._enviar(sheet, almacen, [pendiente], revisar=True)
+            except Exception as e:
+                self.ultimo_error = str(e)
+                if not _es_permanente(e):
+                    almacen.registrar_fallo([pendiente[0]], e)
+                    raise
+                self._rechazar(almacen, pendiente, e)
+            else:
+                enviadas += self._enviado(almacen, [pendiente])
+        return enviadas
+
+    @medido("escritor.vaciar")
+    def vaciar(self):
+        """Envía la bandeja en orden; devuelve cuántas escrituras se enviaron (None si otro proceso tiene el turno)"""
+        with self._enviando:
+            almacen = obtener_almacen()
+            turno = almacen.tomar_turno(self._dueno, VENCIMIENTO_TURNO)
+            if turno is None:
+                return None
+            try:
+                return self._vaciar(almacen, revisar=turno == ABANDONADO)
+            finally:
+                almacen.soltar_turno(self._dueno)
+
+    @contextlib.contextmanager
+    def en_pausa(self):
+        """Detiene la bandeja (en este y en los demás procesos) para escribir por fuera de ella.
+
+        Solo con la bandeja vacía: lo que ya estaba aceptado se enviaría sobre
+        filas movidas. Lo que llegue mientras tanto espera en la bandeja.
+        """
+        with self._enviando:
+            almacen = obtener_almacen()
+            if almacen.tomar_turno(self._dueno, VENCIMIENTO_TURNO) is None:
+                raise ValueError("Otro servidor está enviando escrituras pendientes; intenta de nuevo en unos minutos.")
+            try:
+                if almacen.pendientes():
+                    raise ValueError("Hay escrituras pendientes de enviar a la hoja; espera a que se vacíe la bandeja.")
+                yield
+            finally:
+                almacen.soltar_turno(self._dueno)
+
+    def _vaciar(self, almacen, revisar):
+        sheet = get_sheet()
+        pendientes = almacen.pendientes()
+        enviadas = 0
+        i = 0
+        while i < len(pendientes):
+            if i and almacen.tomar_turno(self._dueno, VENCIMIENTO_TURNO) is None:
+                return enviadas     # Se tardó tanto que otro proceso tomó el turno: que él siga
+            grupo = [pendientes[i]]
+            if pendientes[i][1] == "agregar":
+                while i + len(grupo) < len(pendientes) and pendientes[i + len(grupo)][1] == "agregar":
+                    grupo.append(pendientes[i + len(grupo)])
+            try:
+                # Si el turno quedó abandonado, el proceso anterior pudo agregar parte de la bandeja
+                self._enviar(sheet, almacen, grupo, revisar=revisar and i == 0)
+            except Exception as e:
+                self.ultimo_error = str(e)
+                if not _es_permanente(e):
+                    almacen.registrar_fallo([p[0] for p in grupo], e)
+                    raise
+                if len(grupo) > 1:
+                    enviadas += self._uno_por_uno(sheet, almacen, grupo)
+                else:
+                    self._rechazar(almacen, grupo[0], e)
+            else:
+                enviadas += self._enviado(almacen, grupo)
+            i += len(grupo)
+        return enviadas
+
+
+escritor = EscritorDiferido()
+
+
+def estado_sincronizacion():
+    """Resumen para el indicador de la barra lateral"""
+    almacen = obtener_almacen()
+    if ESCRITURA_DIFERIDA:
+        escritor.iniciar()
+    pendientes, _, error = almacen.resumen_pendientes()
+    return {
+        "diferida": ESCRITURA_DIFERIDA,
+        "pendientes": pendientes,
+        "error": error or escritor.ultimo_error or cache_registros.ultimo_error,
+        "ultimo_envio": escritor.ultimo_envio,
+        "conflictos": almacen.total_conflictos(),
+    }
+
+
+def conflictos_recientes(limite=20):
+    return obtener_almacen().conflictos(limite)
+
+
+def estado_recibos(ids):
+    """{recibo: (estado, detalle)} para confirmar envíos hechos con `guardar_registro`"""
+    return obtener_almacen().recibos(ids)
+
+
+# ==========================================
+# MIGRACIÓN A COLUMNAS POR KPI
+# ==========================================
+def pendientes_migracion(df):
+    """(columnas que faltan en la hoja, filas con Desglose pero sin "Pts ...", filas sin ID)"""
+    faltantes = [c for c in COLUMNAS if c not in df.columns]
+    sin_id = int(df[COLUMNA_ID].map(_vacio).sum()) if COLUMNA_ID in df else 0
+    columnas_pts = [c for c in COLUMNAS_PUNTOS.values() if c in df.columns]
+    if not columnas_pts or "Desglose" not in df:
+        return faltantes, 0, sin_id
+    sin_pts = df[columnas_pts].replace("", np.nan).isna().all(axis=1) & (df["Desglose"].astype(str) != "")
+    return faltantes, int(sin_pts.sum()), sin_id
+
+
+@medido("migrar_columnas_kpi")
+def migrar_columnas_kpi():
+    """Migración única: agrega las columnas por KPI y de control, llena los "Pts ..."
+    parseando el Desglose y da ID y versión 1 a los registros que no tienen.
+
+    Las columnas nuevas se escriben como un solo bloque a la derecha de las
+    existentes (sin borrar la hoja). Las entradas crudas de registros viejos
+    no se pueden recuperar del Desglose y quedan vacías. Las filas se ubican
+    por posición, así que se relee la hoja justo antes de escribir y la
+    bandeja queda en pausa mientras tanto (ValueError si tiene pendientes).
+    """
+    with escritor.en_pausa():
+        sheet = get_sheet()
+        valores = sheet.get_all_values()
+        faltantes = _migrar(sheet, _armar(valores[0], valores[1:]) if valores else pd.DataFrame(columns=COLUMNAS))
+    cache_registros.invalidar()
+    return faltantes
+
+
+def _migrar(sheet, df):
+    from gspread.utils import rowcol_to_a1
+    faltantes, _, _ = pendientes_migracion(df)
+    puntos = migrar_desglose(df["Desglose"]) if "Desglose" in df else pd.DataFrame(index=df.index)
+    control = [c for c in COLUMNAS_CONTROL if c in df.columns]
+    identidad = con_identidad(df[control])
+
+    if faltantes:
+        primera = len(df.columns) + 1
+        ultima = primera + len(faltantes) - 1
+        hoja = sheet.hoja()
+        if hoja.col_count < ultima:
+            sheet.add_cols(ultima - hoja.col_count)
+        bloque = [faltantes] + _filas_para_hoja(pd.concat([puntos, identidad], axis=1).reindex(columns=faltantes))
+        sheet.batch_update([{"range": f"{rowcol_to_a1(1, primera)}:{rowcol_to_a1(len(bloque), ultima)}",
+                             "values": bloque}])
+
+    # Registros que ya tenían las columnas pero sin puntos o sin ID (p. ej. guardados durante la migración)
+    existentes = [c for c in COLUMNAS_PUNTOS.values() if c in df.columns]
+    if existentes or control:
+        actual = df.copy()
+        actual[existentes] = actual[existentes].replace("", np.nan).astype(object)
+        sin_pts = actual[existentes].isna().all(axis=1)
+        llenado = actual.copy()
+        llenado.loc[sin_pts, existentes] = puntos.loc[sin_pts, existentes]
+        for c in control:
+            llenado[c] = identidad[c].astype(object)
+            actual[c] = actual[c].astype(object)
+        plan = planear_cambios(actual, llenado)
+        if not plan.vacio:
+            aplicar_plan(sheet, plan)
+    return faltantes
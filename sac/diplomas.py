@@ -0,0 +1,251 @@
+"""Diplomas en PDF para los primeros lugares del ranking mensual.
+
+Generar un diploma cuesta un canvas completo de reportlab, así que los bytes
+se guardan en un caché LRU por contenido: los reruns y las descargas
+repetidas del mismo diploma no vuelven a dibujarlo.
+
+La exportación masiva arma un solo PDF de varias páginas (un canvas) o un
+ZIP con un archivo por ganador, dibujado en un pool de procesos. Los meses
+cerrados ya traen sus diplomas dibujados (ver `sac.cierre`).
+
+reportlab se importa hasta que se dibuja el primer diploma: las sesiones que
+no piden diplomas no lo cargan.
+"""
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+from sac.medicion import medido
+
+TAMANO_CACHE_DIPLOMAS = 256
+GRUPOS_GANADORES = ["Zona", "CEDIS", "Perfil"]
+LOTE_POR_PROCESO = 16
+MINIMO_PARALELO = 48     # Con menos diplomas no vale la pena levantar procesos
+
+
+@medido("generar_diploma_pdf")
+def generar_diploma_pdf(colaborador_dict):
+    """Genera el PDF del diploma con datos de Región, CEDIS y Área dinámica"""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4, landscape
+    
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(A4))
+    dibujar_diploma(c, colaborador_dict)
+    c.save()
+    
+    buffer.seek(0)
+    return buffer
+
+
+def dibujar_diploma(c, colaborador_dict):
+    """Dibuja un diploma como una página del canvas (permite varios por PDF)"""
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.colors import HexColor
+    
+    nombre = colaborador_dict["Nombre"]
+    puntos = f"{colaborador_dict['Puntaje Total']:.1f}"
+    mes = colaborador_dict["Mes"]
+    ano = str(colaborador_dict["Año"])
+    rank = colaborador_dict["Lugar"]
+    cedis = colaborador_dict["CEDIS"]
+    perfil = colaborador_dict["Perfil"]
+    
+    # Lógica para determinar el Área exacta según el perfil
+    if perfil in ["Jefe SAC APT", "Jefe/Sup APT Garrafón/embotellado", "Jefe/Sup APT Embotellado"]:
+        area_texto = "Almacén"
+    elif perfil in ["Jefe SAC Entrega", "JT Embotellado", "JT Garrafón"]:
+        area_texto = "Entrega"
+    elif perfil == "Jefe SAC Mixto":
+        area_texto = "Almacén/Entrega"
+    else:
+        area_texto = "Operaciones" # Respaldo por si acaso
+    
+    color_gold = HexColor("#C5A02F")
+    color_silver = HexColor("#C0C0C0")
+    color_bronze = HexColor("#CD7F32")
+    color_navy = HexColor("#001F3F")
+    color_red = HexColor("#CC0000")
+
+    rank_text = f"{rank}er LUGAR"
+    rank_color = color_gold
+    if rank == 2:
+        rank_text = f"{rank}do LUGAR"
+        rank_color = color_silver
+    elif rank == 3:
+        rank_text = f"{rank}er LUGAR"
+        rank_color = color_bronze
+
+    w, h = landscape(A4)
+    
+    # 1. BORDES
+    c.setLineWidth(15)
+    c.setStrokeColor(color_navy)
+    c.rect(20, 20, w-40, h-40, stroke=1)
+    
+    c.setLineWidth(2)
+    c.setStrokeColor(color_red)
+    c.rect(30, 30, w-60, h-60, stroke=1)
+    
+    # 2. CONTENIDO
+    c.setFillColor(color_navy)
+    
+    c.setFont("Helvetica-Bold", 60)
+    c.drawCentredString(w/2, h - 90, "SAC")
+    
+    c.setFont("Helvetica-Bold", 28)
+    c.drawCentredString(w/2, h - 140, "RECONOCIMIENTO")
+    c.drawCentredString(w/2, h - 175, "A LA EXCELENCIA SAC")
+    
+    c.setFillColor(rank_color)
+    c.setFont("Helvetica-Bold", 35)
+    c.drawCentredString(w/2, h - 230, rank_text)
+    
+    # NOMBRE DEL GANADOR
+    c.setFillColor(color_navy)
+    c.setFont("Helvetica-Bold", 45)
+    c.drawCentredString(w/2, h - 290, nombre.upper())
+    
+    # REGIÓN Y CEDIS
+    c.setFont("Helvetica-Bold", 16)
+    c.drawCentredString(w/2, h - 325, f"Región Centro | CEDIS {cedis}")
+    
+    # PÁRRAFO DE LOGRO (Con área dinámica corregida)
+    c.setFont("Helvetica", 16)
+    c.drawCentredString(w/2, h - 365, "Por su destacado desempeño en los indicadores de")
+    c.drawCentredString(w/2, h - 385, f"{area_texto} durante el mes de {mes} {ano},")
+    c.drawCentredString(w/2, h - 405, f"obteniendo un puntaje de {puntos} pts.")
+    
+    # MISIÓN SAC
+    c.setFont("Helvetica-BoldOblique", 13)
+    c.setFillColor(color_navy)
+    c.drawCentredString(w/2, h - 445, '"Servicio de Excelencia con Operación de alto desempeño y Productividad')
+    c.drawCentredString(w/2, h - 465, 'a Bajo Costo, haciendo las cosas bien y a la primera."')
+    
+    # 3. FIRMAS
+    c.setLineWidth(1)
+    c.setStrokeColor(color_navy)
+    y_firmas = 70
+    w_firma = 200
+    
+    x_f1 = w/4
+    c.line(x_f1 - w_firma/2, y_firmas, x_f1 + w_firma/2, y_firmas)
+    c.setFont("Helvetica", 11)
+    c.drawCentredString(x_f1, y_firmas - 15, "Director Comercial Centro")
+    
+    x_f2 = w/2
+    c.line(x_f2 - w_firma/2, y_firmas, x_f2 + w_firma/2, y_firmas)
+    c.setFont("Helvetica", 11)
+    c.drawCentredString(x_f2, y_firmas - 15, "Gerente SAC Sr. Centro")
+    
+    x_f3 = 3*w/4
+    c.line(x_f3 - w_firma/2, y_firmas, x_f3 + w_firma/2, y_firmas)
+    c.setFont("Helvetica", 11)
+    c.drawCentredString(x_f3, y_firmas - 15, "Dir GGyC Centro")
+    
+    c.showPage()
+
+
+def clave_diploma(colaborador_dict):
+    """Todo lo que cambia el contenido del diploma (el puntaje se imprime con 1 decimal)"""
+    return (
+        colaborador_dict["Nombre"], colaborador_dict["Mes"], str(colaborador_dict["Año"]),
+        int(colaborador_dict["Lugar"]), colaborador_dict["CEDIS"], colaborador_dict["Perfil"],
+        round(float(colaborador_dict["Puntaje Total"]), 1),
+    )
+
+
+@lru_cache(maxsize=TAMANO_CACHE_DIPLOMAS)
+def _diploma_en_cache(nombre, mes, ano, lugar, cedis, perfil, puntaje):
+    return generar_diploma_pdf({
+        "Nombre": nombre, "Mes": mes, "Año": ano, "Lugar": lugar,
+        "CEDIS": cedis, "Perfil": perfil, "Puntaje Total": puntaje,
+    }).getvalue()
+
+
+def diploma_pdf(colaborador_dict):
+    """Bytes del diploma; se dibuja una sola vez por contenido"""
+    return _diploma_en_cache(*clave_diploma(colaborador_dict))
+
+
+# ==========================================
+# EXPORTACIÓN MASIVA
+# ==========================================
+def ganadores_del_mes(df_mes, grupos=GRUPOS_GANADORES, lugares=3):
+    """Top 3 de cada combinación de `grupos`, con su "Lugar" dentro del grupo"""
+    df_sorted = df_mes.sort_values(by="Puntaje Total", ascending=False, kind="stable")
+    lugar = df_sorted.groupby(grupos, sort=False, dropna=False).cumcount() + 1
+    ganadores = df_sorted.assign(Lugar=lugar)[lugar <= lugares]
+    return ganadores.sort_values(grupos + ["Lugar"]).to_dict("records")
+
+
+def _limpiar(texto):
+    return str(texto).replace("/", "-").replace(" ", "_")
+
+
+def nombre_archivo_diploma(colaborador_dict):
+    return f"Diploma_SAC_{_limpiar(colaborador_dict['Nombre'])}_{colaborador_dict['Mes']}_{colaborador_dict['Año']}.pdf"
+
+
+def _ruta_en_zip(colaborador_dict):
+    carpeta = "/".join(_limpiar(colaborador_dict[g]) for g in GRUPOS_GANADORES)
+    return f"{carpeta}/{colaborador_dict['Lugar']}_{nombre_archivo_diploma(colaborador_dict)}"
+
+
+@medido("exportar_diplomas_pdf")
+def exportar_diplomas_pdf(colaboradores, progreso=None):
+    """Un solo PDF con una página por diploma, reutilizando un canvas"""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4, landscape
+    
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(A4))
+    for i, colaborador in enumerate(colaboradores, 1):
+        dibujar_diploma(c, colaborador)
+        if progreso:
+            progreso(i, len(colaboradores))
+    c.save()
+    return buffer.getvalue()
+
+
+def _dibujar_lote(lote):
+    return [(_ruta_en_zip(c), diploma_pdf(c)) for c in lote]
+
+
+@medido("exportar_diplomas_zip")
+def exportar_diplomas_zip(colaboradores, procesos=None, progreso=None, dibujados=None):
+    """ZIP con un PDF por ganador; los lotes se dibujan en paralelo.
+
+    `dibujados` ({clave_diploma: bytes}, p. ej. los de un mes cerrado) se
+    escriben tal cual; solo se dibujan los que falten.
+    """
+    dibujados = dibujados or {}
+    listos = [(_ruta_en_zip(c), dibujados[clave_diploma(c)]) for c in colaboradores if clave_diploma(c) in dibujados]
+    faltan = [c for c in colaboradores if clave_diploma(c) not in dibujados]
+    lotes = [faltan[i:i + LOTE_POR_PROCESO] for i in range(0, len(faltan), LOTE_POR_PROCESO)]
+    buffer = io.BytesIO()
+    hechos = 0
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        def guardar(archivos):
+            nonlocal hechos
+            for ruta, datos in archivos:
+                zf.writestr(ruta, datos)
+            hechos += len(archivos)
+            if progreso:
+                progreso(hechos, len(colaboradores))
+
+        if listos:
+            guardar(listos)
+        if len(faltan) < MINIMO_PARALELO or (procesos or os.cpu_count() or 1) == 1:
+            for lote in lotes:
+                guardar(_dibujar_lote(lote))
+        else:
+            # "spawn" evita heredar los hilos del servidor de Streamlit en el fork
+            contexto = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+                for futuro in as_completed([pool.submit(_dibujar_lote, lote) for lote in lotes]):
+                    guardar(futuro.result())
+    return buffer.getvalue()
@@ -0,0 +1,135 @@
+"""Descarga de la base en bloques: CSV, CSV comprimido, Parquet o Excel.
+
+Los filtros (año, zona, perfil) se resuelven como posiciones sobre el
+DataFrame compartido, sin copiarlo; después se convierte un bloque de
+`TAMANO_BLOQUE` filas a la vez y se escribe al destino. Así la memoria extra
+es un bloque más el archivo de salida (que comprimido es mucho menor que la
+base), en lugar del CSV completo como texto, su copia en bytes y la copia
+guardada por `st.cache_data`.
+"""
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+
+from sac.datos import COLUMNAS
+from sac.medicion import medido
+
+TAMANO_BLOQUE = 5000
+COLUMNAS_TEXTO = {"Mes", "Nombre", "CEDIS", "Zona", "Perfil", "Desglose", "Fecha Reg", "Arquetipo", "ID"}
+COLUMNAS_ENTERAS = {"Año", "Versión"}
+FORMATOS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV comprimido (.gz)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel (.xlsx)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def posiciones(df, anos=None, zonas=None, perfiles=None):
+    """Filas que pasan los filtros (una lista vacía o None no filtra)"""
+    mascara = np.ones(len(df), dtype=bool)
+    if anos:
+        mascara &= pd.to_numeric(df["Año"], errors="coerce").isin([int(a) for a in anos]).to_numpy()
+    for columna, valores in (("Zona", zonas), ("Perfil", perfiles)):
+        if valores:
+            mascara &= df[columna].astype(str).isin(valores).to_numpy()
+    return np.flatnonzero(mascara)
+
+
+def bloques(df, filas, tamano=TAMANO_BLOQUE):
+    """DataFrames de a lo más `tamano` filas, en el orden de la base"""
+    for inicio in range(0, len(filas), tamano):
+        yield df.iloc[filas[inicio:inicio + tamano]]
+
+
+def _tipar(bloque):
+    """Texto o número por columna, igual en todos los bloques (Parquet exige un solo esquema)"""
+    tipado = {}
+    for col in bloque.columns:
+        if col in COLUMNAS_TEXTO or col not in COLUMNAS:
+            tipado[col] = bloque[col].astype(str).where(bloque[col].notna() & (bloque[col] != ""))
+        elif col in COLUMNAS_ENTERAS:
+            tipado[col] = pd.to_numeric(bloque[col], errors="coerce").astype("Int64")
+        else:
+            tipado[col] = pd.to_numeric(bloque[col], errors="coerce").astype("float64")
+    return pd.DataFrame(tipado)
+
+
+# --- ESCRITORES ---
+def _csv(partes, destino):
+    for i, bloque in enumerate(partes):
+        destino.write(bloque.to_csv(index=False, header=i == 0).encode("utf-8"))
+
+
+def _csv_gz(partes, destino):
+    with gzip.GzipFile(fileobj=destino, mode="wb", compresslevel=6) as comprimido:
+        _csv(partes, comprimido)
+
+
+def _parquet(partes, destino):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Para exportar Parquet instala pyarrow (pip install pyarrow) o elige CSV.")
+    escritor = None
+    for bloque in partes:
+        tabla = pa.Table.from_pandas(_tipar(bloque), preserve_index=False)
+        if escritor is None:
+            escritor = pq.ParquetWriter(destino, tabla.schema, compression="zstd")
+        escritor.write_table(tabla.cast(escritor.schema))
+    if escritor is not None:
+        escritor.close()
+
+
+def _xlsx(partes, destino):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ValueError("Para exportar Excel instala openpyxl (pip install openpyxl) o elige CSV.")
+    # write_only va pasando las filas a un archivo temporal en vez de guardarlas como celdas
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Ranking SAC")
+    encabezado = True
+    for bloque in partes:
+        tipado = _tipar(bloque)
+        if encabezado:
+            hoja.append(list(tipado.columns))
+            encabezado = False
+        for fila in tipado.astype(object).where(tipado.notna(), None).itertuples(index=False, name=None):
+            hoja.append(fila)
+    libro.save(destino)
+
+
+ESCRITORES = {
+    "CSV": _csv,
+    "CSV comprimido (.gz)": _csv_gz,
+    "Parquet": _parquet,
+    "Excel (.xlsx)": _xlsx,
+}
+
+
+@medido("exportar_base")
+def exportar(df, formato, destino, anos=None, zonas=None, perfiles=None, tamano=TAMANO_BLOQUE):
+    """Escribe las filas filtradas en `destino` (archivo binario); devuelve cuántas se exportaron"""
+    filas = posiciones(df, anos, zonas, perfiles)
+    partes = bloques(df, filas, tamano)
+    if len(filas) == 0:
+        # Sin filas igual se entrega un archivo con encabezados
+        partes = iter([df.iloc[:0]])
+    ESCRITORES[formato](partes, destino)
+    return len(filas)
+
+
+def exportar_bytes(df, formato, **filtros):
+    """El archivo completo en memoria, para `st.download_button`"""
+    buffer = io.BytesIO()
+    exportar(df, formato, buffer, **filtros)
+    return buffer.getvalue()
+
+
+def nombre_archivo(formato, filtrado):
+    extension = FORMATOS[formato][0]
+    return f"ranking_sac_{'filtrado' if filtrado else 'completo'}.{extension}"
@@ -0,0 +1,185 @@
+"""Backend local que imita la parte de gspread que usa la app.
+
+Sirve para correr la app y las pruebas de carga sin red ni credenciales:
+`SAC_BACKEND=falso streamlit run streamlit_app.py`
+"""
+import threading
+import time
+from collections import Counter
+
+
+class ErrorCuotaFalso(Exception):
+    """Equivalente local de un APIError 429 (cuota excedida)"""
+    code = 429
+
+
+def _numerizar(valor):
+    """Convierte '12' -> 12 y '9.5' -> 9.5 como lo hace get_all_records"""
+    if not isinstance(valor, str) or valor == "":
+        return valor
+    try:
+        return int(valor)
+    except ValueError:
+        try:
+            return float(valor)
+        except ValueError:
+            return valor
+
+
+def _a_texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def _a1_a_filacol(celda):
+    from gspread.utils import a1_to_rowcol
+    return a1_to_rowcol(celda)
+
+
+class HojaFalsa:
+    """Hoja en memoria con la interfaz mínima de gspread.Worksheet"""
+
+    def __init__(self, filas=None, latencia=0.0, latencia_por_celda=0.0, fallos_cuota=0):
+        self._filas = [list(f) for f in (filas or [])]
+        self._candado = threading.Lock()
+        self.latencia = latencia
+        self.latencia_por_celda = latencia_por_celda
+        self.fallos_cuota = fallos_cuota
+        self.llamadas = Counter()
+        self.celdas_enviadas = 0
+        self.id = 0
+        self.spreadsheet = LibroFalso(self)
+
+    def _registrar(self, operacion, celdas=0):
+        self.llamadas[operacion] += 1
+        self.celdas_enviadas += celdas
+        if self.latencia or self.latencia_por_celda:
+            time.sleep(self.latencia + celdas * self.latencia_por_celda)
+        if self.fallos_cuota > 0:
+            self.fallos_cuota -= 1
+            raise ErrorCuotaFalso(f"Cuota excedida en {operacion}")
+
+    @property
+    def row_count(self):
+        return len(self._filas)
+
+    @property
+    def col_count(self):
+        return max([26] + [len(f) for f in self._filas])
+
+    def add_cols(self, cols):
+        self._registrar("add_cols")
+
+    def row_values(self, fila):
+        self._registrar("row_values")
+        with self._candado:
+            if fila > len(self._filas):
+                return []
+            return [_a_texto(v) for v in self._filas[fila - 1]]
+
+    def get_all_values(self):
+        self._registrar("get_all_values")
+        with self._candado:
+            return [[_a_texto(v) for v in fila] for fila in self._filas]
+
+    def get_all_records(self):
+        self._registrar("get_all_records")
+        with self._candado:
+            if not self._filas:
+                return []
+            encabezados = [_a_texto(v) for v in self._filas[0]]
+            registros = []
+            for fila in self._filas[1:]:
+                valores = [_numerizar(_a_texto(v)) for v in fila]
+                valores += [""] * (len(encabezados) - len(valores))
+                registros.append(dict(zip(encabezados, valores)))
+            return registros
+
+    def get_values(self, rango=None):
+        """Acepta rangos de filas completas ('5:9') o ninguno para toda la hoja"""
+        self._registrar("get_values")
+        with self._candado:
+            filas = self._filas
+            if rango:
+                inicio, fin = (int(x) for x in rango.split(":"))
+                filas = filas[inicio - 1:fin]
+            ancho = max((len(f) for f in filas), default=0)
+            return [[_a_texto(v) for v in f] + [""] * (ancho - len(f)) for f in filas]
+
+    def batch_get(self, rangos, **kwargs):
+        """Solo rangos de filas completas ('5:5'), uno por elemento, como `Worksheet.batch_get`"""
+        self._registrar("batch_get")
+        with self._candado:
+            resultado = []
+            for rango in rangos:
+                inicio, fin = (int(x) for x in rango.split(":"))
+                resultado.append([[_a_texto(v) for v in f] for f in self._filas[inicio - 1:fin]])
+            return resultado
+
+    def col_values(self, col):
+        self._registrar("col_values")
+        with self._candado:
+            valores = [_a_texto(f[col - 1]) if len(f) >= col else "" for f in self._filas]
+        while valores and valores[-1] == "":
+            valores.pop()
+        return valores
+
+    def append_row(self, valores, **kwargs):
+        self._registrar("append_row", len(valores))
+        with self._candado:
+            self._filas.append(list(valores))
+
+    def append_rows(self, valores, **kwargs):
+        self._registrar("append_rows", sum(len(f) for f in valores))
+        with self._candado:
+            self._filas.extend(list(f) for f in valores)
+
+    def batch_update(self, datos, **kwargs):
+        self._registrar("batch_update", sum(len(f) for d in datos for f in d["values"]))
+        with self._candado:
+            for d in datos:
+                fila, col = _a1_a_filacol(d["range"].split(":")[0])
+                for i, valores in enumerate(d["values"]):
+                    while len(self._filas) < fila + i:
+                        self._filas.append([])
+                    destino = self._filas[fila + i - 1]
+                    destino.extend([""] * (col - 1 + len(valores) - len(destino)))
+                    destino[col - 1:col - 1 + len(valores)] = valores
+
+    def _batch_update_libro(self, cuerpo):
+        """Solo soporta `deleteDimension` de filas, lo que usa el modo Editor"""
+        self._registrar("spreadsheet.batch_update")
+        with self._candado:
+            for peticion in cuerpo["requests"]:
+                rango = peticion["deleteDimension"]["range"]
+                del self._filas[rango["startIndex"]:rango["endIndex"]]
+
+    def clear(self):
+        self._registrar("clear")
+        with self._candado:
+            self._filas = []
+
+
+class LibroFalso:
+    """Libro con una sola hoja, como `client.open(...)`"""
+
+    def __init__(self, hoja):
+        self.sheet1 = hoja
+
+    def batch_update(self, cuerpo):
+        return self.sheet1._batch_update_libro(cuerpo)
+
+
+class ClienteFalso:
+    """Cliente que devuelve siempre el mismo libro en memoria"""
+
+    def __init__(self, hoja=None):
+        self.hoja = hoja if hoja is not None else HojaFalsa()
+        self.aperturas = 0
+
+    def open(self, nombre):
+        self.aperturas += 1
+        return LibroFalso(self.hoja)
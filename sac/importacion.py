@@ -0,0 +1,216 @@
+"""Importación masiva de evaluaciones desde CSV o Excel.
+
+El archivo se lee por lotes (nunca completo en memoria), cada lote se valida
+y se califica con el mismo motor del formulario, y las filas válidas se
+suben con `append_rows` por bloques en lugar de un `append_row` por
+evaluación (o quedan en la bandeja con escritura diferida). Los errores se
+reportan por número de fila del archivo.
+
+El ID de cada evaluación sale del contenido del archivo y de su número de
+fila: si una importación falla a medias, volver a subir el mismo archivo
+salta las filas que ya llegaron en lugar de duplicarlas.
+"""
+import datetime
+import hashlib
+
+import pandas as pd
+
+from sac.datos import COLUMNA_ID, COLUMNAS, LOTE_ESCRITURA, MESES, agregar_filas, cargar_instantanea
+from sac.puntuacion import ARQUETIPOS, ENTRADAS, OPCIONES_OBJETIVO, REGLAS, calcular_puntajes, columnas_kpi, desgloses
+
+TAMANO_LOTE = LOTE_ESCRITURA
+
+# Encabezado del archivo -> entrada del motor de puntuación
+COLUMNAS_KPI = {
+    "Salida": "salida",
+    "Visita": "visita",
+    "Fill Rate": "fill_rate",
+    "Proximidad": "proximidad",
+    "Entrega Perfecta": "entrega_perfecta",
+    "OOS": "oos",
+    "Merma": "merma",
+    "Arquetipo": "arquetipo",
+    "Diferencia Inventario": "dif_inventario",
+    "Rotura": "rotura",
+    "Falseo": "falseo",
+}
+COLUMNAS_IDENTIDAD = ["Mes", "Año", "Nombre", "CEDIS", "Zona", "Perfil"]
+COLUMNAS_PLANTILLA = COLUMNAS_IDENTIDAD + list(COLUMNAS_KPI)
+ENTRADAS_HORA = {"salida", "visita"}
+ENTRADAS_TEXTO = {"arquetipo", "rotura"}
+ENTRADAS_CONTEO = {e for e, d in ENTRADAS.items() if d["tipo"] == "conteo"}   # Enteros >= 0, como en el formulario
+
+
+def plantilla_csv():
+    """CSV vacío con los encabezados que espera la importación"""
+    return (",".join(COLUMNAS_PLANTILLA) + "\n").encode("utf-8")
+
+
+# --- LECTURA POR LOTES ---
+def _celda_texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime.time):
+        return f"{valor.hour}:{valor.minute:02d}"
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def _leer_xlsx(archivo, tamano):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Para importar Excel instala openpyxl (pip install openpyxl) o sube un CSV.")
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    filas = libro.active.iter_rows(values_only=True)
+    encabezados = [_celda_texto(v).strip() for v in next(filas, [])]
+    lote = []
+    for fila in filas:
+        lote.append([_celda_texto(v) for v in fila])
+        if len(lote) == tamano:
+            yield pd.DataFrame(lote, columns=encabezados)
+            lote = []
+    if lote:
+        yield pd.DataFrame(lote, columns=encabezados)
+    libro.close()
+
+
+def leer_por_lotes(archivo, nombre, tamano=TAMANO_LOTE):
+    """DataFrames de texto de `tamano` filas; el índice es la fila del archivo (encabezado = 1)"""
+    if nombre.lower().endswith((".xlsx", ".xlsm")):
+        lotes = _leer_xlsx(archivo, tamano)
+    else:
+        lotes = pd.read_csv(archivo, dtype=str, keep_default_na=False, chunksize=tamano, skipinitialspace=True)
+    inicio = 2
+    for lote in lotes:
+        lote.columns = [str(c).strip() for c in lote.columns]
+        lote.index = pd.RangeIndex(inicio, inicio + len(lote))
+        inicio += len(lote)
+        yield lote
+
+
+def huella_archivo(archivo):
+    """Huella del contenido del archivo (se lee por bloques y se regresa al inicio)"""
+    huella = hashlib.sha256()
+    while True:
+        bloque = archivo.read(1 << 20)
+        if not bloque:
+            break
+        huella.update(bloque.encode("utf-8") if isinstance(bloque, str) else bloque)
+    archivo.seek(0)
+    return huella.hexdigest()
+
+
+def ids_importacion(huella, filas):
+    """IDs fijos por (archivo, fila): la misma fila del mismo archivo siempre tiene el mismo ID"""
+    return [f"r{huella[:10]}{fila:06x}" for fila in filas]
+
+
+# --- VALIDACIÓN Y CALIFICACIÓN ---
+def _minutos(serie):
+    partes = serie.str.extract(r"^\s*(\d{1,2}):(\d{2})")
+    return pd.to_numeric(partes[0], errors="coerce") * 60 + pd.to_numeric(partes[1], errors="coerce")
+
+
+def preparar_lote(lote):
+    """Convierte un lote de texto a entradas del motor y lista los errores por fila"""
+    faltantes = [c for c in COLUMNAS_IDENTIDAD if c not in lote.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+
+    texto = lote.reindex(columns=COLUMNAS_PLANTILLA, fill_value="").astype(str).apply(lambda s: s.str.strip())
+    datos = texto[["Mes", "Nombre", "CEDIS", "Zona", "Perfil"]].copy()
+    datos["Año"] = pd.to_numeric(texto["Año"], errors="coerce")
+    for columna, entrada in COLUMNAS_KPI.items():
+        if entrada in ENTRADAS_HORA:
+            datos[entrada] = _minutos(texto[columna])
+        elif entrada in ENTRADAS_TEXTO:
+            datos[entrada] = texto[columna].where(texto[columna] != "")
+        else:
+            datos[entrada] = pd.to_numeric(texto[columna].str.rstrip("%"), errors="coerce")
+    # Mayúsculas/minúsculas no deberían tumbar una fila
+    datos["arquetipo"] = datos["arquetipo"].str.upper()
+    datos["rotura"] = datos["rotura"].str.capitalize().str.replace("objetivo", "Objetivo")
+
+    errores = pd.Series("", index=lote.index, dtype=object)
+
+    def marcar(mascara, mensaje):
+        errores[mascara] = errores[mascara] + mensaje + "; "
+
+    marcar(datos["Nombre"] == "", "Falta Nombre")
+    marcar(~datos["Mes"].isin(MESES), "Mes inválido")
+    marcar(~datos["Año"].between(2024, 2030), "Año inválido")
+    marcar(~datos["Perfil"].isin(list(REGLAS)), "Perfil desconocido")
+    for perfil, regla in REGLAS.items():
+        del_perfil = datos["Perfil"] == perfil
+        for k in regla["kpis"]:
+            requeridas = [k["entrada"]] + (["arquetipo"] if k["tipo"] == "arquetipo" else [])
+            for entrada in requeridas:
+                columna = next(c for c, e in COLUMNAS_KPI.items() if e == entrada)
+                marcar(del_perfil & datos[entrada].isna(), f"{columna} vacío o inválido")
+    for entrada in ENTRADAS_CONTEO:
+        columna = next(c for c, e in COLUMNAS_KPI.items() if e == entrada)
+        valores = datos[entrada]
+        marcar(valores.notna() & ((valores < 0) | (valores % 1 != 0)), f"{columna} debe ser un entero mayor o igual a 0")
+    marcar(datos["arquetipo"].notna() & ~datos["arquetipo"].isin(list(ARQUETIPOS)), "Arquetipo inválido")
+    marcar(datos["rotura"].notna() & ~datos["rotura"].isin(OPCIONES_OBJETIVO), "Rotura inválida")
+
+    errores = errores.str.rstrip("; ")
+    return datos[errores == ""], errores[errores != ""]
+
+
+def calificar_lote(datos, fecha_reg=None):
+    """Filas listas para la hoja (en el orden de COLUMNAS) a partir de entradas válidas.
+    Los ID que falten y la versión se asignan al escribirlas (`agregar_filas`)."""
+    puntos = calcular_puntajes(datos)
+    salida = datos[["Mes", "Nombre", "CEDIS", "Zona", "Perfil"]].copy()
+    salida["Año"] = datos["Año"].astype(int)
+    salida["Puntaje Total"] = puntos["Puntaje Total"]
+    salida["Desglose"] = desgloses(datos, puntos)
+    salida["Fecha Reg"] = fecha_reg or str(datetime.date.today())
+    return pd.concat([salida, columnas_kpi(datos, puntos)], axis=1).reindex(columns=COLUMNAS)
+
+
+class ResultadoImportacion:
+    def __init__(self):
+        self.leidas = 0
+        self.importadas = 0
+        self.errores = []      # [{"Fila": n, "Error": "..."}]
+        self.llamadas = 0
+        self.repetidas = 0     # Filas que ya estaban en la hoja (de una importación anterior del mismo archivo)
+        self.en_bandeja = 0    # Con escritura diferida: filas que el escritor enviará en segundo plano
+
+    def errores_df(self):
+        return pd.DataFrame(self.errores, columns=["Fila", "Error"])
+
+
+def importar_evaluaciones(archivo, nombre, validar_solo=False, tamano=TAMANO_LOTE, progreso=None):
+    """Lee, valida, califica y (si no es `validar_solo`) sube las evaluaciones del archivo"""
+    resultado = ResultadoImportacion()
+    if not validar_solo:
+        huella = huella_archivo(archivo)
+        df, version = cargar_instantanea()     # Incluye lo que sigue en la bandeja
+        if version is None:
+            raise ValueError("No se pudo leer la hoja para revisar importaciones anteriores; intenta de nuevo.")
+        existentes = set(df[COLUMNA_ID]) if COLUMNA_ID in df else set()
+    for lote in leer_por_lotes(archivo, nombre, tamano):
+        validas, errores = preparar_lote(lote)
+        resultado.leidas += len(lote)
+        resultado.errores.extend({"Fila": fila, "Error": error} for fila, error in errores.items())
+        if not validas.empty:
+            registros = calificar_lote(validas)
+            if not validar_solo:
+                registros[COLUMNA_ID] = ids_importacion(huella, registros.index)
+                nuevas = ~registros[COLUMNA_ID].isin(existentes).to_numpy()
+                resultado.repetidas += int((~nuevas).sum())
+                registros = registros[nuevas]
+                if not registros.empty:
+                    llamadas = agregar_filas(registros)    # 0: quedaron en la bandeja
+                    resultado.llamadas += llamadas
+                    resultado.en_bandeja += 0 if llamadas else len(registros)
+                    existentes.update(registros[COLUMNA_ID])
+            resultado.importadas += len(registros)
+        if progreso:
+            progreso(resultado)
+    return resultado
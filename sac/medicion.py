@@ -0,0 +1,135 @@
+"""Instrumentación ligera: tramos de tiempo y llamadas a la API de Sheets.
+
+Cada tramo (`with medir("nombre")` o `@medido("nombre")`) guarda su duración
+en una ventana de las últimas mediciones; el resumen da conteo, total y
+percentiles. Las llamadas a la API se cuentan por operación junto con las
+celdas enviadas/recibidas y los bytes enviados. Todo es del proceso (lo
+comparten las sesiones y el escritor en segundo plano) y se apaga con
+`SAC_MEDICION=0`.
+"""
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+ACTIVA = os.environ.get("SAC_MEDICION", "1") != "0"
+VENTANA = 2000      # Mediciones que se conservan por tramo para los percentiles
+PERCENTILES = [50, 90, 99]
+
+
+def _celdas(valor):
+    """Celdas en una carga de gspread: fila, filas, o rangos de batch_update"""
+    if isinstance(valor, dict):
+        return _celdas(valor.get("values", valor.get("requests", [])))
+    if isinstance(valor, (list, tuple)):
+        if valor and isinstance(valor[0], (list, tuple, dict)):
+            return sum(_celdas(v) for v in valor)
+        return len(valor)
+    return 0
+
+
+class Medidor:
+    def __init__(self, ventana=VENTANA):
+        self._candado = threading.Lock()
+        self._ventana = ventana
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._candado:
+            self._duraciones = defaultdict(lambda: deque(maxlen=self._ventana))
+            self._conteos = defaultdict(int)
+            self._totales = defaultdict(float)
+            self._api = defaultdict(lambda: {"llamadas": 0, "errores": 0, "celdas_enviadas": 0,
+                                             "celdas_recibidas": 0, "bytes_enviados": 0})
+            self.desde = datetime.datetime.now()
+
+    def registrar(self, nombre, segundos):
+        with self._candado:
+            self._duraciones[nombre].append(segundos)
+            self._conteos[nombre] += 1
+            self._totales[nombre] += segundos
+
+    def registrar_api(self, operacion, argumentos, resultado, error=False):
+        enviado = argumentos[0] if argumentos else None
+        bytes_enviados = len(json.dumps(enviado, default=str)) if enviado is not None else 0
+        with self._candado:
+            api = self._api[operacion]
+            api["llamadas"] += 1
+            api["errores"] += int(error)
+            api["celdas_enviadas"] += _celdas(enviado)
+            api["celdas_recibidas"] += _celdas(resultado)
+            api["bytes_enviados"] += bytes_enviados
+
+    def tramos(self):
+        """[{tramo, llamadas, total_s, p50_ms, p90_ms, p99_ms, max_ms}] ordenado por tiempo total"""
+        with self._candado:
+            copia = {n: (np.array(d), self._conteos[n], self._totales[n]) for n, d in self._duraciones.items()}
+        filas = []
+        for nombre, (duraciones, conteo, total) in copia.items():
+            fila = {"tramo": nombre, "llamadas": conteo, "total_s": round(total, 4)}
+            for p, v in zip(PERCENTILES, np.percentile(duraciones, PERCENTILES)):
+                fila[f"p{p}_ms"] = round(v * 1000, 2)
+            fila["max_ms"] = round(duraciones.max() * 1000, 2)
+            filas.append(fila)
+        return sorted(filas, key=lambda f: f["total_s"], reverse=True)
+
+    def api(self):
+        """[{operacion, llamadas, errores, celdas_enviadas, celdas_recibidas, bytes_enviados}]"""
+        with self._candado:
+            return [{"operacion": op, **valores} for op, valores in sorted(self._api.items())]
+
+    def exportar(self):
+        """Resumen completo en JSON para analizarlo fuera de la app"""
+        return json.dumps({
+            "desde": self.desde.isoformat(timespec="seconds"),
+            "hasta": datetime.datetime.now().isoformat(timespec="seconds"),
+            "tramos": self.tramos(),
+            "api": self.api(),
+        }, indent=2, ensure_ascii=False)
+
+
+medidor = Medidor()
+
+
+@contextmanager
+def medir(nombre):
+    """Mide el bloque como el tramo `nombre` (también si lanza una excepción)"""
+    if not ACTIVA:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medidor.registrar(nombre, time.perf_counter() - inicio)
+
+
+def medido(nombre):
+    """Decorador: cada llamada a la función es un tramo"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with medir(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def medir_api(operacion, argumentos, llamada):
+    """Ejecuta una llamada a la API contando la operación y el tamaño de lo enviado y recibido"""
+    if not ACTIVA:
+        return llamada()
+    try:
+        with medir(f"api.{operacion}"):
+            resultado = llamada()
+    except Exception:
+        medidor.registrar_api(operacion, argumentos, None, error=True)
+        raise
+    medidor.registrar_api(operacion, argumentos, resultado)
+    return resultado
@@ -0,0 +1 @@
+"""Páginas de la app; streamlit_app.py importa solo la que se abre."""
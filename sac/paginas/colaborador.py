@@ -0,0 +1,74 @@
+"""Página "Perfil de Colaborador": historial y tendencia mes a mes de una persona."""
+import streamlit as st
+import pandas as pd
+
+from sac.datos import cargar_instantanea
+from sac.colaboradores import indice_colaboradores, tendencia
+from sac.medicion import medir
+
+# ==========================================
+# PÁGINA
+# ==========================================
+def mostrar():
+    """Buscador por nombre normalizado, métricas, gráficas de tendencia e historial"""
+    st.title("Perfil de Colaborador")
+
+    with st.spinner("Descargando información actualizada..."):
+        df, version = cargar_instantanea()
+    if df.empty:
+        st.info("No se encontraron datos válidos en la hoja de Google Sheets.")
+        return
+
+    # Índice nombre -> filas; se arma una vez por versión de los datos
+    with medir("colaborador.indice"):
+        indice = indice_colaboradores(df, version)
+    clave = st.selectbox("Colaborador", indice.claves(), index=None, placeholder="Escribe un nombre...",
+                         format_func=lambda c: indice.nombres.get(c, c))
+    if clave is None:
+        return
+
+    claves = [clave]
+    escrituras = indice.escrituras.get(clave, [])
+    if len(escrituras) > 1:
+        st.caption("Se juntan las escrituras: " + " · ".join(escrituras))
+    parecidos = indice.parecidos(clave)
+    if parecidos:
+        # Posibles errores de captura; solo se suman si alguien confirma que son la misma persona
+        claves += st.multiselect("¿Es la misma persona? Incluir también", parecidos,
+                                 format_func=lambda c: indice.nombres.get(c, c))
+
+    with medir("colaborador.historial"):
+        historial = indice.historial(claves)
+    if historial.empty:
+        st.info("Este colaborador no tiene evaluaciones con mes y año válidos.")
+        return
+    mensual = tendencia(historial)
+
+    ultimo = historial.iloc[-1]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Evaluaciones", len(historial))
+    c2.metric("Promedio", f"{mensual['Puntaje Total'].mean():.1f}")
+    c3.metric("Mejor mes", f"{mensual['Puntaje Total'].max():.1f}")
+    cambio = mensual["Cambio"].iloc[-1]
+    c4.metric(f"{mensual.index[-1]:%m/%Y}", f"{mensual['Puntaje Total'].iloc[-1]:.1f}",
+              None if pd.isna(cambio) else f"{cambio:+.1f}")
+    st.caption(f"Último registro: {ultimo['Perfil']} · {ultimo['CEDIS']} · {ultimo['Zona']}")
+
+    st.markdown("### 📈 Puntaje total por mes")
+    st.line_chart(mensual["Puntaje Total"])
+
+    kpis = [c for c in mensual.columns if c not in ("Puntaje Total", "Cambio")]
+    if kpis:
+        st.markdown("### 🧩 Puntos por KPI")
+        elegidos = st.multiselect("KPIs", kpis, default=kpis)
+        if elegidos:
+            st.line_chart(mensual[elegidos])
+
+    st.markdown("### 🗓️ Resumen mensual")
+    st.dataframe(mensual.reset_index(), hide_index=True, width="stretch", column_config={
+        "Mes": st.column_config.DateColumn("Mes", format="MMM YYYY"),
+        "Cambio": st.column_config.NumberColumn("Cambio", format="%+.1f"),
+    })
+    with st.expander("📋 Evaluaciones registradas"):
+        st.dataframe(historial[["Mes", "Año", "Nombre", "Perfil", "CEDIS", "Zona", "Puntaje Total", "Desglose"]],
+                     hide_index=True, width="stretch")
@@ -0,0 +1,397 @@
+"""Página "Ver Rankings": tablero mensual, acumulados, diplomas y área de administración."""
+import streamlit as st
+import numpy as np
+import pandas as pd
+from functools import partial
+
+from sac.datos import (
+    MESES, COLUMNAS_CONTROL, cargar_instantanea, pendientes_migracion, migrar_columnas_kpi, generacion_datos,
+    para_editar, preparar_edicion, revisar_edicion, resolver_conflictos, guardar_edicion, resumen_edicion
+)
+from sac.ranking import indice_ranking
+from sac.agregados import PERIODOS, agregados_ranking, texto_mes
+from sac.diplomas import diploma_pdf, ganadores_del_mes, exportar_diplomas_pdf, exportar_diplomas_zip
+from sac.cierre import cierre_del_mes, cerrar_mes, cierres
+from sac.exportacion import FORMATOS, exportar_bytes, nombre_archivo
+from sac.medicion import VENTANA, medidor, medir
+from sac.simulador import simulador, reglas_a_tabla, topes_a_tabla, tabla_a_reglas, huella, por_perfil
+
+# ==========================================
+# TABLERO
+# ==========================================
+LUGARES_PODIO = 3
+TAMANOS_PAGINA = [25, 50, 100]
+
+def tabla_paginada(df, posiciones, clave, columnas, config, primer_lugar=LUGARES_PODIO + 1):
+    """Fuera del podio el ranking va en una sola tabla, una página a la vez.
+    Así el número de elementos y el tamaño del mensaje no crecen con la lista.
+    `posiciones` son las filas de `df` (compartido) en orden; solo se copia la página."""
+    c1, c2, c3 = st.columns([2, 2, 3])
+    tamano = c1.selectbox("Filas por página", TAMANOS_PAGINA, key=f"{clave}_tamano")
+    paginas = max(1, -(-len(posiciones) // tamano))
+    # Si los filtros acortan la lista, la página guardada puede quedar fuera de rango
+    if st.session_state.get(f"{clave}_pagina", 1) > paginas:
+        st.session_state[f"{clave}_pagina"] = paginas
+    pagina = c2.number_input("Página", min_value=1, max_value=paginas, step=1, key=f"{clave}_pagina")
+    inicio = (pagina - 1) * tamano
+    c3.caption(f"Lugares {inicio + 1}–{min(inicio + tamano, len(posiciones))} de {len(posiciones)}")
+    visibles = df.iloc[posiciones[inicio:inicio + tamano]]
+    visibles = visibles.assign(Lugar=np.arange(len(visibles)) + primer_lugar + inicio)
+    st.dataframe(visibles[columnas], column_config=config, hide_index=True, width="stretch")
+
+# ==========================================
+# EDICIÓN DE LA BASE
+# ==========================================
+def terminar_edicion():
+    """La próxima vez el editor carga los datos vigentes"""
+    for clave in ("edicion_base", "edicion_fusion", "editor_datos"):
+        st.session_state.pop(clave, None)
+    # Las elecciones de una fusión anterior no deben quedar marcadas en la siguiente
+    for clave in [c for c in st.session_state if str(c).startswith("fusion_")]:
+        del st.session_state[clave]
+
+
+def guardar_y_recargar(carga):
+    with st.spinner("Actualizando la nube..."):
+        conflictos = guardar_edicion(carga)
+    if conflictos:
+        # Alguien más cambió las mismas filas entre la revisión y el envío
+        st.session_state["edicion_fusion"] = (carga, conflictos)
+    else:
+        terminar_edicion()
+        st.toast(f"¡Base de datos actualizada con éxito! ({resumen_edicion(carga)})")
+    st.rerun()
+
+
+def mostrar_fusion(carga, conflictos):
+    """Filas que otra persona cambió mientras se editaban: qué conservar de cada una"""
+    st.warning(f"⚠️ {len(conflictos)} filas cambiaron en la hoja desde que abriste el editor. "
+               "Lo que no choca se combina solo; elige qué conservar en estas.")
+    conservar_mia = []
+    for i, conflicto in enumerate(conflictos):
+        st.markdown(f"**{conflicto.titulo()}** — {conflicto.descripcion()}")
+        st.dataframe(conflicto.comparacion(), hide_index=True, width="stretch")
+        eleccion = st.radio("Conservar", ["La mía", "La actual"], key=f"fusion_{i}", horizontal=True)
+        conservar_mia.append(eleccion == "La mía")
+    c_guardar, c_descartar = st.columns(2)
+    if c_guardar.button("✅ Guardar con estas decisiones"):
+        guardar_y_recargar(resolver_conflictos(carga, conflictos, conservar_mia))
+    if c_descartar.button("✖️ Descartar mi edición"):
+        terminar_edicion()
+        st.rerun()
+
+
+# ==========================================
+# SIMULADOR DE REGLAS
+# ==========================================
+def mostrar_simulador(df, version, ano, filtros):
+    """Reglas editables y el ranking anual con ellas, lado a lado con el actual"""
+    st.caption(f"Recalifica {ano} con las entradas crudas guardadas. Puntos y umbrales separados por comas "
+               "(las horas como 7:30); el Factor multiplica los puntos del KPI.")
+    reglas_editadas = st.data_editor(reglas_a_tabla(), disabled=["Perfil", "KPI", "Tipo"], hide_index=True,
+                                     width="stretch", key="sim_reglas")
+    topes_editados = st.data_editor(topes_a_tabla(), disabled=["Arquetipo"], hide_index=True, key="sim_topes")
+    try:
+        reglas = tabla_a_reglas(reglas_editadas, topes_editados)
+    except ValueError as e:
+        st.error(f"Reglas inválidas: {e}")
+        return
+    with medir("simulador.comparar"):
+        comparacion, sin_entradas = simulador.comparar(df, version, ano, reglas, filtros)
+    if comparacion.empty:
+        st.info(f"No hay evaluaciones de {ano} con entradas crudas para simular.")
+        return
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Escenario", huella(reglas)[:8])
+    c2.metric("Cambian de lugar", f"{int((comparacion['Cambio'] != 0).sum())} de {len(comparacion)}")
+    c3.metric("Primer lugar simulado", comparacion["Nombre"].iloc[0])
+    st.dataframe(por_perfil(comparacion), hide_index=True, width="stretch", column_config={
+        "Promedio Actual": st.column_config.NumberColumn(format="%.1f"),
+        "Promedio Simulado": st.column_config.NumberColumn(format="%.1f"),
+        "Diferencia": st.column_config.NumberColumn(format="%+.1f"),
+    })
+    tabla_paginada(comparacion, np.arange(len(comparacion)), "tabla_simulador",
+                   ["Nombre", "Perfil", "CEDIS", "Zona", "Evaluaciones", "Promedio Actual", "Lugar Actual",
+                    "Promedio Simulado", "Lugar Simulado", "Cambio"], {
+                       "Promedio Actual": st.column_config.NumberColumn(format="%.1f"),
+                       "Promedio Simulado": st.column_config.NumberColumn(format="%.1f"),
+                       "Cambio": st.column_config.NumberColumn("Cambio", format="%+d"),
+                   }, primer_lugar=1)
+    if sin_entradas:
+        st.caption(f"{sin_entradas} registros de {ano} no tienen entradas crudas (anteriores a las columnas "
+                   "por KPI) y no entran en la comparación.")
+
+# ==========================================
+# PÁGINA
+# ==========================================
+def mostrar():
+    """Tablero con filtros, ranking mensual, acumulados y área de gerencia"""
+    st.title("Tablero de Posiciones")
+    
+    with st.spinner("Descargando información actualizada..."):
+        generacion = generacion_datos()
+        df_original, version_datos = cargar_instantanea()
+
+    if not df_original.empty:
+        # Índice ordenado y particionado; se reconstruye solo cuando cambian los datos
+        with medir("rankings.indice"):
+            indice = indice_ranking(df_original, version_datos)
+        # Acumulados por colaborador; los registros nuevos se suman sin reagrupar el historial
+        with medir("rankings.agregados"):
+            agregados = agregados_ranking(df_original, generacion)
+
+        # --- BARRA DE FILTROS ---
+        st.markdown("### 🔎 Filtros de Búsqueda")
+        c_ano, c_perfil, c_zona, c_cedis = st.columns(4)
+        
+        filtro_ano = c_ano.selectbox("Año", indice.anos)
+        filtros = {}
+
+        sel_perfil = c_perfil.multiselect("Perfil", indice.opciones(filtro_ano, "Perfil", filtros), placeholder="Todos")
+        filtros["Perfil"] = sel_perfil
+
+        sel_zona = c_zona.multiselect("Zona", indice.opciones(filtro_ano, "Zona", filtros), placeholder="Todas")
+        filtros["Zona"] = sel_zona
+
+        sel_cedis = c_cedis.multiselect("CEDIS", indice.opciones(filtro_ano, "CEDIS", filtros), placeholder="Todos")
+        filtros["CEDIS"] = sel_cedis
+
+        st.divider()
+
+        tab1, tab2 = st.tabs(["📅 Ranking Mensual", "📆 Acumulado"])
+
+        with tab1, medir("rankings.render_mensual"):
+            mes_sel = st.selectbox("Selecciona Mes", MESES)
+            
+            st.markdown("---")
+            col_candado, _ = st.columns([1, 1])
+            pass_diploma = col_candado.text_input("🔐 Contraseña para habilitar Diplomas:", type="password", key="pass_dip")
+            st.markdown("---")
+            
+            # Un mes cerrado se sirve de su instantánea (ranking congelado y diplomas ya dibujados)
+            cierre = cierre_del_mes(filtro_ano, mes_sel)
+            fuente = cierre.indice if cierre else indice
+            sin_filtros = not any(filtros.values())
+            # Solo posiciones sobre el índice compartido; cada sesión copia lo que muestra
+            filas_mes = fuente.posiciones_mes(filtro_ano, mes_sel, filtros)
+            if cierre:
+                st.caption(f"🔒 Mes cerrado el {cierre.creado:%d/%m/%Y %H:%M}: ranking y diplomas congelados.")
+            
+            if pass_diploma == "SAC2026" and len(filas_mes):
+                with st.expander("📦 Exportar todos los diplomas del mes"):
+                    ganadores = ganadores_del_mes(fuente.mensual.iloc[filas_mes])
+                    st.caption(f"{len(ganadores)} diplomas: Top 3 de cada combinación Zona / CEDIS / Perfil")
+                    formato = st.radio("Formato", ["PDF único", "ZIP (un PDF por ganador)"], horizontal=True, key="formato_diplomas")
+                    clave_export = (mes_sel, filtro_ano, formato, tuple(sel_perfil), tuple(sel_zona), tuple(sel_cedis))
+                    
+                    if st.button("⚙️ Generar diplomas", key="generar_diplomas"):
+                        barra = st.progress(0.0, text="Generando diplomas...")
+                        def avance(hechos, total):
+                            barra.progress(hechos / total, text=f"Generando diplomas... {hechos}/{total}")
+                        if formato == "PDF único" and cierre and sin_filtros:
+                            datos_export = cierre.pdf_completo
+                        elif formato == "PDF único":
+                            datos_export = exportar_diplomas_pdf(ganadores, progreso=avance)
+                        else:
+                            datos_export = exportar_diplomas_zip(ganadores, progreso=avance,
+                                                                 dibujados=cierre.diplomas if cierre else None)
+                        st.session_state["export_diplomas"] = (clave_export, datos_export)
+                    
+                    export_guardado = st.session_state.get("export_diplomas")
+                    if export_guardado and export_guardado[0] == clave_export:
+                        es_pdf = formato == "PDF único"
+                        st.download_button(
+                            label="📥 Descargar diplomas",
+                            data=export_guardado[1],
+                            file_name=f"Diplomas_SAC_{mes_sel}_{filtro_ano}.{'pdf' if es_pdf else 'zip'}",
+                            mime="application/pdf" if es_pdf else "application/zip",
+                            key="dip_masivo"
+                        )
+            
+            if len(filas_mes):
+                st.markdown(f"### 🏆 Mejores de {mes_sel} {filtro_ano}")
+                # El índice ya lo entrega ordenado por puntaje
+                podio = fuente.mensual.iloc[filas_mes[:LUGARES_PODIO]].reset_index(drop=True)
+                
+                # Podio con detalle y diplomas; el resto va en la tabla paginada
+                for i, row in podio.iterrows():
+                    rank = i + 1
+                    icono = ("🥇", "🥈", "🥉")[i]
+                    
+                    with st.container():
+                        c1, c2, c3 = st.columns([1, 4, 2])
+                        c1.markdown(f"## {icono}")
+                        c2.markdown(f"**{row['Nombre']}**")
+                        c2.caption(f"{row['Perfil']} | {row['CEDIS']} - {row['Zona']}")
+                        c2.markdown(f"**🔍 Detalle:** `{row['Desglose']}`")
+                        
+                        with c3:
+                            st.metric("Puntos", f"{row['Puntaje Total']:.1f}")
+                            if pass_diploma == "SAC2026":
+                                colaborador_pdf = row.to_dict()
+                                colaborador_pdf["Lugar"] = rank 
+                                    
+                                # El PDF se genera hasta que se hace clic (y se reutiliza del caché)
+                                pdf_data = partial(cierre.diploma_pdf if cierre else diploma_pdf, colaborador_pdf)
+                                    
+                                filename = f"Diploma_SAC_{row['Nombre'].replace(' ', '_')}_{mes_sel}_{filtro_ano}.pdf"
+                                st.download_button(
+                                    label=f"📜 Descargar Diploma",
+                                    data=pdf_data,
+                                    file_name=filename,
+                                    mime="application/pdf",
+                                    key=f"dip_{row['Nombre']}_{i}" 
+                                )
+                            elif pass_diploma != "":
+                                st.error("Contraseña incorrecta")
+                        st.divider()
+                
+                if len(filas_mes) > LUGARES_PODIO:
+                    tabla_paginada(fuente.mensual, filas_mes[LUGARES_PODIO:], "tabla_mes", ["Lugar", "Nombre", "Perfil", "CEDIS", "Zona", "Puntaje Total", "Desglose"], {
+                        "Lugar": st.column_config.NumberColumn("Lugar", format="#%d", width="small"),
+                        "Puntaje Total": st.column_config.NumberColumn("Puntos", format="%.1f"),
+                        "Desglose": st.column_config.TextColumn("🔍 Detalle", width="large"),
+                    })
+            else:
+                st.info(f"No hay evaluaciones para {mes_sel} del {filtro_ano}.")
+
+        with tab2, medir("rankings.render_acumulado"):
+            periodo = st.selectbox("Periodo", list(PERIODOS), key="periodo_acumulado")
+            inicio_periodo, fin_periodo = agregados.ventana(filtro_ano, periodo)
+            if PERIODOS[periodo] is None:
+                st.markdown(f"### 📈 Promedio {periodo} (hasta {texto_mes(fin_periodo)})")
+            else:
+                st.markdown(f"### 📈 Promedio {periodo} {filtro_ano}")
+            acumulado, filas_periodo = agregados.posiciones_periodo(filtro_ano, periodo, filtros)
+            if len(filas_periodo):
+                podio = acumulado.iloc[filas_periodo[:LUGARES_PODIO]].reset_index(drop=True)
+                for i, row in podio.iterrows():
+                    icono = "👑" if i == 0 else "⭐"
+                    with st.container():
+                        c1, c2, c3 = st.columns([1, 4, 2])
+                        c1.markdown(f"## {icono}")
+                        c2.markdown(f"**{row['Nombre']}**")
+                        c2.caption(f"{row['Perfil']} | {row['CEDIS']} - {row['Zona']}")
+                        c2.caption(f"{row['Evaluaciones']} evaluaciones · Mejor mes: {row['Mejor Mes']} "
+                                   f"({row['Mejor Puntaje']:.1f}) · Racha: {row['Racha']} meses")
+                        c3.metric("Promedio", f"{row['Promedio']:.1f}")
+                        st.divider()
+                
+                if len(filas_periodo) > LUGARES_PODIO:
+                    tabla_paginada(acumulado, filas_periodo[LUGARES_PODIO:], "tabla_anual",
+                                   ["Lugar", "Nombre", "Perfil", "CEDIS", "Zona", "Promedio",
+                                    "Evaluaciones", "Mejor Mes", "Racha"], {
+                        "Lugar": st.column_config.NumberColumn("Lugar", format="#%d", width="small"),
+                        "Promedio": st.column_config.NumberColumn("Promedio", format="%.1f"),
+                        "Racha": st.column_config.NumberColumn("Racha", format="%d meses"),
+                    })
+            else:
+                st.info("No hay datos para calcular el acumulado.")
+
+        # --- ZONA DE ADMINISTRACIÓN (SEGURA) ---
+        st.markdown("---")
+        st.markdown("### 🔐 Área Gerencia Nacional")
+        st.caption("Panel de Administración y Descarga de Base de Datos")
+        password = st.text_input("Contraseña:", type="password", key="pass_admin")
+
+        if password == "SAC2026":
+            st.success("✅ Modo Administrador Activado")
+            
+            modo_edicion = st.toggle("🛠️ Activar Edición de Datos (Base Completa)")
+            
+            if modo_edicion:
+                st.warning("⚠️ CUIDADO: Estás editando la hoja de Google Sheets en tiempo real.")
+                # El editor trabaja sobre la versión que cargó; al guardar, cada fila se compara contra ella
+                if "edicion_base" not in st.session_state:
+                    st.session_state["edicion_base"] = (version_datos, para_editar(df_original))
+                version_editor, df_editable = st.session_state["edicion_base"]
+                if version_editor != version_datos:
+                    st.caption("Hay cambios más recientes en la hoja; al guardar se combinan con los tuyos fila por fila.")
+                df_editado = st.data_editor(df_editable, num_rows="dynamic", key="editor_datos",
+                                            disabled=[c for c in COLUMNAS_CONTROL if c in df_editable.columns])
+                
+                fusion = st.session_state.get("edicion_fusion")
+                if fusion is not None:
+                    mostrar_fusion(*fusion)
+                elif st.button("💾 Guardar Cambios en Google Sheets"):
+                    carga = preparar_edicion(df_editable, df_editado)
+                    conflictos = revisar_edicion(carga)
+                    if conflictos:
+                        st.session_state["edicion_fusion"] = (carga, conflictos)
+                        st.rerun()
+                    guardar_y_recargar(carga)
+            
+            faltantes, sin_pts, sin_id = pendientes_migracion(df_original)
+            if faltantes or sin_pts or sin_id:
+                st.info(f"🧱 La hoja no tiene todas las columnas por KPI y de control ({len(faltantes)} columnas faltantes, "
+                        f"{sin_pts} registros sin puntos por KPI, {sin_id} sin ID). La migración las agrega, llena "
+                        "los puntos desde 'Desglose' y da un ID a cada registro.")
+                if st.button("🧱 Migrar Desglose a columnas por KPI"):
+                    try:
+                        with st.spinner("Migrando columnas..."):
+                            migrar_columnas_kpi()
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        st.toast("¡Migración completada!")
+                        st.rerun()
+            
+            # --- DESCARGA DE LA BASE ---
+            # El archivo se arma por bloques hasta que se oprime el botón; los filtros evitan exportar todo
+            st.markdown("**📥 Descargar Base**")
+            c_formato, c_anos, c_zonas, c_perfiles = st.columns(4)
+            formato = c_formato.selectbox("Formato", list(FORMATOS), key="export_formato")
+            filtros_export = {
+                "anos": c_anos.multiselect("Año", indice.anos, placeholder="Todos", key="export_anos"),
+                "zonas": c_zonas.multiselect("Zona", list(indice.mensual["Zona"].cat.categories),
+                                             placeholder="Todas", key="export_zonas"),
+                "perfiles": c_perfiles.multiselect("Perfil", list(indice.mensual["Perfil"].cat.categories),
+                                                   placeholder="Todos", key="export_perfiles"),
+            }
+            st.download_button("📥 Descargar Base (Excel/CSV/Parquet)",
+                               partial(exportar_bytes, df_original, formato, **filtros_export),
+                               nombre_archivo(formato, any(filtros_export.values())), FORMATOS[formato][1])
+            
+            # --- CIERRES DE MES ---
+            with st.expander("🔒 Cierres de mes (ranking congelado y diplomas)"):
+                vigentes = cierre.cambios(indice) if cierre else None
+                if vigentes is not None:
+                    st.warning(f"Los datos de {mes_sel} {filtro_ano} cambiaron desde el cierre ({cierre.filas} "
+                               f"evaluaciones congeladas, {vigentes} vigentes); vuelve a cerrarlo para incluir los cambios.")
+                if st.button(f"🔒 {'Volver a cerrar' if cierre else 'Cerrar'} {mes_sel} {filtro_ano}", key="cerrar_mes"):
+                    with st.spinner("Congelando el ranking y dibujando los diplomas..."):
+                        cerrado = cerrar_mes(filtro_ano, mes_sel, rehacer=cierre is not None)
+                    if cerrado:
+                        st.toast(f"{mes_sel} {filtro_ano} cerrado")
+                        st.rerun()
+                    st.info("No se cerró: no tiene evaluaciones o ya lo está cerrando otro proceso.")
+                tabla_cierres = cierres()
+                if not tabla_cierres.empty:
+                    st.dataframe(tabla_cierres, hide_index=True, width="stretch")
+            
+            # --- SIMULADOR ---
+            if st.toggle("🧪 Simulador de reglas (qué pasaría si...)", key="modo_simulador"):
+                mostrar_simulador(df_original, version_datos, filtro_ano, filtros)
+            
+            # --- RENDIMIENTO ---
+            with st.expander("⏱️ Rendimiento (tiempos y llamadas a Google Sheets)"):
+                st.caption(f"Desde {medidor.desde:%Y-%m-%d %H:%M:%S} · percentiles sobre las últimas "
+                           f"{VENTANA} mediciones de cada tramo (todas las sesiones del servidor)")
+                tramos = medidor.tramos()
+                if tramos:
+                    st.dataframe(pd.DataFrame(tramos), hide_index=True, width="stretch")
+                llamadas_api = medidor.api()
+                if llamadas_api:
+                    st.markdown("**Llamadas a la API**")
+                    st.dataframe(pd.DataFrame(llamadas_api), hide_index=True, width="stretch")
+                c_json, c_reinicio = st.columns(2)
+                c_json.download_button("📥 Exportar JSON", medidor.exportar, "rendimiento_sac.json", "application/json")
+                if c_reinicio.button("🔄 Reiniciar mediciones"):
+                    medidor.reiniciar()
+                    st.rerun()
+            
+        elif password != "":
+            st.error("🚫 Contraseña incorrecta")
+    else:
+        st.info("No se encontraron datos válidos en la hoja de Google Sheets. Asegúrate de tener los encabezados correctos.")
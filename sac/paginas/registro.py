@@ -0,0 +1,163 @@
+"""Página "Registrar Evaluación": formulario, recibos de envío e importación masiva."""
+import streamlit as st
+from datetime import datetime
+
+from sac.datos import MESES, estado_recibos, guardar_registro
+from sac.puntuacion import (
+    ARQUETIPOS, ENTRADAS, OPCIONES_OBJETIVO, PERFILES, REGLAS, a_minutos, calcular_registro, columnas_registro
+)
+from sac.importacion import importar_evaluaciones, plantilla_csv
+
+# ==========================================
+# CAPTURA DE INDICADORES
+# ==========================================
+def capturar_entradas(perfil):
+    """Dibuja los campos que pide la tabla de reglas del perfil y devuelve los KPIs crudos"""
+    entradas = {}
+    pares = st.columns(2) if REGLAS[perfil].get("en_pares") else None
+    emparejados = 0
+    for regla in REGLAS[perfil]["kpis"]:
+        clave = regla["entrada"]
+        spec = ENTRADAS[clave]
+        etiqueta = regla["etiqueta"] or spec["etiqueta"]
+        destino = st
+        if pares and spec["tipo"] in ("hora", "porcentaje"):
+            destino = pares[emparejados % 2]
+            emparejados += 1
+        if spec["tipo"] == "hora":
+            entradas[clave] = a_minutos(destino.time_input(etiqueta, spec["defecto"], step=60))
+        elif spec["tipo"] == "porcentaje":
+            entradas[clave] = destino.number_input(etiqueta, 0.0, 100.0, spec["defecto"], step=0.1)
+        elif spec["tipo"] == "decimal":
+            entradas[clave] = st.number_input(etiqueta, 0.0, 1.0, spec["defecto"], format="%.3f")
+        elif spec["tipo"] == "inventario":
+            c1, c2 = st.columns(2)
+            entradas["arquetipo"] = c1.selectbox("Arquetipo CEDI", list(ARQUETIPOS.keys()))
+            entradas[clave] = c2.number_input(etiqueta, spec["defecto"])
+        elif spec["tipo"] == "objetivo":
+            entradas[clave] = st.radio(etiqueta, OPCIONES_OBJETIVO)
+        elif spec["tipo"] == "conteo":
+            entradas[clave] = st.number_input(etiqueta, min_value=0, step=1)
+    return entradas
+
+# ==========================================
+# RECIBOS DE ENVÍO
+# ==========================================
+ICONOS_RECIBO = {"pendiente": "⏳", "enviado": "✅", "rechazado": "❌"}
+
+def mostrar_recibos(recibos):
+    """Estado de los últimos envíos de la sesión; devuelve cuántos siguen pendientes"""
+    estados = estado_recibos([r["id"] for r in recibos])
+    pendientes = 0
+    for r in reversed(recibos[-10:]):
+        estado, detalle = estados.get(r["id"], ("enviado", None))
+        pendientes += estado == "pendiente"
+        texto = f"{ICONOS_RECIBO[estado]} Recibo #{r['id']} · {r['nombre']} ({r['puntos']} pts): {estado}"
+        st.caption(texto + (f" — {detalle}" if detalle else ""))
+    return pendientes
+
+@st.fragment(run_every=2)
+def recibos_en_vivo():
+    """Se refresca sola mientras haya envíos en cola; al terminar vuelve a la vista fija"""
+    if mostrar_recibos(st.session_state["recibos"]) == 0:
+        st.rerun()
+
+# ==========================================
+# PÁGINA
+# ==========================================
+def mostrar():
+    """Formulario de evaluación, estado de los envíos e importación masiva"""
+    st.title("Nueva Evaluación")
+    
+    st.subheader("Datos del Colaborador")
+    col1, col2 = st.columns(2)
+    perfil = col1.selectbox("Perfil", PERFILES)
+    nombre = col2.text_input("Nombre Completo")
+    
+    col3, col4 = st.columns(2)
+    cedis = col3.text_input("CEDIS")
+    zona = col4.text_input("Zona")
+
+    st.subheader("Periodo a Evaluar")
+    c_mes, c_ano = st.columns(2)
+    mes_actual_idx = datetime.now().month - 1
+    mes_eval = c_mes.selectbox("Mes", MESES, index=mes_actual_idx)
+    ano_eval = c_ano.number_input("Año", min_value=2024, max_value=2030, value=datetime.now().year)
+
+    st.markdown("---")
+
+    with st.form("form_eval"):
+        # --- LÓGICA DE PERFILES (tabla de reglas en sac/puntuacion.py) ---
+        st.info(REGLAS[perfil]["descripcion"])
+        entradas = capturar_entradas(perfil)
+        pts_totales, detalle_pts, desglose_txt = calcular_registro(perfil, entradas)
+
+        enviar = st.form_submit_button("💾 Guardar Evaluación en la Nube")
+
+    if enviar:
+        if nombre:
+            datos = {
+                "Mes": mes_eval,
+                "Año": ano_eval,
+                "Nombre": nombre,
+                "CEDIS": cedis,
+                "Zona": zona,
+                "Perfil": perfil,
+                "Puntaje Total": pts_totales,
+                "Desglose": desglose_txt, 
+                "Fecha Reg": str(datetime.now().date()),
+                **columnas_registro(entradas, detalle_pts)
+            }
+            recibo = guardar_registro(datos)
+            if recibo is None:
+                st.success(f"✅ Registrado exitosamente: {nombre} | Puntos: {pts_totales}")
+            else:
+                # Escritura diferida: el envío a Sheets se confirma en "Mis envíos"
+                st.session_state.setdefault("recibos", []).append({"id": recibo, "nombre": nombre, "puntos": pts_totales})
+                st.success(f"📨 Evaluación recibida: {nombre} | Puntos: {pts_totales} · Recibo #{recibo}")
+            if pts_totales >= 95: st.balloons()
+        else:
+            st.error("⚠️ Falta el nombre del colaborador.")
+
+    recibos = st.session_state.get("recibos")
+    if recibos:
+        st.markdown("#### 📨 Mis envíos")
+        if any(e == "pendiente" for e, _ in estado_recibos([r["id"] for r in recibos]).values()):
+            recibos_en_vivo()
+        else:
+            mostrar_recibos(recibos)
+
+    # --- IMPORTACIÓN MASIVA ---
+    st.markdown("---")
+    with st.expander("📤 Importar evaluaciones desde CSV / Excel"):
+        st.caption("Una fila por evaluación con los KPIs crudos. Las horas van como HH:MM; "
+                   "solo se piden las columnas que usa el perfil de cada fila.")
+        st.download_button("📄 Descargar plantilla", plantilla_csv(), "plantilla_evaluaciones.csv", "text/csv")
+        archivo = st.file_uploader("Archivo", type=["csv", "xlsx"], key="archivo_import")
+        if archivo is not None:
+            c_val, c_imp = st.columns(2)
+            validar = c_val.button("🔍 Solo validar")
+            importar = c_imp.button("☁️ Validar e importar")
+            if validar or importar:
+                avance = st.empty()
+                try:
+                    resultado = importar_evaluaciones(
+                        archivo, archivo.name, validar_solo=validar,
+                        progreso=lambda r: avance.caption(f"Procesadas {r.leidas} filas...")
+                    )
+                except ValueError as e:
+                    st.error(f"⚠️ {e}")
+                else:
+                    verbo = "válidas" if validar else "importadas"
+                    if validar:
+                        detalle = ""
+                    elif resultado.en_bandeja:
+                        detalle = " · se envían a Google Sheets en segundo plano"
+                    else:
+                        detalle = f" en {resultado.llamadas} llamadas a Google Sheets"
+                    st.success(f"✅ {resultado.importadas} de {resultado.leidas} filas {verbo}{detalle}")
+                    if resultado.repetidas:
+                        st.info(f"ℹ️ {resultado.repetidas} filas ya se habían importado de este archivo y se omitieron.")
+                    if resultado.errores:
+                        st.warning(f"⚠️ {len(resultado.errores)} filas con errores (no se importaron):")
+                        st.dataframe(resultado.errores_df(), hide_index=True)
@@ -0,0 +1,269 @@
+"""Reglas de puntuación por perfil y motor vectorizado.
+
+Cada perfil es una lista de KPIs con sus umbrales y puntos. El mismo motor
+califica un registro del formulario o miles de evaluaciones históricas de
+una sola pasada (`calcular_puntajes`), así un cambio de umbral es una
+operación sobre el DataFrame y no un ciclo en Python.
+
+Tipos de regla:
+- "hasta": gana `puntos[i]` si el valor es <= `umbrales[i]` (horas, merma, OOS, falseo)
+- "desde": gana `puntos[i]` si el valor es >= `umbrales[i]` (Fill Rate, Proximidad, E. Perfecta)
+- "arquetipo": gana los puntos si la diferencia de inventario no pasa el tope del arquetipo
+  (`topes` de la regla, o ARQUETIPOS si no trae)
+- "objetivo": gana los puntos si el indicador está "En Objetivo"
+"""
+from datetime import time
+
+import numpy as np
+import pandas as pd
+
+ARQUETIPOS = {"E": 500, "D": 1000, "C": 2000, "B": 4000, "A": 10000}
+EN_OBJETIVO = "En Objetivo"
+OPCIONES_OBJETIVO = [EN_OBJETIVO, "Fuera de Objetivo"]
+
+
+def a_minutos(hora):
+    """Hora del día -> minutos desde medianoche (las reglas de horario se expresan así)"""
+    return hora.hour * 60 + hora.minute
+
+
+# --- UMBRALES COMPARTIDOS ---
+HORAS_SALIDA = [a_minutos(time(7, 30)), a_minutos(time(8, 0)), a_minutos(time(9, 0))]
+HORAS_VISITA = [a_minutos(time(8, 30)), a_minutos(time(9, 0)), a_minutos(time(10, 0))]
+PUNTOS_HORA = [10, 5, 2]
+PORCENTAJES = [0.05, 0.10]
+OOS = [0.5, 1.0]
+
+
+def kpi(nombre, entrada, tipo, puntos, umbrales=None, factor=1, etiqueta=None, topes=None):
+    """Una fila de la tabla de reglas; `nombre` es la etiqueta del Desglose"""
+    return {"kpi": nombre, "entrada": entrada, "tipo": tipo, "puntos": puntos,
+            "umbrales": umbrales, "factor": factor, "etiqueta": etiqueta, "topes": topes}
+
+
+# ==========================================
+# TABLA DE REGLAS POR PERFIL
+# ==========================================
+# "en_pares": el formulario acomoda horas y porcentajes en dos columnas
+REGLAS = {
+    "Jefe SAC Mixto": {
+        "descripcion": "Configuración Mixto: Salida(10), Visita(10), FillRate(25), Prox(10), Inv(25), Merma(10), Rotura(10)",
+        "kpis": [
+            kpi("Salida", "salida", "hasta", PUNTOS_HORA, HORAS_SALIDA),
+            kpi("Visita", "visita", "hasta", PUNTOS_HORA, HORAS_VISITA),
+            kpi("FR", "fill_rate", "desde", [25, 15, 5], [98, 97, 96]),
+            kpi("Prox", "proximidad", "desde", [10, 7, 5], [98, 97, 96]),
+            kpi("Inv", "dif_inventario", "arquetipo", [25]),
+            kpi("Merma", "merma", "hasta", [10, 5], PORCENTAJES),
+            kpi("Rot", "rotura", "objetivo", [10]),
+        ],
+    },
+    "Jefe SAC Entrega": {
+        "descripcion": "Configuración Jefe SAC Entrega: Pesos Altos.",
+        "en_pares": True,
+        "kpis": [
+            kpi("Salida", "salida", "hasta", PUNTOS_HORA, HORAS_SALIDA, factor=2),
+            kpi("Visita", "visita", "hasta", PUNTOS_HORA, HORAS_VISITA, factor=2),
+            kpi("FR", "fill_rate", "desde", [40, 24, 8], [98, 97, 96], etiqueta="Fill Rate % (Emb)"),
+            kpi("Prox", "proximidad", "desde", [20, 12, 4], [98, 97, 96]),
+        ],
+    },
+    "JT Embotellado": {
+        "descripcion": "Configuración JT Embotellado: Pesos Altos.",
+        "en_pares": True,
+        "kpis": [
+            kpi("Salida", "salida", "hasta", PUNTOS_HORA, HORAS_SALIDA, factor=2),
+            kpi("Visita", "visita", "hasta", PUNTOS_HORA, HORAS_VISITA, factor=2),
+            kpi("FR", "fill_rate", "desde", [40, 24, 8], [98, 97, 96], etiqueta="Fill Rate % (Emb)"),
+            kpi("Prox", "proximidad", "desde", [20, 12, 4], [98, 97, 96]),
+        ],
+    },
+    "Jefe SAC APT": {
+        "descripcion": "Configuración APT Original. OOS Objetivo: 0.5%",
+        "kpis": [
+            kpi("OOS", "oos", "hasta", [20, 10], OOS),
+            kpi("Inv", "dif_inventario", "arquetipo", [40]),
+            kpi("Merma", "merma", "hasta", [20, 10], PORCENTAJES),
+            kpi("Rot", "rotura", "objetivo", [20]),
+        ],
+    },
+    "JT Garrafón": {
+        "descripcion": "Configuración JT Garrafón.",
+        "en_pares": True,
+        "kpis": [
+            kpi("Salida", "salida", "hasta", PUNTOS_HORA, HORAS_SALIDA, factor=1.5),
+            kpi("Visita", "visita", "hasta", PUNTOS_HORA, HORAS_VISITA, factor=1.5),
+            kpi("E.Perf", "entrega_perfecta", "desde", [40, 20, 5], [98, 97, 95]),
+            kpi("Prox", "proximidad", "desde", [10, 7, 5], [98, 97, 96]),
+            # Menos de 4 = 20 pts, hasta 7 = 10 pts; el falseo es un conteo entero (formulario e importación)
+            kpi("Falseo", "falseo", "hasta", [20, 10], [3, 7]),
+        ],
+    },
+    "Jefe/Sup APT Garrafón/embotellado": {
+        "descripcion": "Configuración APT Mixto. OOS Objetivo: 0.5%",
+        "kpis": [
+            kpi("OOS", "oos", "hasta", [20, 10], OOS),
+            kpi("Inv", "dif_inventario", "arquetipo", [30]),
+            kpi("Merma", "merma", "hasta", [20, 10], PORCENTAJES),
+            kpi("Rot", "rotura", "objetivo", [20]),
+            kpi("Salida", "salida", "hasta", PUNTOS_HORA, HORAS_SALIDA),
+        ],
+    },
+    "Jefe/Sup APT Embotellado": {
+        "descripcion": "Configuración APT Embotellado. OOS Objetivo: 0.5%",
+        "kpis": [
+            kpi("OOS", "oos", "hasta", [25, 12], OOS),
+            kpi("Inv", "dif_inventario", "arquetipo", [40]),
+            kpi("Merma", "merma", "hasta", [25, 12], PORCENTAJES),
+            kpi("Salida", "salida", "hasta", PUNTOS_HORA, HORAS_SALIDA),
+        ],
+    },
+}
+PERFILES = list(REGLAS)
+KPIS = list(dict.fromkeys(k["kpi"] for r in REGLAS.values() for k in r["kpis"]))
+
+# Cómo se captura cada indicador crudo en el formulario
+ENTRADAS = {
+    "salida": {"etiqueta": "Salida de Rutas", "tipo": "hora", "defecto": time(7, 30)},
+    "visita": {"etiqueta": "Visita 1er Cliente", "tipo": "hora", "defecto": time(8, 30)},
+    "fill_rate": {"etiqueta": "Fill Rate %", "tipo": "porcentaje", "defecto": 98.0},
+    "proximidad": {"etiqueta": "Proximidad %", "tipo": "porcentaje", "defecto": 98.0},
+    "entrega_perfecta": {"etiqueta": "Entrega Perfecta %", "tipo": "porcentaje", "defecto": 98.0},
+    "oos": {"etiqueta": "OOS % (Escala 0-100. Ej: 0.5)", "tipo": "porcentaje", "defecto": 0.5},
+    "merma": {"etiqueta": "Merma CEDI (Decimal: 0.05 = 5%)", "tipo": "decimal", "defecto": 0.05},
+    "dif_inventario": {"etiqueta": "Diferencia Inventario $", "tipo": "inventario", "defecto": 0.0},
+    "rotura": {"etiqueta": "Rotura Garrafón", "tipo": "objetivo", "defecto": EN_OBJETIVO},
+    "falseo": {"etiqueta": "Falseo (Cantidad)", "tipo": "conteo", "defecto": 0},
+}
+
+# --- COLUMNAS TIPADAS EN LA HOJA ---
+# Además del texto "Desglose" se guarda una columna numérica por KPI y por entrada cruda
+COLUMNAS_PUNTOS = {k: f"Pts {k}" for k in KPIS}
+COLUMNAS_ENTRADAS = {
+    "salida": "Salida (min)",
+    "visita": "Visita (min)",
+    "fill_rate": "Fill Rate",
+    "proximidad": "Proximidad",
+    "entrega_perfecta": "Entrega Perfecta",
+    "oos": "OOS",
+    "merma": "Merma",
+    "arquetipo": "Arquetipo",
+    "dif_inventario": "Diferencia Inventario",
+    "rotura": "Rotura",            # 1 = En Objetivo, 0 = Fuera de Objetivo
+    "falseo": "Falseo",
+}
+
+
+# ==========================================
+# MOTOR VECTORIZADO
+# ==========================================
+def _puntos_kpi(df, regla):
+    """Puntos de un KPI para todas las filas de `df` (ya filtradas a un perfil)"""
+    tipo = regla["tipo"]
+    if tipo == "arquetipo":
+        tope = df["arquetipo"].astype(object).map(regla.get("topes") or ARQUETIPOS).astype(float)
+        base = np.where(pd.to_numeric(df["dif_inventario"], errors="coerce") <= tope, regla["puntos"][0], 0)
+    elif tipo == "objetivo":
+        base = np.where(df[regla["entrada"]].isin([EN_OBJETIVO, True, 1]), regla["puntos"][0], 0)
+    else:
+        valores = pd.to_numeric(df[regla["entrada"]], errors="coerce").to_numpy(dtype=float)
+        if tipo == "hasta":
+            condiciones = [valores <= u for u in regla["umbrales"]]
+        else:
+            condiciones = [valores >= u for u in regla["umbrales"]]
+        base = np.select(condiciones, regla["puntos"], 0)
+    return base * regla["factor"]
+
+
+def calcular_puntajes(df, reglas=REGLAS):
+    """Califica un DataFrame de KPIs crudos (columna "Perfil" + entradas).
+
+    Devuelve un DataFrame con el mismo índice, una columna de puntos por
+    etiqueta de KPI (NaN si el KPI no aplica al perfil) y "Puntaje Total".
+    """
+    etiquetas = list(dict.fromkeys(k["kpi"] for r in reglas.values() for k in r["kpis"]))
+    puntos = pd.DataFrame(np.nan, index=df.index, columns=etiquetas)
+    total = np.zeros(len(df))
+    perfiles = df["Perfil"].to_numpy()
+    for perfil, regla in reglas.items():
+        mascara = perfiles == perfil
+        if not mascara.any():
+            continue
+        grupo = df.loc[mascara]
+        for k in regla["kpis"]:
+            pts = _puntos_kpi(grupo, k)
+            puntos.loc[mascara, k["kpi"]] = pts
+            total[mascara] += pts
+    puntos["Puntaje Total"] = total
+    return puntos
+
+
+def _texto_puntos(valor, factor):
+    # Los factores decimales (1.5x) siempre se mostraron como float: "Salida:15.0"
+    return str(float(valor)) if isinstance(factor, float) else str(int(valor))
+
+
+def formatear_desglose(perfil, puntos, reglas=REGLAS):
+    """Texto "Salida:10 | Visita:5 | ..." de una fila de `calcular_puntajes`"""
+    return " | ".join(f"{k['kpi']}:{_texto_puntos(puntos[k['kpi']], k['factor'])}" for k in reglas[perfil]["kpis"])
+
+
+def desgloses(df, puntos, reglas=REGLAS):
+    """`formatear_desglose` para todas las filas, armado por columnas"""
+    textos = pd.Series("", index=df.index, dtype=object)
+    perfiles = df["Perfil"].to_numpy()
+    for perfil, regla in reglas.items():
+        mascara = perfiles == perfil
+        if not mascara.any():
+            continue
+        partes = []
+        for k in regla["kpis"]:
+            col = puntos.loc[mascara, k["kpi"]]
+            col = col.astype(float) if isinstance(k["factor"], float) else col.astype(int)
+            partes.append(f"{k['kpi']}:" + col.astype(str))
+        textos[mascara] = partes[0].str.cat(partes[1:], sep=" | ")
+    return textos
+
+
+def calcular_registro(perfil, entradas, reglas=REGLAS):
+    """Califica una sola evaluación con el mismo motor: (total, puntos por KPI, desglose)"""
+    fila = pd.DataFrame([{"Perfil": perfil, **entradas}])
+    puntos = calcular_puntajes(fila, reglas).iloc[0]
+    kpis = reglas[perfil]["kpis"]
+    detalle = {k["kpi"]: puntos[k["kpi"]] for k in kpis}
+    total = puntos["Puntaje Total"]
+    total = float(total) if any(isinstance(k["factor"], float) for k in kpis) else int(total)
+    return total, detalle, formatear_desglose(perfil, puntos, reglas)
+
+
+# ==========================================
+# COLUMNAS POR KPI
+# ==========================================
+def _rotura_numerica(serie):
+    return serie.map({EN_OBJETIVO: 1, "Fuera de Objetivo": 0, True: 1, False: 0, 1: 1, 0: 0})
+
+
+def columnas_kpi(df, puntos):
+    """Columnas "Pts ..." y entradas crudas listas para guardar junto al Desglose"""
+    salida = puntos[KPIS].rename(columns=COLUMNAS_PUNTOS)
+    for entrada, columna in COLUMNAS_ENTRADAS.items():
+        salida[columna] = df[entrada] if entrada in df else np.nan
+    salida["Rotura"] = _rotura_numerica(salida["Rotura"])
+    return salida
+
+
+def columnas_registro(entradas, detalle):
+    """`columnas_kpi` para un solo registro del formulario, como diccionario"""
+    puntos = pd.DataFrame([detalle], columns=KPIS)
+    return columnas_kpi(pd.DataFrame([entradas]), puntos).iloc[0].to_dict()
+
+
+def migrar_desglose(desglose):
+    """Parsea los textos "Salida:10 | Visita:5 | ..." a columnas "Pts ..." en una pasada"""
+    pares = desglose.astype(str).str.extractall(r"([^\s|:]+):\s*(-?\d+(?:\.\d+)?)")
+    if pares.empty:
+        return pd.DataFrame(np.nan, index=desglose.index, columns=list(COLUMNAS_PUNTOS.values()))
+    pares.columns = ["kpi", "puntos"]
+    pares = pares.droplevel("match").set_index("kpi", append=True)["puntos"].astype(float)
+    tabla = pares[~pares.index.duplicated(keep="last")].unstack()
+    return tabla.reindex(index=desglose.index, columns=KPIS).rename(columns=COLUMNAS_PUNTOS).rename_axis(columns=None)
@@ -0,0 +1,99 @@
+"""Índice precalculado para el tablero de posiciones.
+
+Se construye una vez por versión de los datos: los registros quedan
+ordenados por (Año, Mes, Puntaje) con el lugar ya calculado, cada (Año, Mes)
+es un rango contiguo de filas y Perfil/Zona/CEDIS se guardan como
+categorías. Cambiar un filtro solo revisa los códigos del rango del periodo
+en lugar de volver a coercionar, filtrar y ordenar todo el historial.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sac.datos import MESES
+
+DIMENSIONES = ["Perfil", "Zona", "CEDIS"]
+
+
+def _rangos(valores):
+    """{valor: (inicio, fin)} para un arreglo ya ordenado por ese valor"""
+    if len(valores) == 0:
+        return {}
+    cortes = np.flatnonzero(valores[1:] != valores[:-1]) + 1
+    inicios = np.concatenate([[0], cortes])
+    fines = np.concatenate([cortes, [len(valores)]])
+    return {valores[i]: (i, f) for i, f in zip(inicios, fines)}
+
+
+def _categorizar(df, columnas):
+    for col in columnas:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):   # El caché ya las entrega como categorías
+            df[col] = df[col].astype(str).astype("category")
+    return df
+
+
+class IndiceRanking:
+    """Ranking mensual ordenado, con particiones por periodo (los acumulados están en sac.agregados)"""
+
+    def __init__(self, df):
+        base = df.copy(deep=False)    # Solo se reemplazan columnas completas; el caché no se toca
+        base["Puntaje Total"] = pd.to_numeric(base["Puntaje Total"], errors="coerce")
+        base["Año"] = pd.to_numeric(base["Año"], errors="coerce")
+        base = base.dropna(subset=["Año"])
+        base["Año"] = base["Año"].astype(int)
+        base["Mes Num"] = pd.Categorical(base["Mes"], categories=MESES).codes.astype(np.int8)
+        _categorizar(base, DIMENSIONES + ["Nombre"])
+
+        # Años en el orden en que aparecen (como el selector original)
+        self.anos = list(pd.unique(base["Año"]))
+
+        base = base.sort_values(["Año", "Mes Num", "Puntaje Total"], ascending=[True, True, False],
+                                kind="mergesort", na_position="last").reset_index(drop=True)
+        base["Lugar Mes"] = base.groupby(["Año", "Mes Num"], sort=False).cumcount() + 1
+        self.mensual = base
+        claves = base["Año"].to_numpy() * 100 + base["Mes Num"].to_numpy()
+        self._periodos = {(k // 100, k % 100): r for k, r in _rangos(claves).items()}
+        self._anos = _rangos(base["Año"].to_numpy())
+
+    @staticmethod
+    def _seleccion(df, rango, filtros):
+        """Posiciones dentro de `rango` que cumplen los filtros {dimensión: [valores]}"""
+        inicio, fin = rango
+        mascara = np.ones(fin - inicio, dtype=bool)
+        for dim, valores in filtros.items():
+            if valores:
+                columna = df[dim].iloc[inicio:fin]
+                codigos = columna.cat.categories.get_indexer(list(valores))
+                codigos = codigos[codigos >= 0]     # -1 (valor sin categoría) coincidiría con los vacíos
+                mascara &= np.isin(columna.cat.codes.to_numpy(), codigos)
+        return np.arange(inicio, fin)[mascara]
+
+    def opciones(self, ano, dimension, filtros):
+        """Valores disponibles de `dimension` en el año, aplicando los filtros anteriores en cascada"""
+        rango = self._anos.get(ano, (0, 0))
+        previas = {d: filtros.get(d) for d in DIMENSIONES[:DIMENSIONES.index(dimension)]}
+        posiciones = self._seleccion(self.mensual, rango, previas)
+        return list(pd.unique(self.mensual[dimension].to_numpy()[posiciones]).astype(str))
+
+    def posiciones_mes(self, ano, mes, filtros):
+        """Posiciones en `mensual` de los registros del mes, ya ordenadas por puntaje (sin copiar filas)"""
+        rango = self._periodos.get((ano, MESES.index(mes)), (0, 0))
+        return self._seleccion(self.mensual, rango, filtros)
+
+    def del_mes(self, ano, mes, filtros):
+        """Registros del mes ya ordenados por puntaje (lugar = posición en el resultado)"""
+        return self.mensual.iloc[self.posiciones_mes(ano, mes, filtros)].reset_index(drop=True)
+
+
+_indice = None
+_candado = threading.Lock()
+
+
+def indice_ranking(df, version):
+    """Índice del proceso; solo se reconstruye cuando cambia la versión de los datos"""
+    global _indice
+    with _candado:
+        if _indice is None or _indice[0] != version:
+            _indice = (version, IndiceRanking(df))
+        return _indice[1]
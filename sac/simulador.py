@@ -0,0 +1,196 @@
+"""Simulador de reglas: cómo quedaría el ranking con otros umbrales y pesos.
+
+Recalifica un año completo con las entradas crudas guardadas en la hoja
+(Salida (min), Fill Rate, Arquetipo, ...) usando el mismo motor vectorizado
+del formulario, una pasada por perfil. Cada escenario se identifica por la
+huella de sus reglas y su resultado (promedio anual por colaborador) se
+guarda por (versión de los datos, año, huella): comparar muchos escenarios,
+o volver a uno ya visto, no recalcula lo que ya se hizo. Los registros
+anteriores a las columnas por KPI no tienen entradas crudas y quedan fuera
+de la comparación.
+"""
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from sac.agregados import CLAVE
+from sac.puntuacion import ARQUETIPOS, COLUMNAS_ENTRADAS, ENTRADAS, REGLAS, calcular_puntajes
+
+MAX_ESCENARIOS = 64     # Resultados guardados (cada uno es un arreglo por colaborador)
+MAX_ANOS = 4            # Entradas preparadas por (versión, año)
+COLUMNAS_COMPARACION = CLAVE + ["Evaluaciones", "Promedio Actual", "Lugar Actual",
+                                "Promedio Simulado", "Lugar Simulado", "Cambio"]
+
+
+def _canonico(valor):
+    # 1 y 1.0 califican igual: misma huella
+    if isinstance(valor, dict):
+        return {k: _canonico(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_canonico(v) for v in valor]
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    return valor
+
+
+def huella(reglas):
+    """Identificador estable de un juego de reglas (mismo contenido, misma huella)"""
+    texto = json.dumps(_canonico(reglas), sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode()).hexdigest()[:16]
+
+
+# --- REGLAS COMO TABLA EDITABLE ---
+def _es_hora(k):
+    return ENTRADAS.get(k["entrada"], {}).get("tipo") == "hora"
+
+
+def _texto_lista(valores, hora=False):
+    if not valores:
+        return ""
+    return ", ".join(f"{v // 60}:{v % 60:02d}" if hora else f"{v:g}" for v in valores)
+
+
+def _leer_lista(texto, hora=False):
+    valores = []
+    for parte in str(texto).replace(";", ",").split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        if hora:
+            horas, _, minutos = parte.partition(":")
+            valores.append(int(horas) * 60 + int(minutos or 0))
+        else:
+            numero = float(parte)
+            valores.append(int(numero) if numero.is_integer() else numero)
+    return valores
+
+
+def reglas_a_tabla(reglas=REGLAS):
+    """Una fila por KPI de cada perfil, con puntos y umbrales como texto ("98, 97, 96" o "7:30, 8:00")"""
+    return pd.DataFrame([
+        {"Perfil": perfil, "KPI": k["kpi"], "Tipo": k["tipo"], "Puntos": _texto_lista(k["puntos"]),
+         "Umbrales": _texto_lista(k["umbrales"], _es_hora(k)), "Factor": float(k["factor"])}
+        for perfil, regla in reglas.items() for k in regla["kpis"]
+    ])
+
+
+def topes_a_tabla(topes=ARQUETIPOS):
+    return pd.DataFrame({"Arquetipo": list(topes), "Tope $": [float(v) for v in topes.values()]})
+
+
+def tabla_a_reglas(tabla, topes=None, base=REGLAS):
+    """Reglas candidatas a partir de las tablas editadas; ValueError si algo no cuadra"""
+    reglas = copy.deepcopy(base)
+    indice = {(p, k["kpi"]): k for p, r in reglas.items() for k in r["kpis"]}
+    for fila in tabla.itertuples(index=False):
+        k = indice.get((fila.Perfil, fila.KPI))
+        if k is None:
+            raise ValueError(f"KPI desconocido: {fila.Perfil} / {fila.KPI}")
+        try:
+            k["puntos"] = _leer_lista(fila.Puntos)
+            if k["umbrales"] is not None:
+                k["umbrales"] = _leer_lista(fila.Umbrales, _es_hora(k))
+        except ValueError:
+            raise ValueError(f"{fila.Perfil} / {fila.KPI}: puntos o umbrales con formato inválido")
+        if not k["puntos"]:
+            raise ValueError(f"{fila.Perfil} / {fila.KPI}: faltan los puntos")
+        if k["umbrales"] is not None and len(k["umbrales"]) != len(k["puntos"]):
+            raise ValueError(f"{fila.Perfil} / {fila.KPI}: debe haber un umbral por cada nivel de puntos")
+        factor = float(fila.Factor)
+        # El motor muestra los factores decimales como float; un entero se queda entero
+        k["factor"] = int(factor) if factor.is_integer() else factor
+    if topes is not None:
+        nuevos = {str(a): float(t) for a, t in zip(topes["Arquetipo"], topes["Tope $"])}
+        if nuevos != {a: float(t) for a, t in ARQUETIPOS.items()}:
+            for k in indice.values():
+                if k["tipo"] == "arquetipo":
+                    k["topes"] = nuevos
+    return reglas
+
+
+# ==========================================
+# SIMULACIÓN
+# ==========================================
+class _Entradas:
+    """Entradas crudas de un año, con el colaborador de cada fila como código entero"""
+
+    def __init__(self, df, ano):
+        del_ano = df[pd.to_numeric(df["Año"], errors="coerce").eq(ano).fillna(False).to_numpy()]
+        columnas = {col: entrada for entrada, col in COLUMNAS_ENTRADAS.items()}
+        crudas = del_ano.reindex(columns=list(columnas)).rename(columns=columnas)
+        con_entradas = crudas.notna().any(axis=1).to_numpy()
+        self.sin_entradas = int((~con_entradas).sum())
+        self.entradas = crudas[con_entradas].astype({"arquetipo": object, "rotura": object})
+        self.entradas["Perfil"] = del_ano["Perfil"].to_numpy()[con_entradas].astype(object)
+        claves = pd.MultiIndex.from_frame(del_ano.loc[con_entradas, CLAVE].astype(str))
+        self.codigos, unicas = pd.factorize(claves)
+        self.colaboradores = pd.DataFrame(list(unicas), columns=CLAVE)
+        self.cuentas = np.bincount(self.codigos, minlength=len(unicas))
+
+
+class Simulador:
+    def __init__(self, max_escenarios=MAX_ESCENARIOS):
+        self._candado = threading.Lock()
+        self._max = max_escenarios
+        self._entradas = OrderedDict()     # (versión, año) -> _Entradas
+        self._escenarios = OrderedDict()   # (versión, año, huella) -> promedio por colaborador
+        self.calculados = 0
+
+    def _preparar(self, df, version, ano):
+        clave = (version, ano)
+        if clave not in self._entradas:
+            self._entradas[clave] = _Entradas(df, ano)
+            while len(self._entradas) > MAX_ANOS:
+                self._entradas.popitem(last=False)
+        self._entradas.move_to_end(clave)
+        return self._entradas[clave]
+
+    def _promedios(self, entradas, version, ano, reglas):
+        clave = (version, ano, huella(reglas))
+        if clave not in self._escenarios:
+            total = calcular_puntajes(entradas.entradas, reglas)["Puntaje Total"].to_numpy()
+            suma = np.bincount(entradas.codigos, weights=total, minlength=len(entradas.cuentas))
+            self._escenarios[clave] = suma / np.maximum(entradas.cuentas, 1)
+            self.calculados += 1
+            while len(self._escenarios) > self._max:
+                self._escenarios.popitem(last=False)
+        self._escenarios.move_to_end(clave)
+        return self._escenarios[clave]
+
+    def comparar(self, df, version, ano, reglas, filtros=None, actuales=REGLAS):
+        """Promedio anual y lugar por colaborador con las reglas actuales y las candidatas.
+
+        Devuelve (tabla ordenada por el lugar simulado, registros sin entradas
+        crudas). "Cambio" es cuántos lugares sube (positivo) o baja.
+        """
+        with self._candado:
+            entradas = self._preparar(df, version, ano)
+            actual = self._promedios(entradas, version, ano, actuales)
+            simulado = self._promedios(entradas, version, ano, reglas)
+        tabla = entradas.colaboradores.assign(**{
+            "Evaluaciones": entradas.cuentas, "Promedio Actual": actual, "Promedio Simulado": simulado,
+        })
+        for dim, valores in (filtros or {}).items():
+            if valores:
+                tabla = tabla[tabla[dim].isin(valores)]
+        tabla["Lugar Actual"] = tabla["Promedio Actual"].rank(method="min", ascending=False).astype(int)
+        tabla["Lugar Simulado"] = tabla["Promedio Simulado"].rank(method="min", ascending=False).astype(int)
+        tabla["Cambio"] = tabla["Lugar Actual"] - tabla["Lugar Simulado"]
+        tabla = tabla.sort_values(["Lugar Simulado", "Lugar Actual"], kind="mergesort")
+        return tabla[COLUMNAS_COMPARACION].reset_index(drop=True), entradas.sin_entradas
+
+
+def por_perfil(comparacion):
+    """Promedio actual y simulado de cada perfil, con la diferencia"""
+    resumen = comparacion.groupby("Perfil", sort=True)[["Promedio Actual", "Promedio Simulado"]].mean()
+    resumen["Diferencia"] = resumen["Promedio Simulado"] - resumen["Promedio Actual"]
+    resumen["Cambian de lugar"] = comparacion.groupby("Perfil", sort=True)["Cambio"].apply(lambda c: int((c != 0).sum()))
+    return resumen.reset_index()
+
+
+simulador = Simulador()
@@ -1,202 +1,11 @@
 import streamlit as st
-import pandas as pd
-from datetime import time, datetime
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import io
 
-# Librerías para PDF
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.colors import HexColor
-from reportlab.lib.units import inch
+from sac.datos import estado_sincronizacion, conflictos_recientes
+from sac.cierre import programador_cierre
 
 # --- CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="Ranking SAC Pro", layout="centered", page_icon="🏆")
 
-# --- CONSTANTES ---
-MESES = [
-    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
-    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
-]
-ARQUETIPOS = {"E": 500, "D": 1000, "C": 2000, "B": 4000, "A": 10000}
-
-# --- CONEXIÓN A GOOGLE SHEETS ---
-def get_sheet():
-    """Conecta con Google Sheets usando los secretos de Streamlit"""
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    creds_dict = dict(st.secrets["gcp_service_account"])
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    client = gspread.authorize(creds)
-    return client.open("Ranking SAC DB").sheet1
-
-def cargar_datos():
-    """Descarga los datos de la nube"""
-    try:
-        sheet = get_sheet()
-        data = sheet.get_all_records()
-        if not data:
-            return pd.DataFrame(columns=["Mes", "Año", "Nombre", "CEDIS", "Zona", "Perfil", "Puntaje Total", "Desglose", "Fecha Reg"])
-        return pd.DataFrame(data)
-    except Exception as e:
-        return pd.DataFrame()
-
-def guardar_registro(datos):
-    """Sube un nuevo registro a la nube"""
-    sheet = get_sheet()
-    fila = [
-        datos["Mes"], datos["Año"], datos["Nombre"], datos["CEDIS"], 
-        datos["Zona"], datos["Perfil"], datos["Puntaje Total"], 
-        datos["Desglose"], datos["Fecha Reg"]
-    ]
-    sheet.append_row(fila)
-
-def actualizar_base_completa(df):
-    """Borra y reescribe la base de datos (Para el modo Editor)"""
-    sheet = get_sheet()
-    sheet.clear()
-    sheet.append_row(df.columns.tolist())
-    sheet.append_rows(df.values.tolist())
-
-# ==========================================
-# FUNCIÓN GENERACIÓN PDF (DIPLOMA)
-# ==========================================
-def generar_diploma_pdf(colaborador_dict):
-    """Genera el PDF del diploma con datos de Región, CEDIS y Área dinámica"""
-    
-    nombre = colaborador_dict["Nombre"]
-    puntos = f"{colaborador_dict['Puntaje Total']:.1f}"
-    mes = colaborador_dict["Mes"]
-    ano = str(colaborador_dict["Año"])
-    rank = colaborador_dict["Lugar"]
-    cedis = colaborador_dict["CEDIS"]
-    perfil = colaborador_dict["Perfil"]
-    
-    # Lógica para determinar el Área exacta según el perfil
-    if perfil in ["Jefe SAC APT", "Jefe/Sup APT Garrafón/embotellado", "Jefe/Sup APT Embotellado"]:
-        area_texto = "Almacén"
-    elif perfil in ["Jefe SAC Entrega", "JT Embotellado", "JT Garrafón"]:
-        area_texto = "Entrega"
-    elif perfil == "Jefe SAC Mixto":
-        area_texto = "Almacén/Entrega"
-    else:
-        area_texto = "Operaciones" # Respaldo por si acaso
-    
-    color_gold = HexColor("#C5A02F")
-    color_silver = HexColor("#C0C0C0")
-    color_bronze = HexColor("#CD7F32")
-    color_navy = HexColor("#001F3F")
-    color_red = HexColor("#CC0000")
-
-    rank_text = f"{rank}er LUGAR"
-    rank_color = color_gold
-    if rank == 2:
-        rank_text = f"{rank}do LUGAR"
-        rank_color = color_silver
-    elif rank == 3:
-        rank_text = f"{rank}er LUGAR"
-        rank_color = color_bronze
-
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=landscape(A4))
-    w, h = landscape(A4)
-    
-    # 1. BORDES
-    c.setLineWidth(15)
-    c.setStrokeColor(color_navy)
-    c.rect(20, 20, w-40, h-40, stroke=1)
-    
-    c.setLineWidth(2)
-    c.setStrokeColor(color_red)
-    c.rect(30, 30, w-60, h-60, stroke=1)
-    
-    # 2. CONTENIDO
-    c.setFillColor(color_navy)
-    
-    c.setFont("Helvetica-Bold", 60)
-    c.drawCentredString(w/2, h - 90, "SAC")
-    
-    c.setFont("Helvetica-Bold", 28)
-    c.drawCentredString(w/2, h - 140, "RECONOCIMIENTO")
-    c.drawCentredString(w/2, h - 175, "A LA EXCELENCIA SAC")
-    
-    c.setFillColor(rank_color)
-    c.setFont("Helvetica-Bold", 35)
-    c.drawCentredString(w/2, h - 230, rank_text)
-    
-    # NOMBRE DEL GANADOR
-    c.setFillColor(color_navy)
-    c.setFont("Helvetica-Bold", 45)
-    c.drawCentredString(w/2, h - 290, nombre.upper())
-    
-    # REGIÓN Y CEDIS
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(w/2, h - 325, f"Región Centro | CEDIS {cedis}")
-    
-    # PÁRRAFO DE LOGRO (Con área dinámica corregida)
-    c.setFont("Helvetica", 16)
-    c.drawCentredString(w/2, h - 365, "Por su destacado desempeño en los indicadores de")
-    c.drawCentredString(w/2, h - 385, f"{area_texto} durante el mes de {mes} {ano},")
-    c.drawCentredString(w/2, h - 405, f"obteniendo un puntaje de {puntos} pts.")
-    
-    # MISIÓN SAC
-    c.setFont("Helvetica-BoldOblique", 13)
-    c.setFillColor(color_navy)
-    c.drawCentredString(w/2, h - 445, '"Servicio de Excelencia con Operación de alto desempeño y Productividad')
-    c.drawCentredString(w/2, h - 465, 'a Bajo Costo, haciendo las cosas bien y a la primera."')
-    
-    # 3. FIRMAS
-    c.setLineWidth(1)
-    c.setStrokeColor(color_navy)
-    y_firmas = 70
-    w_firma = 200
-    
-    x_f1 = w/4
-    c.line(x_f1 - w_firma/2, y_firmas, x_f1 + w_firma/2, y_firmas)
-    c.setFont("Helvetica", 11)
-    c.drawCentredString(x_f1, y_firmas - 15, "Director Comercial Centro")
-    
-    x_f2 = w/2
-    c.line(x_f2 - w_firma/2, y_firmas, x_f2 + w_firma/2, y_firmas)
-    c.setFont("Helvetica", 11)
-    c.drawCentredString(x_f2, y_firmas - 15, "Gerente SAC Sr. Centro")
-    
-    x_f3 = 3*w/4
-    c.line(x_f3 - w_firma/2, y_firmas, x_f3 + w_firma/2, y_firmas)
-    c.setFont("Helvetica", 11)
-    c.drawCentredString(x_f3, y_firmas - 15, "Dir GGyC Centro")
-    
-    c.showPage()
-    c.save()
-    
-    buffer.seek(0)
-    return buffer
-
-# ==========================================
-# LÓGICA DE CÁLCULO
-# ==========================================
-def calcular_visita_base(hora):
-    if hora <= time(8, 30): return 10
-    elif hora <= time(9, 0): return 5
-    elif hora <= time(10, 0): return 2
-    else: return 0
-
-def calcular_salida_base(hora):
-    if hora <= time(7, 30): return 10
-    elif hora <= time(8, 0): return 5
-    elif hora <= time(9, 0): return 2
-    else: return 0
-
-def calcular_rango_porcentajes(valor, max_pts, mid_pts):
-    if valor <= 0.05: return max_pts
-    elif valor <= 0.10: return mid_pts
-    else: return 0
-
-def calcular_oos(valor, max_pts, mid_pts):
-    if valor <= 0.5: return max_pts
-    elif valor <= 1.0: return mid_pts
-    else: return 0
-
 # --- BARRA LATERAL ---
 st.sidebar.markdown(
     """
@@ -217,296 +26,39 @@ st.sidebar.markdown(
 )
 
 st.sidebar.title("Menú Principal")
-menu = st.sidebar.radio("Ir a:", ["📝 Registrar Evaluación", "🏆 Ver Rankings"])
-
+menu = st.sidebar.radio("Ir a:", ["📝 Registrar Evaluación", "🏆 Ver Rankings", "👤 Perfil de Colaborador"])
+
+# El mes anterior se cierra en segundo plano (ranking congelado y diplomas dibujados)
+programador_cierre.iniciar()
+
+# --- ESTADO DE SINCRONIZACIÓN ---
+estado_sync = estado_sincronizacion()
+if estado_sync["error"]:
+    st.sidebar.error(f"🔴 Sin conexión con Google Sheets · {estado_sync['pendientes']} cambios guardados localmente")
+    st.sidebar.caption(estado_sync["error"][:200])
+elif estado_sync["pendientes"]:
+    st.sidebar.warning(f"🟡 Enviando {estado_sync['pendientes']} cambios a Google Sheets...")
+else:
+    st.sidebar.success("🟢 Sincronizado con Google Sheets")
+if estado_sync["ultimo_envio"]:
+    st.sidebar.caption(f"Último envío: {estado_sync['ultimo_envio']:%H:%M:%S}")
+if estado_sync["conflictos"]:
+    with st.sidebar.expander(f"⚠️ {estado_sync['conflictos']} cambios en conflicto"):
+        for creado, tipo, detalle in conflictos_recientes():
+            st.caption(f"{creado} · {detalle}")
 # ==========================================
-# SECCIÓN 1: REGISTRO
+# PÁGINAS
 # ==========================================
+# Cada página se importa solo cuando se abre: el registro no carga el tablero
+# ni los diplomas, y reportlab/gspread se cargan hasta que se usan.
 if menu == "📝 Registrar Evaluación":
-    st.title("Nueva Evaluación")
-    
-    st.subheader("Datos del Colaborador")
-    col1, col2 = st.columns(2)
-    perfil = col1.selectbox("Perfil", [
-        "Jefe SAC Mixto", "Jefe SAC Entrega", "JT Embotellado", "Jefe SAC APT", 
-        "JT Garrafón", "Jefe/Sup APT Garrafón/embotellado", "Jefe/Sup APT Embotellado"
-    ])
-    nombre = col2.text_input("Nombre Completo")
-    
-    col3, col4 = st.columns(2)
-    cedis = col3.text_input("CEDIS")
-    zona = col4.text_input("Zona")
-
-    st.subheader("Periodo a Evaluar")
-    c_mes, c_ano = st.columns(2)
-    mes_actual_idx = datetime.now().month - 1
-    mes_eval = c_mes.selectbox("Mes", MESES, index=mes_actual_idx)
-    ano_eval = c_ano.number_input("Año", min_value=2024, max_value=2030, value=datetime.now().year)
-
-    st.markdown("---")
-
-    with st.form("form_eval"):
-        pts_totales = 0
-        desglose_txt = "" 
-        
-        # --- LÓGICA DE PERFILES ---
-        if perfil == "Jefe SAC Mixto":
-            st.info("Configuración Mixto: Salida(10), Visita(10), FillRate(25), Prox(10), Inv(25), Merma(10), Rotura(10)")
-            t_salida = st.time_input("Salida de Rutas", time(7, 30), step=60)
-            pts_s = calcular_salida_base(t_salida)
-            t_visita = st.time_input("Visita 1er Cliente", time(8, 30), step=60)
-            pts_v = calcular_visita_base(t_visita)
-            fr = st.number_input("Fill Rate %", 0.0, 100.0, 98.0, step=0.1)
-            pts_fr = 25 if fr >= 98 else (15 if fr >= 97 else (5 if fr >= 96 else 0))
-            pr = st.number_input("Proximidad %", 0.0, 100.0, 98.0, step=0.1)
-            pts_pr = 10 if pr >= 98 else (7 if pr >= 97 else (5 if pr >= 96 else 0))
-            c1, c2 = st.columns(2)
-            arq = c1.selectbox("Arquetipo CEDI", list(ARQUETIPOS.keys()))
-            monto = c2.number_input("Diferencia Inventario $", 0.0)
-            pts_inv = 25 if monto <= ARQUETIPOS[arq] else 0
-            merma = st.number_input("Merma CEDI (Decimal: 0.05 = 5%)", 0.0, 1.0, 0.05, format="%.3f")
-            pts_merma = calcular_rango_porcentajes(merma, 10, 5)
-            rotura = st.radio("Rotura Garrafón", ["En Objetivo", "Fuera de Objetivo"])
-            pts_rot = 10 if rotura == "En Objetivo" else 0
-            
-            pts_totales = pts_s + pts_v + pts_fr + pts_pr + pts_inv + pts_merma + pts_rot
-            desglose_txt = f"Salida:{pts_s} | Visita:{pts_v} | FR:{pts_fr} | Prox:{pts_pr} | Inv:{pts_inv} | Merma:{pts_merma} | Rot:{pts_rot}"
+    from sac.paginas import registro
+    registro.mostrar()
 
-        elif perfil == "Jefe SAC Entrega" or perfil == "JT Embotellado":
-            st.info(f"Configuración {perfil}: Pesos Altos.")
-            c1, c2 = st.columns(2)
-            t_salida = c1.time_input("Salida de Rutas", time(7, 30), step=60)
-            pts_s = calcular_salida_base(t_salida) * 2
-            t_visita = c2.time_input("Visita 1er Cliente", time(8, 30), step=60)
-            pts_v = calcular_visita_base(t_visita) * 2
-            fr = c1.number_input("Fill Rate % (Emb)", 0.0, 100.0, 98.0, step=0.1)
-            pts_fr = 40 if fr >= 98 else (24 if fr >= 97 else (8 if fr >= 96 else 0))
-            pr = c2.number_input("Proximidad %", 0.0, 100.0, 98.0, step=0.1)
-            pts_pr = 20 if pr >= 98 else (12 if pr >= 97 else (4 if pr >= 96 else 0))
-            
-            pts_totales = pts_s + pts_v + pts_fr + pts_pr
-            desglose_txt = f"Salida:{pts_s} | Visita:{pts_v} | FR:{pts_fr} | Prox:{pts_pr}"
-
-        elif perfil == "Jefe SAC APT":
-            st.info("Configuración APT Original. OOS Objetivo: 0.5%")
-            oos = st.number_input("OOS % (Escala 0-100. Ej: 0.5)", 0.0, 100.0, 0.5, step=0.1)
-            pts_oos = calcular_oos(oos, 20, 10)
-            c1, c2 = st.columns(2)
-            arq = c1.selectbox("Arquetipo CEDI", list(ARQUETIPOS.keys()))
-            monto = c2.number_input("Diferencia Inventario $", 0.0)
-            pts_inv = 40 if monto <= ARQUETIPOS[arq] else 0
-            merma = st.number_input("Merma CEDI (Decimal: 0.05 = 5%)", 0.0, 1.0, 0.05)
-            pts_merma = calcular_rango_porcentajes(merma, 20, 10)
-            rotura = st.radio("Rotura Garrafón", ["En Objetivo", "Fuera de Objetivo"])
-            pts_rot = 20 if rotura == "En Objetivo" else 0
-            
-            pts_totales = pts_oos + pts_inv + pts_merma + pts_rot
-            desglose_txt = f"OOS:{pts_oos} | Inv:{pts_inv} | Merma:{pts_merma} | Rot:{pts_rot}"
-
-        elif perfil == "JT Garrafón":
-            st.info("Configuración JT Garrafón.")
-            c1, c2 = st.columns(2)
-            t_salida = c1.time_input("Salida de Rutas", time(7, 30), step=60)
-            pts_s = calcular_salida_base(t_salida) * 1.5
-            t_visita = c2.time_input("Visita 1er Cliente", time(8, 30), step=60)
-            pts_v = calcular_visita_base(t_visita) * 1.5
-            ep = c1.number_input("Entrega Perfecta %", 0.0, 100.0, 98.0, step=0.1)
-            pts_ep = 40 if ep >= 98 else (20 if ep >= 97 else (5 if ep >= 95 else 0))
-            pr = c2.number_input("Proximidad %", 0.0, 100.0, 98.0, step=0.1)
-            pts_pr = 10 if pr >= 98 else (7 if pr >= 97 else (5 if pr >= 96 else 0))
-            falseo = st.number_input("Falseo (Cantidad)", min_value=0, step=1)
-            pts_fal = 20 if falseo < 4 else (10 if falseo <= 7 else 0)
-            
-            pts_totales = pts_s + pts_v + pts_ep + pts_pr + pts_fal
-            desglose_txt = f"Salida:{pts_s} | Visita:{pts_v} | E.Perf:{pts_ep} | Prox:{pts_pr} | Falseo:{pts_fal}"
-
-        elif perfil == "Jefe/Sup APT Garrafón/embotellado":
-            st.info("Configuración APT Mixto. OOS Objetivo: 0.5%")
-            oos = st.number_input("OOS % (Escala 0-100. Ej: 0.5)", 0.0, 100.0, 0.5, step=0.1)
-            pts_oos = calcular_oos(oos, 20, 10)
-            c1, c2 = st.columns(2)
-            arq = c1.selectbox("Arquetipo CEDI", list(ARQUETIPOS.keys()))
-            monto = c2.number_input("Diferencia Inventario $", 0.0)
-            pts_inv = 30 if monto <= ARQUETIPOS[arq] else 0
-            merma = st.number_input("Merma CEDI (Decimal: 0.05 = 5%)", 0.0, 1.0, 0.05, format="%.3f")
-            pts_merma = calcular_rango_porcentajes(merma, 20, 10)
-            rotura = st.radio("Rotura Garrafón", ["En Objetivo", "Fuera de Objetivo"])
-            pts_rot = 20 if rotura == "En Objetivo" else 0
-            t_salida = st.time_input("Salida de Rutas", time(7, 30), step=60)
-            pts_salida = calcular_salida_base(t_salida)
-            
-            pts_totales = pts_oos + pts_inv + pts_merma + pts_rot + pts_salida
-            desglose_txt = f"OOS:{pts_oos} | Inv:{pts_inv} | Merma:{pts_merma} | Rot:{pts_rot} | Salida:{pts_salida}"
-
-        elif perfil == "Jefe/Sup APT Embotellado":
-            st.info("Configuración APT Embotellado. OOS Objetivo: 0.5%")
-            oos = st.number_input("OOS % (Escala 0-100. Ej: 0.5)", 0.0, 100.0, 0.5, step=0.1)
-            pts_oos = calcular_oos(oos, 25, 12)
-            c1, c2 = st.columns(2)
-            arq = c1.selectbox("Arquetipo CEDI", list(ARQUETIPOS.keys()))
-            monto = c2.number_input("Diferencia Inventario $", 0.0)
-            pts_inv = 40 if monto <= ARQUETIPOS[arq] else 0
-            merma = st.number_input("Merma CEDI (Decimal: 0.05 = 5%)", 0.0, 1.0, 0.05, format="%.3f")
-            pts_merma = calcular_rango_porcentajes(merma, 25, 12)
-            t_salida = st.time_input("Salida de Rutas", time(7, 30), step=60)
-            pts_salida = calcular_salida_base(t_salida)
-            
-            pts_totales = pts_oos + pts_inv + pts_merma + pts_salida
-            desglose_txt = f"OOS:{pts_oos} | Inv:{pts_inv} | Merma:{pts_merma} | Salida:{pts_salida}"
-
-        enviar = st.form_submit_button("💾 Guardar Evaluación en la Nube")
-
-    if enviar:
-        if nombre:
-            datos = {
-                "Mes": mes_eval,
-                "Año": ano_eval,
-                "Nombre": nombre,
-                "CEDIS": cedis,
-                "Zona": zona,
-                "Perfil": perfil,
-                "Puntaje Total": pts_totales,
-                "Desglose": desglose_txt, 
-                "Fecha Reg": str(datetime.now().date())
-            }
-            with st.spinner("Subiendo datos a Google Sheets..."):
-                guardar_registro(datos)
-            st.success(f"✅ Registrado exitosamente: {nombre} | Puntos: {pts_totales}")
-            if pts_totales >= 95: st.balloons()
-        else:
-            st.error("⚠️ Falta el nombre del colaborador.")
-
-# ==========================================
-# SECCIÓN 2: RANKINGS
-# ==========================================
 elif menu == "🏆 Ver Rankings":
-    st.title("Tablero de Posiciones")
-    
-    with st.spinner("Descargando información actualizada..."):
-        df_original = cargar_datos()
-
-    if not df_original.empty:
-        df_original["Puntaje Total"] = pd.to_numeric(df_original["Puntaje Total"], errors='coerce')
-        df_original["Año"] = pd.to_numeric(df_original["Año"], errors='coerce')
-        
-        df_view = df_original.copy()
-
-        # --- BARRA DE FILTROS ---
-        st.markdown("### 🔎 Filtros de Búsqueda")
-        c_ano, c_perfil, c_zona, c_cedis = st.columns(4)
-        
-        anos_disponibles = df_view["Año"].dropna().unique()
-        if anos_disponibles.size > 0:
-            filtro_ano = c_ano.selectbox("Año", anos_disponibles)
-            df_view = df_view[df_view["Año"] == filtro_ano]
-
-        opciones_perfil = df_view["Perfil"].unique()
-        sel_perfil = c_perfil.multiselect("Perfil", opciones_perfil, placeholder="Todos")
-        if sel_perfil: df_view = df_view[df_view["Perfil"].isin(sel_perfil)]
-
-        opciones_zona = df_view["Zona"].unique()
-        sel_zona = c_zona.multiselect("Zona", opciones_zona, placeholder="Todas")
-        if sel_zona: df_view = df_view[df_view["Zona"].isin(sel_zona)]
-
-        opciones_cedis = df_view["CEDIS"].unique()
-        sel_cedis = c_cedis.multiselect("CEDIS", opciones_cedis, placeholder="Todos")
-        if sel_cedis: df_view = df_view[df_view["CEDIS"].isin(sel_cedis)]
-
-        st.divider()
-
-        tab1, tab2 = st.tabs(["📅 Ranking Mensual", "📆 Acumulado Anual"])
-
-        with tab1:
-            mes_sel = st.selectbox("Selecciona Mes", MESES)
-            
-            st.markdown("---")
-            col_candado, _ = st.columns([1, 1])
-            pass_diploma = col_candado.text_input("🔐 Contraseña para habilitar Diplomas:", type="password", key="pass_dip")
-            st.markdown("---")
-            
-            df_mes = df_view[df_view["Mes"] == mes_sel]
-            if not df_mes.empty:
-                st.markdown(f"### 🏆 Mejores de {mes_sel} {filtro_ano}")
-                df_sorted = df_mes.sort_values(by="Puntaje Total", ascending=False).reset_index(drop=True)
-                
-                for i, row in df_sorted.iterrows():
-                    rank = i + 1
-                    icono = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"#{rank}"
-                    
-                    with st.container():
-                        c1, c2, c3 = st.columns([1, 4, 2])
-                        c1.markdown(f"## {icono}")
-                        c2.markdown(f"**{row['Nombre']}**")
-                        c2.caption(f"{row['Perfil']} | {row['CEDIS']} - {row['Zona']}")
-                        c2.markdown(f"**🔍 Detalle:** `{row['Desglose']}`")
-                        
-                        with c3:
-                            st.metric("Puntos", f"{row['Puntaje Total']:.1f}")
-                            if rank <= 3:
-                                if pass_diploma == "SAC2026":
-                                    colaborador_pdf = row.to_dict()
-                                    colaborador_pdf["Lugar"] = rank 
-                                    
-                                    pdf_data = generar_diploma_pdf(colaborador_pdf)
-                                    
-                                    filename = f"Diploma_SAC_{row['Nombre'].replace(' ', '_')}_{mes_sel}_{filtro_ano}.pdf"
-                                    st.download_button(
-                                        label=f"📜 Descargar Diploma",
-                                        data=pdf_data,
-                                        file_name=filename,
-                                        mime="application/pdf",
-                                        key=f"dip_{row['Nombre']}_{i}" 
-                                    )
-                                elif pass_diploma != "":
-                                    st.error("Contraseña incorrecta")
-                        st.divider()
-            else:
-                st.info(f"No hay evaluaciones para {mes_sel} del {filtro_ano}.")
-
-        with tab2:
-            st.markdown(f"### 📈 Promedio Anual {filtro_ano}")
-            if not df_view.empty:
-                df_anual = df_view.groupby(["Nombre", "Perfil", "CEDIS", "Zona"])["Puntaje Total"].mean().reset_index()
-                df_anual = df_anual.sort_values(by="Puntaje Total", ascending=False).reset_index(drop=True)
-                for i, row in df_anual.iterrows():
-                    rank = i + 1
-                    icono = "👑" if rank == 1 else "⭐" if rank <= 3 else f"#{rank}"
-                    with st.container():
-                        c1, c2, c3 = st.columns([1, 4, 2])
-                        c1.markdown(f"## {icono}")
-                        c2.markdown(f"**{row['Nombre']}**")
-                        c2.caption(f"Promedio Anual | {row['CEDIS']}")
-                        c3.metric("Promedio", f"{row['Puntaje Total']:.1f}")
-                        st.divider()
-            else:
-                st.info("No hay datos para calcular el acumulado.")
-
-        # --- ZONA DE ADMINISTRACIÓN (SEGURA) ---
-        st.markdown("---")
-        st.markdown("### 🔐 Área Gerencia Nacional")
-        st.caption("Panel de Administración y Descarga de Base de Datos")
-        password = st.text_input("Contraseña:", type="password", key="pass_admin")
+    from sac.paginas import rankings
+    rankings.mostrar()
 
-        if password == "SAC2026":
-            st.success("✅ Modo Administrador Activado")
-            
-            modo_edicion = st.toggle("🛠️ Activar Edición de Datos (Base Completa)")
-            
-            if modo_edicion:
-                st.warning("⚠️ CUIDADO: Estás editando la hoja de Google Sheets en tiempo real.")
-                df_editado = st.data_editor(df_original, num_rows="dynamic", key="editor_datos")
-                
-                if st.button("💾 Guardar Cambios en Google Sheets"):
-                    with st.spinner("Actualizando la nube..."):
-                        actualizar_base_completa(df_editado)
-                    st.toast("¡Base de datos actualizada con éxito!")
-                    st.rerun()
-            
-            @st.cache_data
-            def convert_df(df): return df.to_csv(index=False).encode('utf-8')
-            st.download_button("📥 Descargar Base Completa (Excel/CSV)", convert_df(df_original), "ranking_sac_completo.csv", "text/csv")
-            
-        elif password != "":
-            st.error("🚫 Contraseña incorrecta")
-    else:
-        st.info("No se encontraron datos válidos en la hoja de Google Sheets. Asegúrate de tener los encabezados correctos.")
+elif menu == "👤 Perfil de Colaborador":
+    from sac.paginas import colaborador
+    colaborador.mostrar()
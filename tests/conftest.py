@@ -0,0 +1,48 @@
+"""Pruebas sin Google: HojaFalsa, almacén en memoria y el estado del proceso limpio en cada prueba."""
+import os
+
+os.environ.setdefault("SAC_BACKEND", "falso")
+os.environ.setdefault("SAC_CIERRE", "manual")
+
+import pytest  # noqa: E402
+
+from sac import cierre, datos, ranking  # noqa: E402
+from sac.almacen import AlmacenLocal, configurar_almacen  # noqa: E402
+from sac.conexion import ConexionSheets, configurar_conexion  # noqa: E402
+from sac.hoja_falsa import ClienteFalso, HojaFalsa  # noqa: E402
+
+
+@pytest.fixture
+def almacen(monkeypatch):
+    """Almacén en memoria, caché y escritor nuevos (sin hilo: las pruebas vacían la bandeja a mano)"""
+    almacen = AlmacenLocal(":memory:")
+    configurar_almacen(almacen)
+    monkeypatch.setattr(datos, "cache_registros", datos.CacheRegistros())
+    monkeypatch.setattr(datos, "_vista", None)
+    monkeypatch.setattr(datos, "escritor", datos.EscritorDiferido())
+    monkeypatch.setattr(datos.escritor, "iniciar", lambda: None)
+    monkeypatch.setattr(datos, "ESCRITURA_DIFERIDA", True)
+    monkeypatch.setattr(datos.time, "sleep", lambda segundos: None)    # Pausas entre lotes de append_rows
+    monkeypatch.setattr(ranking, "_indice", None)
+    cierre._cargados.clear()
+    yield almacen
+    cierre._cargados.clear()
+
+
+@pytest.fixture
+def hoja(almacen):
+    """Hoja falsa vacía (solo encabezados) detrás de la conexión del proceso"""
+    hoja = HojaFalsa([datos.COLUMNAS])
+    configurar_conexion(ConexionSheets(lambda: ClienteFalso(hoja), dormir=lambda segundos: None))
+    return hoja
+
+
+@pytest.fixture
+def registro():
+    """Fábrica de registros mínimos con ID propio"""
+    def crear(nombre, id_fila, mes="Enero", ano=2026, puntaje=80):
+        return {"Mes": mes, "Año": ano, "Nombre": nombre, "CEDIS": "CED-01", "Zona": "Norte",
+                "Perfil": "Jefe SAC APT", "Puntaje Total": puntaje, datos.COLUMNA_ID: id_fila,
+                datos.COLUMNA_VERSION: 1}
+    return crear
+
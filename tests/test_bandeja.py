@@ -0,0 +1,129 @@
+"""Bandeja de escrituras: reintentos, errores permanentes y un solo escritor por almacén."""
+import pytest
+from google.auth.exceptions import TransportError
+
+from sac import datos
+from sac.almacen import AlmacenLocal, configurar_almacen
+
+
+class ErrorApi(Exception):
+    """Como gspread.exceptions.APIError: trae el código HTTP"""
+
+    def __init__(self, codigo):
+        super().__init__(f"HTTP {codigo}")
+        self.code = codigo
+
+
+def _nombres(hoja):
+    columna = datos.COLUMNAS.index("Nombre")
+    return [fila[columna] for fila in hoja.get_all_values()[1:]]
+
+
+def _fallar(hoja, cuando):
+    """Hace que `append_rows` lance lo que devuelva `cuando(valores, llamada)` (None: envía)"""
+    original = hoja.append_rows
+    llamadas = []
+
+    def append_rows(valores, **kwargs):
+        llamadas.append(valores)
+        error = cuando(valores, len(llamadas))
+        if error is not None:
+            raise error
+        return original(valores, **kwargs)
+
+    hoja.append_rows = append_rows
+    return llamadas
+
+
+@pytest.mark.parametrize("error, permanente", [
+    (ErrorApi(400), True), (ErrorApi(403), True), (ErrorApi(404), True), (KeyError("x"), True), (TypeError(), True),
+    (ErrorApi(401), False), (ErrorApi(408), False), (ErrorApi(429), False), (ErrorApi(500), False),
+    (ErrorApi(503), False), (TransportError("sin red"), False), (ConnectionError(), False),
+    (RuntimeError("desconocido"), False),
+])
+def test_clasificacion_de_errores(error, permanente):
+    assert datos._es_permanente(error) is permanente
+
+
+@pytest.mark.parametrize("error", [TransportError("sin red"), ConnectionError(), ErrorApi(503),
+                                   RuntimeError("desconocido")])
+def test_error_temporal_conserva_la_bandeja(almacen, hoja, registro, error):
+    recibos = [almacen.encolar("agregar", {"registros": [registro(n, f"r{i}")]}) for i, n in enumerate("ABC")]
+    _fallar(hoja, lambda valores, llamada: error if llamada == 1 else None)
+
+    with pytest.raises(type(error)):
+        datos.escritor.vaciar()
+    assert len(almacen.pendientes()) == 3
+    assert almacen.total_conflictos() == 0
+    assert {estado for estado, _ in almacen.recibos(recibos).values()} == {"pendiente"}
+
+    assert datos.escritor.vaciar() == 3
+    assert _nombres(hoja) == ["A", "B", "C"]
+
+
+@pytest.mark.parametrize("error", [ErrorApi(400), ErrorApi(403), KeyError("columna")])
+def test_error_permanente_descarta_solo_la_escritura_invalida(almacen, hoja, registro, error):
+    recibos = [almacen.encolar("agregar", {"registros": [registro(n, f"r{i}")]})
+               for i, n in enumerate(["Ana", "MALO", "Beto"])]
+    _fallar(hoja, lambda valores, llamada: error if any("MALO" in map(str, f) for f in valores) else None)
+
+    assert datos.escritor.vaciar() == 2
+    assert _nombres(hoja) == ["Ana", "Beto"]
+    assert almacen.pendientes() == []
+    assert almacen.recibos(recibos)[recibos[1]][0] == "rechazado"
+    assert almacen.total_conflictos() == 1
+
+
+def test_reintento_no_repite_lo_que_ya_llego(almacen, hoja, registro, monkeypatch):
+    monkeypatch.setattr(datos, "LOTE_ESCRITURA", 1)
+    monkeypatch.setattr(datos._enviar_filas, "__defaults__", (1, 0))
+    almacen.encolar("agregar", {"registros": [registro("D1", "r1"), registro("D2", "r2")]})
+    _fallar(hoja, lambda valores, llamada: ErrorApi(503) if llamada == 2 else None)
+
+    with pytest.raises(ErrorApi):
+        datos.escritor.vaciar()
+    assert _nombres(hoja) == ["D1"]
+    assert datos.escritor.vaciar() == 1
+    assert _nombres(hoja) == ["D1", "D2"]
+
+
+def test_un_solo_escritor_por_almacen(hoja, registro, tmp_path):
+    ruta = str(tmp_path / "compartido.sqlite3")
+    uno, otro = AlmacenLocal(ruta), AlmacenLocal(ruta)      # Dos procesos sobre el mismo archivo
+    escritor_uno, escritor_otro = datos.EscritorDiferido(), datos.EscritorDiferido()
+    for i in range(3):
+        uno.encolar("agregar", {"registros": [registro(f"N{i}", f"r{i}")]})
+
+    assert otro.tomar_turno("tercero", datos.VENCIMIENTO_TURNO) is not None
+    configurar_almacen(uno)
+    assert escritor_uno.vaciar() is None       # Otro proceso tiene el turno: no envía
+    otro.soltar_turno("tercero")
+
+    assert escritor_uno.vaciar() == 3
+    configurar_almacen(otro)
+    assert escritor_otro.vaciar() == 0
+    assert _nombres(hoja) == ["N0", "N1", "N2"]
+
+
+def test_turno_abandonado_revisa_ids_antes_de_agregar(almacen, hoja, registro):
+    for i in range(2):
+        almacen.encolar("agregar", {"registros": [registro(f"N{i}", f"r{i}")]})
+    # El dueño anterior murió después de agregar la primera fila, sin confirmarla
+    hoja.append_rows([[registro("N0", "r0").get(c, "") for c in datos.COLUMNAS]])
+    almacen._conexion.execute("INSERT INTO turno_escritor VALUES (1, 'muerto', '2000-01-01T00:00:00')")
+
+    assert datos.escritor.vaciar() == 2
+    assert _nombres(hoja) == ["N0", "N1"]
+
+
+def test_error_del_hilo_queda_registrado(almacen, monkeypatch):
+    def sin_hoja():
+        raise TransportError("sin red")
+    monkeypatch.setattr(datos, "get_sheet", sin_hoja)
+    almacen.encolar("agregar", {"registros": []})
+    esperas = iter([None])      # El hilo despierta una vez; en la segunda espera se detiene la prueba
+    monkeypatch.setattr(datos.escritor._evento, "wait", lambda espera: next(esperas))
+
+    with pytest.raises(StopIteration):
+        datos.escritor._ciclo()
+    assert "TransportError" in datos.estado_sincronizacion()["error"]
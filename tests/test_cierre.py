@@ -0,0 +1,91 @@
+"""Cierre de mes: instantánea única, cierre rehecho y huella de los datos del mes."""
+import pytest
+
+from benchmarks.generador import generar_evaluaciones
+from sac import cierre, datos
+from sac.ranking import indice_ranking
+
+ANO, MES = 2026, "Marzo"
+
+
+@pytest.fixture
+def evaluaciones(hoja):
+    df = generar_evaluaciones(240, semilla=3, anos=(ANO,))
+    hoja.append_rows(datos._filas_para_hoja(df.reindex(columns=datos.COLUMNAS)))
+    return int(((df["Año"] == ANO) & (df["Mes"] == MES)).sum())
+
+
+def _editar_una_fila(hoja):
+    encabezados = hoja.get_all_values()[0]
+    fila = next(f for f in hoja._filas[1:] if f[encabezados.index("Mes")] == MES)
+    fila[encabezados.index("Nombre")] = "Otro Nombre"
+
+
+def _indice_vigente():
+    datos.cache_registros.invalidar()
+    df, version = datos.cargar_instantanea()
+    return indice_ranking(df, version)
+
+
+def test_solo_se_cierra_una_vez(evaluaciones, almacen):
+    assert cierre.cerrar_mes(ANO, MES)
+    assert not cierre.cerrar_mes(ANO, MES)
+    instantanea = cierre.cierre_del_mes(ANO, MES)
+    assert instantanea.filas == evaluaciones
+    assert instantanea.diplomas and instantanea.pdf_completo
+    assert cierre.cierre_del_mes(ANO, "Diciembre") is None
+
+
+def test_mes_sin_evaluaciones_no_se_cierra(hoja, almacen):
+    assert not cierre.cerrar_mes(ANO, MES)
+    assert almacen.cargar_cierre(ANO, 3) is None
+
+
+def test_edicion_posterior_se_detecta(evaluaciones, hoja):
+    cierre.cerrar_mes(ANO, MES)
+    instantanea = cierre.cierre_del_mes(ANO, MES)
+    assert instantanea.cambios(_indice_vigente()) is None
+
+    _editar_una_fila(hoja)
+    assert instantanea.cambios(_indice_vigente()) == evaluaciones
+
+
+def test_huella_no_depende_del_tipo_de_columna(evaluaciones):
+    df_mes = _indice_vigente().del_mes(ANO, MES, {})
+    otro = df_mes.astype({"Año": "float64", "Puntaje Total": "float32", "CEDIS": "object", "Mes": "category"})
+    assert cierre.huella_mes(otro) == cierre.huella_mes(df_mes)
+    otro.iloc[0, otro.columns.get_loc("Puntaje Total")] += 1
+    assert cierre.huella_mes(otro) != cierre.huella_mes(df_mes)
+
+
+def test_cierre_rehecho_conserva_el_anterior_si_falla(evaluaciones, almacen, hoja, monkeypatch):
+    cierre.cerrar_mes(ANO, MES)
+    anterior = almacen.version_cierre(ANO, 3)
+    _editar_una_fila(hoja)
+    datos.cache_registros.invalidar()
+
+    def sin_diplomas(colaborador):
+        raise RuntimeError("falló el dibujo")
+    with monkeypatch.context() as m:
+        m.setattr(cierre, "generar_diploma_pdf", sin_diplomas)
+        with pytest.raises(RuntimeError):
+            cierre.cerrar_mes(ANO, MES, rehacer=True)
+    assert almacen.version_cierre(ANO, 3) == anterior
+    assert cierre.cierre_del_mes(ANO, MES).filas == evaluaciones
+
+    assert cierre.cerrar_mes(ANO, MES, rehacer=True)        # La reserva se liberó tras el fallo
+    assert almacen.version_cierre(ANO, 3) != anterior
+
+
+def test_cierre_rehecho_por_otro_proceso_se_recarga(evaluaciones, almacen, monkeypatch):
+    cierre.cerrar_mes(ANO, MES)
+    cargado = cierre.cierre_del_mes(ANO, MES)
+    creado, _, columnas, filas, pdf_completo, diplomas = almacen.cargar_cierre(ANO, 3)
+    # Otro servidor rehace el cierre sobre el mismo almacén: no pasa por `olvidar` de este proceso
+    almacen.guardar_cierre(ANO, 3, "otra-huella", columnas, filas[:-1], diplomas, pdf_completo)
+
+    assert cierre.cierre_del_mes(ANO, MES) is cargado       # Dentro de la ventana de revisión
+    monkeypatch.setattr(cierre, "REVISION_SIN_CIERRE", 0)
+    nuevo = cierre.cierre_del_mes(ANO, MES)
+    assert (nuevo.huella, nuevo.filas) == ("otra-huella", evaluaciones - 1)
+    assert cierre.cierre_del_mes(ANO, MES) is nuevo         # Sin otro cambio se reutiliza
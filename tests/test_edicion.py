@@ -0,0 +1,124 @@
+"""Modo Editor: fusión por versión, conflictos y envío de solo las diferencias."""
+import pytest
+
+from sac import datos
+
+
+@pytest.fixture
+def editor(hoja, registro):
+    """Hoja con 6 registros y dos copias del editor abiertas sobre la misma versión"""
+    hoja.append_rows([[registro(f"N{i}", f"r{i}", puntaje=50 + i).get(c, "") for c in datos.COLUMNAS]
+                      for i in range(6)])
+    df, _ = datos.cargar_instantanea()
+    return datos.para_editar(df), datos.para_editar(df)
+
+
+def _enviar(original, editado):
+    conflictos = datos.guardar_edicion(datos.preparar_edicion(original, editado))
+    datos.escritor.vaciar()
+    return conflictos
+
+
+def _fila(hoja, id_fila):
+    valores = hoja.get_all_values()
+    for fila in valores[1:]:
+        if fila[valores[0].index(datos.COLUMNA_ID)] == id_fila:
+            return dict(zip(valores[0], fila))
+    return None
+
+
+@pytest.mark.parametrize("diferida", [True, False])
+def test_cambios_en_celdas_distintas_se_combinan(editor, hoja, monkeypatch, diferida):
+    monkeypatch.setattr(datos, "ESCRITURA_DIFERIDA", diferida)
+    a, b = editor
+    b2 = b.copy()
+    b2.loc[1, "Puntaje Total"] = 99
+    assert _enviar(b, b2) == []
+
+    a2 = a.copy()
+    a2.loc[1, "Nombre"] = "Renombrado"
+    assert datos.revisar_edicion(datos.preparar_edicion(a, a2)) == []
+    assert _enviar(a, a2) == []
+    fila = _fila(hoja, "r1")
+    assert (fila["Nombre"], fila["Puntaje Total"], fila[datos.COLUMNA_VERSION]) == ("Renombrado", "99", "3")
+
+
+def test_misma_celda_es_conflicto_y_se_resuelve(editor, hoja):
+    a, b = editor
+    b2 = b.copy()
+    b2.loc[2, "Puntaje Total"] = 10
+    _enviar(b, b2)
+
+    a2 = a.copy()
+    a2.loc[2, "Puntaje Total"] = 20
+    carga = datos.preparar_edicion(a, a2)
+    conflictos = datos.revisar_edicion(carga)
+    assert [c.celdas for c in conflictos] == [["Puntaje Total"]]
+    assert [float(v) for v in conflictos[0].comparacion()["Tuya"]] == [20]
+
+    nueva = datos.resolver_conflictos(carga, conflictos, [True])
+    assert datos.revisar_edicion(nueva) == []
+    datos.guardar_edicion(nueva)
+    datos.escritor.vaciar()
+    assert _fila(hoja, "r2")["Puntaje Total"] == "20"
+
+
+def test_editar_una_fila_borrada_es_conflicto(editor, hoja):
+    a, b = editor
+    _enviar(b, b.drop(index=[3]))
+
+    a2 = a.copy()
+    a2.loc[3, "CEDIS"] = "X"
+    conflictos = datos.revisar_edicion(datos.preparar_edicion(a, a2))
+    assert [(c.tipo, c.actual) for c in conflictos] == [("editar", None)]
+    assert _fila(hoja, "r3") is None
+
+
+def test_borrar_una_fila_editada_por_otro_es_conflicto(editor, hoja):
+    a, b = editor
+    b2 = b.copy()
+    b2.loc[4, "Nombre"] = "Cambiado"
+    _enviar(b, b2)
+
+    conflictos = datos.revisar_edicion(datos.preparar_edicion(a, a.drop(index=[4])))
+    assert [c.tipo for c in conflictos] == ["borrar"]
+    assert _fila(hoja, "r4")["Nombre"] == "Cambiado"
+
+
+def test_reintento_de_una_edicion_no_duplica(editor, hoja):
+    a, _ = editor
+    a2 = a.copy()
+    a2.loc[0, "Puntaje Total"] = 1
+    a2.loc[10 ** 6] = a2.loc[5]
+    a2.loc[10 ** 6, [datos.COLUMNA_ID, datos.COLUMNA_VERSION, "Nombre"]] = [None, None, "Agregada"]
+    carga = datos.preparar_edicion(a, a2)
+
+    assert datos.enviar_edicion(datos.get_sheet(), carga) == []
+    filas = len(hoja.get_all_values())
+    assert datos.enviar_edicion(datos.get_sheet(), carga) == []
+    assert len(hoja.get_all_values()) == filas
+
+
+def test_una_celda_no_descarga_la_hoja(editor, hoja):
+    a, _ = editor
+    a2 = a.copy()
+    a2.loc[5, "Puntaje Total"] = 1
+    hoja.llamadas.clear()
+
+    datos.enviar_edicion(datos.get_sheet(), datos.preparar_edicion(a, a2))
+    assert "get_all_values" not in hoja.llamadas
+    assert hoja.llamadas["batch_get"] == 1
+    assert _fila(hoja, "r5")["Puntaje Total"] == "1"
+
+
+def test_filas_movidas_releen_la_hoja_completa(editor, hoja):
+    a, _ = editor
+    del hoja._filas[1]          # Alguien borró r0 por fuera: el caché quedó corrido
+    a2 = a.copy()
+    a2.loc[4, "Nombre"] = "Cambiado"
+    hoja.llamadas.clear()
+
+    assert datos.enviar_edicion(datos.get_sheet(), datos.preparar_edicion(a, a2)) == []
+    assert hoja.llamadas["get_all_values"] == 1
+    assert _fila(hoja, "r4")["Nombre"] == "Cambiado"
+    assert _fila(hoja, "r3")["Nombre"] == "N3"
@@ -0,0 +1,64 @@
+"""Importación masiva: volver a subir el mismo archivo no duplica evaluaciones."""
+import io
+
+import pytest
+
+from sac import datos
+from sac.importacion import COLUMNAS_PLANTILLA, importar_evaluaciones
+
+
+def _archivo(filas):
+    lineas = [",".join(COLUMNAS_PLANTILLA)]
+    lineas += [f"Enero,2026,N{i},C,Z,Jefe SAC APT,,,,,,0.5,0.05,E,100,En Objetivo," for i in range(filas)]
+    return io.BytesIO(("\n".join(lineas) + "\n").encode("utf-8"))
+
+
+def _nombres(hoja):
+    columna = datos.COLUMNAS.index("Nombre")
+    return [fila[columna] for fila in hoja.get_all_values()[1:]]
+
+
+def test_validar_solo_no_escribe(almacen, hoja):
+    resultado = importar_evaluaciones(_archivo(3), "datos.csv", validar_solo=True)
+    assert (resultado.leidas, resultado.importadas, resultado.errores) == (3, 3, [])
+    assert almacen.pendientes() == [] and _nombres(hoja) == []
+
+
+def test_reimportar_en_bandeja_no_duplica(almacen, hoja):
+    archivo = _archivo(5)
+    primero = importar_evaluaciones(archivo, "datos.csv", tamano=2)
+    assert (primero.importadas, primero.en_bandeja, primero.repetidas) == (5, 5, 0)
+
+    archivo.seek(0)
+    segundo = importar_evaluaciones(archivo, "datos.csv", tamano=2)    # Aún sin enviar: cuenta la bandeja
+    assert (segundo.importadas, segundo.repetidas) == (0, 5)
+    assert datos.escritor.vaciar() == 3
+    assert _nombres(hoja) == [f"N{i}" for i in range(5)]
+
+
+def test_reimportar_tras_un_fallo_sube_solo_lo_que_falto(almacen, hoja, monkeypatch):
+    monkeypatch.setattr(datos, "ESCRITURA_DIFERIDA", False)
+    original = hoja.append_rows
+    llamadas = []
+
+    def append_rows(valores, **kwargs):
+        llamadas.append(len(valores))
+        if len(llamadas) == 2:
+            raise ConnectionError("se cayó la red")
+        return original(valores, **kwargs)
+    hoja.append_rows = append_rows
+
+    with pytest.raises(ConnectionError):
+        importar_evaluaciones(_archivo(5), "datos.csv", tamano=2)
+    assert _nombres(hoja) == ["N0", "N1"]
+
+    resultado = importar_evaluaciones(_archivo(5), "datos.csv", tamano=2)     # Mismo contenido, mismos IDs
+    assert (resultado.importadas, resultado.repetidas) == (3, 2)
+    assert _nombres(hoja) == [f"N{i}" for i in range(5)]
+    assert len(set(datos.cargar_instantanea()[0][datos.COLUMNA_ID])) == 5
+
+
+def test_otro_archivo_si_se_importa(almacen, hoja):
+    importar_evaluaciones(_archivo(2), "datos.csv")
+    resultado = importar_evaluaciones(_archivo(3), "datos.csv")
+    assert (resultado.importadas, resultado.repetidas) == (3, 0)
@@ -0,0 +1,112 @@
+"""Caché de registros: sondeo, descarga incremental y respaldo en el espejo local."""
+import pytest
+
+from sac import datos
+from sac.conexion import ConexionSheets, configurar_conexion
+from sac.hoja_falsa import ClienteFalso
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj():
+    return Reloj()
+
+
+@pytest.fixture
+def cache(almacen, reloj):
+    return datos.CacheRegistros(ttl=60, ttl_maximo=600, incremental=True, reloj=reloj)
+
+
+def _fila(registro, i):
+    return [registro(f"N{i}", f"r{i}").get(c, "") for c in datos.COLUMNAS]
+
+
+def _leer(cache, hoja):
+    hoja.llamadas.clear()
+    return cache.obtener(datos.get_sheet())
+
+
+def test_filas_nuevas_se_piden_como_delta(cache, hoja, registro, reloj):
+    hoja.append_rows([_fila(registro, i) for i in range(3)])
+    assert len(_leer(cache, hoja)) == 3
+    assert hoja.llamadas["get_all_values"] == 1
+
+    hoja.append_rows([_fila(registro, i) for i in range(3, 5)])
+    assert len(_leer(cache, hoja)) == 3          # Dentro del TTL se sirve la copia
+    assert sum(hoja.llamadas.values()) == 0
+
+    reloj.ahora += 61
+    df = _leer(cache, hoja)
+    assert df["Nombre"].astype(str).tolist() == ["N0", "N1", "N2", "N3", "N4"]
+    assert dict(hoja.llamadas) == {"col_values": 1, "get_values": 1}
+    assert cache.generacion == 1                 # Solo se agregaron filas
+
+
+def test_sin_cambios_solo_sondea(cache, hoja, registro, reloj):
+    hoja.append_rows([_fila(registro, 0)])
+    _leer(cache, hoja)
+    version = cache.version
+    reloj.ahora += 61
+    _leer(cache, hoja)
+    assert dict(hoja.llamadas) == {"col_values": 1}
+    assert cache.version == version
+
+
+def test_hoja_reescrita_descarga_completa(cache, hoja, registro, reloj):
+    hoja.append_rows([_fila(registro, i) for i in range(3)])
+    _leer(cache, hoja)
+    hoja._filas[3][datos.COLUMNAS.index("Nombre")] = "Cambiada"      # La última fila conocida ya no coincide
+    hoja.append_rows([_fila(registro, 3)])
+
+    reloj.ahora += 61
+    df = _leer(cache, hoja)
+    assert hoja.llamadas["get_all_values"] == 1
+    assert df["Nombre"].astype(str).tolist() == ["N0", "N1", "Cambiada", "N3"]
+    assert cache.generacion == 2
+
+
+def test_menos_filas_descarga_completa(cache, hoja, registro, reloj):
+    hoja.append_rows([_fila(registro, i) for i in range(3)])
+    _leer(cache, hoja)
+    del hoja._filas[1]
+    reloj.ahora += 61
+    assert _leer(cache, hoja)["Nombre"].astype(str).tolist() == ["N1", "N2"]
+    assert hoja.llamadas["get_all_values"] == 1
+
+
+def test_marcar_agregado_sincroniza_sin_esperar_el_ttl(cache, hoja, registro):
+    _leer(cache, hoja)
+    hoja.append_rows([_fila(registro, 0)])
+    cache.marcar_agregado()
+    assert len(_leer(cache, hoja)) == 1
+
+
+def test_sin_conexion_sirve_la_copia_y_espera_el_ttl(cache, hoja, registro, reloj):
+    hoja.append_rows([_fila(registro, 0)])
+    _leer(cache, hoja)
+    hoja.fallos_cuota = 10 ** 6
+    configurar_conexion(ConexionSheets(lambda: ClienteFalso(hoja), reintentos=0))
+
+    reloj.ahora += 61
+    assert len(_leer(cache, hoja)) == 1
+    assert cache.ultimo_error
+    _leer(cache, hoja)
+    assert sum(hoja.llamadas.values()) == 0      # No reintenta en cada rerun
+
+
+def test_arranque_en_frio_usa_el_espejo(almacen, hoja, registro, reloj):
+    hoja.append_rows([_fila(registro, i) for i in range(2)])
+    datos.CacheRegistros(reloj=reloj).obtener(datos.get_sheet())    # Deja el espejo en el almacén
+
+    hoja.fallos_cuota = 10 ** 6
+    configurar_conexion(ConexionSheets(lambda: ClienteFalso(hoja), reintentos=0))
+    nueva = datos.CacheRegistros(ttl=60, reloj=reloj)
+    assert nueva.obtener(datos.get_sheet())["Nombre"].astype(str).tolist() == ["N0", "N1"]
+    assert nueva.ultimo_error